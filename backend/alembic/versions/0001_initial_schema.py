@@ -0,0 +1,83 @@
+"""Initial schema, as previously created by Base.metadata.create_all
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        "api_keys",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("provider", sa.String()),
+        sa.Column("encrypted_key", sa.String()),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_api_keys_id", "api_keys", ["id"])
+    op.create_index("ix_api_keys_provider", "api_keys", ["provider"], unique=True)
+
+    op.create_table(
+        "configurations",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("key", sa.String()),
+        sa.Column("value", sa.String()),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_configurations_id", "configurations", ["id"])
+    op.create_index("ix_configurations_key", "configurations", ["key"], unique=True)
+
+    op.create_table(
+        "competitor_analyses",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("competitor_url", sa.String()),
+        sa.Column("analysis_type", sa.String()),
+        sa.Column("provider", sa.String()),
+        sa.Column("content_themes", sa.Text()),
+        sa.Column("content_strategy", sa.Text()),
+        sa.Column("raw_analysis", sa.Text()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_competitor_analyses_id", "competitor_analyses", ["id"])
+
+    op.create_table(
+        "prompt_ideas",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("analysis_id", sa.Integer(), sa.ForeignKey("competitor_analyses.id")),
+        sa.Column("prompt_text", sa.Text()),
+        sa.Column("provider", sa.String()),
+        sa.Column("confidence_score", sa.Float(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_prompt_ideas_id", "prompt_ideas", ["id"])
+
+    op.create_table(
+        "generated_contents",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("prompt_id", sa.Integer(), sa.ForeignKey("prompt_ideas.id")),
+        sa.Column("content_type", sa.String()),
+        sa.Column("content_text", sa.Text(), nullable=True),
+        sa.Column("content_url", sa.String(), nullable=True),
+        sa.Column("provider", sa.String()),
+        sa.Column("parameters", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_generated_contents_id", "generated_contents", ["id"])
+
+def downgrade():
+    op.drop_table("generated_contents")
+    op.drop_table("prompt_ideas")
+    op.drop_table("competitor_analyses")
+    op.drop_table("configurations")
+    op.drop_table("api_keys")
@@ -0,0 +1,65 @@
+"""Cache version, LLM response cache and job tables
+
+Databases created with Base.metadata.create_all may already have some of
+these tables, so each one is only created when missing.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    existing_tables = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "cache_versions" not in existing_tables:
+        op.create_table(
+            "cache_versions",
+            sa.Column("name", sa.String(), primary_key=True),
+            sa.Column("version", sa.Integer(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+
+    if "llm_cache_entries" not in existing_tables:
+        op.create_table(
+            "llm_cache_entries",
+            sa.Column("key", sa.String(), primary_key=True),
+            sa.Column("provider", sa.String()),
+            sa.Column("operation", sa.String()),
+            sa.Column("value", sa.Text()),
+            sa.Column("expires_at", sa.Float()),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+        op.create_index("ix_llm_cache_entries_expires_at", "llm_cache_entries", ["expires_at"])
+
+    if "jobs" not in existing_tables:
+        op.create_table(
+            "jobs",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("kind", sa.String()),
+            sa.Column("payload", sa.Text()),
+            sa.Column("status", sa.String()),
+            sa.Column("attempts", sa.Integer(), nullable=False),
+            sa.Column("max_attempts", sa.Integer(), nullable=False),
+            sa.Column("run_after", sa.Float()),
+            sa.Column("lease_expires_at", sa.Float(), nullable=True),
+            sa.Column("result", sa.Text(), nullable=True),
+            sa.Column("error", sa.Text(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        )
+        op.create_index("ix_jobs_id", "jobs", ["id"])
+        op.create_index("ix_jobs_status", "jobs", ["status"])
+
+def downgrade():
+    op.drop_table("jobs")
+    op.drop_table("llm_cache_entries")
+    op.drop_table("cache_versions")
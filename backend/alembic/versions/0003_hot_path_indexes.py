@@ -0,0 +1,38 @@
+"""Indexes for list, filter and child-listing queries
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Keyset pagination: ORDER BY created_at DESC, id DESC
+    op.create_index("ix_competitor_analyses_created_at_id", "competitor_analyses", ["created_at", "id"])
+    op.create_index("ix_prompt_ideas_created_at_id", "prompt_ideas", ["created_at", "id"])
+    op.create_index("ix_generated_contents_created_at_id", "generated_contents", ["created_at", "id"])
+
+    # Child listings by foreign key; also serve plain lookups on the foreign key
+    op.create_index("ix_prompt_ideas_analysis_id_created_at", "prompt_ideas", ["analysis_id", "created_at"])
+    op.create_index("ix_generated_contents_prompt_id_created_at", "generated_contents", ["prompt_id", "created_at"])
+
+    op.create_index("ix_competitor_analyses_competitor_url", "competitor_analyses", ["competitor_url"])
+
+    # Job claiming: WHERE status = 'queued' AND run_after <= now ORDER BY run_after
+    op.create_index("ix_jobs_status_run_after", "jobs", ["status", "run_after"])
+
+def downgrade():
+    op.drop_index("ix_jobs_status_run_after", table_name="jobs")
+    op.drop_index("ix_competitor_analyses_competitor_url", table_name="competitor_analyses")
+    op.drop_index("ix_generated_contents_prompt_id_created_at", table_name="generated_contents")
+    op.drop_index("ix_prompt_ideas_analysis_id_created_at", table_name="prompt_ideas")
+    op.drop_index("ix_generated_contents_created_at_id", table_name="generated_contents")
+    op.drop_index("ix_prompt_ideas_created_at_id", table_name="prompt_ideas")
+    op.drop_index("ix_competitor_analyses_created_at_id", table_name="competitor_analyses")
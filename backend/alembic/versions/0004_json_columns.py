@@ -0,0 +1,72 @@
+"""Store analysis and generation parameters as JSON/JSONB
+
+Converts content_themes, content_strategy, raw_analysis and parameters from
+json.dumps text to native JSON columns, and strips content_themes and
+content_strategy out of raw_analysis, which used to duplicate them.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+# revision identifiers, used by Alembic.
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+JSONType = sa.JSON().with_variant(JSONB(), "postgresql")
+
+ANALYSIS_COLUMN_KEYS = ("content_themes", "content_strategy")
+
+def _alter_columns(table_name, column_names, type_, postgresql_cast):
+    with op.batch_alter_table(table_name) as batch_op:
+        for column_name in column_names:
+            batch_op.alter_column(
+                column_name,
+                type_=type_,
+                existing_nullable=True,
+                postgresql_using=f"{column_name}::{postgresql_cast}"
+            )
+
+def upgrade():
+    _alter_columns("competitor_analyses", ["content_themes", "content_strategy", "raw_analysis"], JSONType, "jsonb")
+    _alter_columns("generated_contents", ["parameters"], JSONType, "jsonb")
+
+    analyses = sa.table(
+        "competitor_analyses",
+        sa.column("id", sa.Integer),
+        sa.column("raw_analysis", JSONType)
+    )
+    bind = op.get_bind()
+    for row_id, raw_analysis in bind.execute(sa.select(analyses.c.id, analyses.c.raw_analysis)).all():
+        if not isinstance(raw_analysis, dict) or not any(key in raw_analysis for key in ANALYSIS_COLUMN_KEYS):
+            continue
+        remaining = {key: value for key, value in raw_analysis.items() if key not in ANALYSIS_COLUMN_KEYS}
+        bind.execute(analyses.update().where(analyses.c.id == row_id).values(raw_analysis=remaining))
+
+def downgrade():
+    analyses = sa.table(
+        "competitor_analyses",
+        sa.column("id", sa.Integer),
+        sa.column("content_themes", JSONType),
+        sa.column("content_strategy", JSONType),
+        sa.column("raw_analysis", JSONType)
+    )
+    bind = op.get_bind()
+    rows = bind.execute(sa.select(
+        analyses.c.id, analyses.c.content_themes, analyses.c.content_strategy, analyses.c.raw_analysis
+    )).all()
+    for row_id, content_themes, content_strategy, raw_analysis in rows:
+        bind.execute(analyses.update().where(analyses.c.id == row_id).values(raw_analysis={
+            **(raw_analysis or {}),
+            "content_themes": content_themes or [],
+            "content_strategy": content_strategy or []
+        }))
+
+    _alter_columns("generated_contents", ["parameters"], sa.Text(), "text")
+    _alter_columns("competitor_analyses", ["content_themes", "content_strategy", "raw_analysis"], sa.Text(), "text")
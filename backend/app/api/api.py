@@ -1,8 +1,9 @@
 from fastapi import APIRouter
 
-from app.api.endpoints import config, analysis, content
+from app.api.endpoints import config, analysis, content, jobs
 
 api_router = APIRouter()
 api_router.include_router(config.router, prefix="/config", tags=["config"])
 api_router.include_router(analysis.router, prefix="/analysis", tags=["analysis"])
 api_router.include_router(content.router, prefix="/content", tags=["content"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
@@ -1,18 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from datetime import datetime
 
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+from typing import List, Dict, Any, Optional
+
+from app.api.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, apply_date_range, paginate
+from app.api.sse import sse_response
 from app.db.session import get_db
+from app.llm.errors import ProviderError
 from app.models import models
 from app.schemas import schemas
 from app.services.analysis_service import AnalysisService
+from app.services.job_service import job_queue
 
 router = APIRouter()
 
 @router.post("/analyze", response_model=schemas.CompetitorAnalysisResponse)
 async def analyze_competitor(
     analysis_request: schemas.CompetitorAnalysisRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Analyze competitor content."""
     analysis_service = AnalysisService(db)
@@ -24,22 +32,70 @@ async def analyze_competitor(
             provider=analysis_request.provider
         )
         return result
+    except ProviderError:
+        # Mapped to 429/502/503 by the application exception handler
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error analyzing competitor: {str(e)}"
         )
 
-@router.get("/analyses", response_model=List[schemas.CompetitorAnalysis])
-async def get_analyses(db: Session = Depends(get_db)):
-    """Get all competitor analyses."""
-    analyses = db.query(models.CompetitorAnalysis).all()
-    return analyses
+@router.post("/analyze-async", response_model=schemas.JobAccepted, status_code=status.HTTP_202_ACCEPTED)
+async def analyze_competitor_async(
+    analysis_request: schemas.CompetitorAnalysisRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """Queue a competitor analysis as a background job; poll /jobs/{job_id} for the result."""
+    job = await job_queue.enqueue(db, "analyze_competitor", analysis_request.model_dump())
+    return {"job_id": job.id, "status": job.status}
+
+def _filter_analyses(db, query, provider, analysis_type, created_after, created_before):
+    if provider:
+        query = query.where(models.CompetitorAnalysis.provider == provider)
+    if analysis_type:
+        query = query.where(models.CompetitorAnalysis.analysis_type == analysis_type)
+    return apply_date_range(db, query, models.CompetitorAnalysis, created_after, created_before)
+
+@router.get("/analyses", response_model=schemas.Page[schemas.CompetitorAnalysis])
+async def get_analyses(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    provider: Optional[str] = None,
+    analysis_type: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Get competitor analyses, newest first, one page at a time."""
+    query = _filter_analyses(db, select(models.CompetitorAnalysis), provider, analysis_type, created_after, created_before)
+    return await paginate(db, query, models.CompetitorAnalysis, limit, cursor)
+
+@router.get("/analyses/summary", response_model=schemas.Page[schemas.CompetitorAnalysisSummary])
+async def get_analysis_summaries(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    provider: Optional[str] = None,
+    analysis_type: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Get competitor analyses for list views, without loading the analysis text columns."""
+    query = select(models.CompetitorAnalysis).options(load_only(
+        models.CompetitorAnalysis.id,
+        models.CompetitorAnalysis.competitor_url,
+        models.CompetitorAnalysis.analysis_type,
+        models.CompetitorAnalysis.provider,
+        models.CompetitorAnalysis.created_at
+    ))
+    query = _filter_analyses(db, query, provider, analysis_type, created_after, created_before)
+    return await paginate(db, query, models.CompetitorAnalysis, limit, cursor)
 
 @router.get("/analyses/{analysis_id}", response_model=schemas.CompetitorAnalysis)
-async def get_analysis(analysis_id: int, db: Session = Depends(get_db)):
+async def get_analysis(analysis_id: int, db: AsyncSession = Depends(get_db)):
     """Get a specific competitor analysis."""
-    analysis = db.query(models.CompetitorAnalysis).filter(models.CompetitorAnalysis.id == analysis_id).first()
+    analysis = await db.get(models.CompetitorAnalysis, analysis_id)
     if not analysis:
         raise HTTPException(status_code=404, detail="Analysis not found")
     return analysis
@@ -47,43 +103,82 @@ async def get_analysis(analysis_id: int, db: Session = Depends(get_db)):
 @router.post("/generate-prompts", response_model=List[schemas.PromptIdea])
 async def generate_prompt_ideas(
     prompt_request: schemas.PromptIdeaRequest,
-    db: Session = Depends(get_db)
+    response: Response,
+    db: AsyncSession = Depends(get_db)
 ):
-    """Generate prompt ideas based on analysis."""
+    """
+    Generate prompt ideas based on analysis.
+    
+    The ``X-Context-Tokens`` and ``X-Context-Tokens-Saved`` headers report the
+    size of the analysis context sent to the provider and the tokens compaction saved.
+    """
     analysis_service = AnalysisService(db)
     
     try:
         # Get the analysis
-        analysis = db.query(models.CompetitorAnalysis).filter(models.CompetitorAnalysis.id == prompt_request.analysis_id).first()
+        analysis = await db.get(models.CompetitorAnalysis, prompt_request.analysis_id)
         if not analysis:
             raise HTTPException(status_code=404, detail="Analysis not found")
         
         # Generate prompt ideas
-        prompt_ideas = await analysis_service.generate_prompt_ideas(
+        prompt_ideas, context = await analysis_service.generate_prompt_ideas(
             analysis_id=prompt_request.analysis_id,
             provider=prompt_request.provider,
             num_ideas=prompt_request.num_ideas
         )
+        response.headers["X-Context-Tokens"] = str(context.tokens)
+        response.headers["X-Context-Tokens-Saved"] = str(context.saved_tokens)
         return prompt_ideas
+    except ProviderError:
+        # Mapped to 429/502/503 by the application exception handler
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error generating prompt ideas: {str(e)}"
         )
 
-@router.get("/prompt-ideas", response_model=List[schemas.PromptIdea])
-async def get_prompt_ideas(analysis_id: int = None, db: Session = Depends(get_db)):
-    """Get prompt ideas, optionally filtered by analysis ID."""
-    query = db.query(models.PromptIdea)
+@router.post("/generate-prompts/stream")
+async def generate_prompt_ideas_stream(
+    prompt_request: schemas.PromptIdeaRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """Generate prompt ideas based on analysis, sending each idea as a Server-Sent Event once it is saved."""
+    analysis_service = AnalysisService(db)
+    
+    try:
+        events = await analysis_service.stream_prompt_ideas(
+            analysis_id=prompt_request.analysis_id,
+            provider=prompt_request.provider,
+            num_ideas=prompt_request.num_ideas
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return sse_response(events)
+
+@router.get("/prompt-ideas", response_model=schemas.Page[schemas.PromptIdea])
+async def get_prompt_ideas(
+    analysis_id: int = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    provider: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Get prompt ideas, newest first, optionally filtered by analysis ID."""
+    query = select(models.PromptIdea)
     if analysis_id:
-        query = query.filter(models.PromptIdea.analysis_id == analysis_id)
-    prompt_ideas = query.all()
-    return prompt_ideas
+        query = query.where(models.PromptIdea.analysis_id == analysis_id)
+    if provider:
+        query = query.where(models.PromptIdea.provider == provider)
+    query = apply_date_range(db, query, models.PromptIdea, created_after, created_before)
+    return await paginate(db, query, models.PromptIdea, limit, cursor)
 
 @router.get("/prompt-ideas/{prompt_id}", response_model=schemas.PromptIdea)
-async def get_prompt_idea(prompt_id: int, db: Session = Depends(get_db)):
+async def get_prompt_idea(prompt_id: int, db: AsyncSession = Depends(get_db)):
     """Get a specific prompt idea."""
-    prompt_idea = db.query(models.PromptIdea).filter(models.PromptIdea.id == prompt_id).first()
+    prompt_idea = await db.get(models.PromptIdea, prompt_id)
     if not prompt_idea:
         raise HTTPException(status_code=404, detail="Prompt idea not found")
     return prompt_idea
@@ -1,8 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, List, Optional
 
 from app.db.session import get_db
+from app.fetch.fetcher import page_fetcher
+from app.llm.cache import llm_response_cache
+from app.llm.circuit import circuit_breakers
+from app.llm.ratelimit import rate_limiters
+from app.llm.router import provider_router
 from app.models import models
 from app.schemas import schemas
 from app.services.config_service import ConfigurationService
@@ -11,66 +17,73 @@ router = APIRouter()
 config_service = ConfigurationService()
 
 @router.get("/api-keys", response_model=List[schemas.ApiKey])
-async def get_api_keys(db: Session = Depends(get_db)):
+async def get_api_keys(db: AsyncSession = Depends(get_db)):
     """Get all API keys."""
-    api_keys = db.query(models.ApiKey).all()
+    api_keys = (await db.scalars(select(models.ApiKey))).all()
     return api_keys
 
 @router.post("/api-keys", response_model=schemas.ApiKey)
-async def create_api_key(api_key: schemas.ApiKeyCreate, db: Session = Depends(get_db)):
+async def create_api_key(api_key: schemas.ApiKeyCreate, db: AsyncSession = Depends(get_db)):
     """Create a new API key."""
+    # Provider names are stored lowercase, as the router looks them up
+    provider = api_key.provider.lower()
     # Check if provider already exists
-    existing_key = db.query(models.ApiKey).filter(models.ApiKey.provider == api_key.provider).first()
+    existing_key = await db.scalar(select(models.ApiKey).where(func.lower(models.ApiKey.provider) == provider))
     if existing_key:
         # Update existing key
         encrypted_key = config_service.encrypt_api_key(api_key.api_key)
+        existing_key.provider = provider
         existing_key.encrypted_key = encrypted_key
         existing_key.is_active = True
-        db.commit()
-        db.refresh(existing_key)
+        await config_service.invalidate_api_key(provider, db)
+        await db.commit()
+        await db.refresh(existing_key)
         return existing_key
     
     # Create new key
     encrypted_key = config_service.encrypt_api_key(api_key.api_key)
     db_api_key = models.ApiKey(
-        provider=api_key.provider,
+        provider=provider,
         encrypted_key=encrypted_key,
         is_active=True
     )
     db.add(db_api_key)
-    db.commit()
-    db.refresh(db_api_key)
+    await config_service.invalidate_api_key(provider, db)
+    await db.commit()
+    await db.refresh(db_api_key)
     return db_api_key
 
 @router.delete("/api-keys/{provider}", response_model=schemas.ApiKey)
-async def delete_api_key(provider: str, db: Session = Depends(get_db)):
+async def delete_api_key(provider: str, db: AsyncSession = Depends(get_db)):
     """Delete an API key."""
-    api_key = db.query(models.ApiKey).filter(models.ApiKey.provider == provider).first()
+    provider = provider.lower()
+    api_key = await db.scalar(select(models.ApiKey).where(func.lower(models.ApiKey.provider) == provider))
     if not api_key:
         raise HTTPException(status_code=404, detail="API key not found")
     
     api_key.is_active = False
-    db.commit()
-    db.refresh(api_key)
+    await config_service.invalidate_api_key(provider, db)
+    await db.commit()
+    await db.refresh(api_key)
     return api_key
 
 @router.get("/configurations", response_model=List[schemas.Configuration])
-async def get_configurations(db: Session = Depends(get_db)):
+async def get_configurations(db: AsyncSession = Depends(get_db)):
     """Get all configurations."""
-    configurations = db.query(models.Configuration).all()
+    configurations = (await db.scalars(select(models.Configuration))).all()
     return configurations
 
 @router.post("/configurations", response_model=schemas.Configuration)
-async def create_configuration(config: schemas.ConfigurationCreate, db: Session = Depends(get_db)):
+async def create_configuration(config: schemas.ConfigurationCreate, db: AsyncSession = Depends(get_db)):
     """Create a new configuration."""
     # Check if key already exists
-    existing_config = db.query(models.Configuration).filter(models.Configuration.key == config.key).first()
+    existing_config = await db.scalar(select(models.Configuration).where(models.Configuration.key == config.key))
     if existing_config:
         # Update existing config
         existing_config.value = config.value
         existing_config.description = config.description
-        db.commit()
-        db.refresh(existing_config)
+        await db.commit()
+        await db.refresh(existing_config)
         return existing_config
     
     # Create new config
@@ -80,6 +93,31 @@ async def create_configuration(config: schemas.ConfigurationCreate, db: Session
         description=config.description
     )
     db.add(db_config)
-    db.commit()
-    db.refresh(db_config)
+    await db.commit()
+    await db.refresh(db_config)
     return db_config
+
+@router.get("/llm-cache/stats")
+async def get_llm_cache_stats() -> Dict[str, Any]:
+    """Get LLM response cache hit/miss counters."""
+    return llm_response_cache.stats()
+
+@router.get("/rate-limits/stats")
+async def get_rate_limit_stats() -> Dict[str, Any]:
+    """Get the adaptive concurrency, queue depth and 429 counts of each provider rate limiter."""
+    return rate_limiters.stats()
+
+@router.get("/providers/stats")
+async def get_provider_stats() -> Dict[str, Any]:
+    """Get the latency and error statistics used by provider="auto" routing."""
+    return provider_router.stats()
+
+@router.get("/circuit-breakers/stats")
+async def get_circuit_breaker_stats() -> Dict[str, Any]:
+    """Get the state of each provider's circuit breaker."""
+    return circuit_breakers.stats()
+
+@router.get("/page-fetcher/stats")
+async def get_page_fetcher_stats() -> Dict[str, Any]:
+    """Get competitor page fetch counts, cache hit rate and bytes downloaded and saved."""
+    return page_fetcher.stats()
@@ -1,18 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from datetime import datetime
 
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+from typing import List, Dict, Any, Optional
+
+from app.api.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, apply_date_range, paginate
+from app.api.sse import sse_response
+from app.core.config import settings
 from app.db.session import get_db
+from app.llm.errors import ProviderError
 from app.models import models
 from app.schemas import schemas
 from app.services.content_service import ContentService
+from app.services.job_service import job_queue
 
 router = APIRouter()
 
 @router.post("/generate", response_model=schemas.GeneratedContentResponse)
 async def generate_content(
     content_request: schemas.ContentGenerationRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Generate content based on prompt."""
     content_service = ContentService(db)
@@ -25,36 +34,121 @@ async def generate_content(
             parameters=content_request.parameters
         )
         return result
+    except ProviderError:
+        # Mapped to 429/502/503 by the application exception handler
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error generating content: {str(e)}"
         )
 
-@router.get("/content", response_model=List[schemas.GeneratedContent])
-async def get_content(prompt_id: int = None, db: Session = Depends(get_db)):
-    """Get generated content, optionally filtered by prompt ID."""
-    query = db.query(models.GeneratedContent)
+@router.post("/generate-async", response_model=schemas.JobAccepted, status_code=status.HTTP_202_ACCEPTED)
+async def generate_content_async(
+    content_request: schemas.ContentGenerationRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """Queue content generation as a background job; poll /jobs/{job_id} for the result."""
+    job = await job_queue.enqueue(db, "generate_content", content_request.model_dump())
+    return {"job_id": job.id, "status": job.status}
+
+@router.post("/generate/stream")
+async def generate_content_stream(
+    content_request: schemas.ContentGenerationRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """Generate text content based on prompt, streaming tokens as Server-Sent Events."""
+    content_service = ContentService(db)
+    
+    try:
+        events = await content_service.stream_content(
+            prompt_id=content_request.prompt_id,
+            content_type=content_request.content_type,
+            provider=content_request.provider,
+            parameters=content_request.parameters
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return sse_response(events)
+
+@router.post("/generate-batch")
+async def generate_content_batch(
+    batch_request: schemas.ContentGenerationBatchRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """Generate content for many prompts concurrently, streaming per-item results as Server-Sent Events."""
+    if len(batch_request.items) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch size exceeds the maximum of {settings.BATCH_MAX_ITEMS} items"
+        )
+    
+    content_service = ContentService(db)
+    events = await content_service.generate_content_batch([item.model_dump() for item in batch_request.items])
+    return sse_response(events)
+
+def _filter_content(db, query, prompt_id, provider, content_type, created_after, created_before):
     if prompt_id:
-        query = query.filter(models.GeneratedContent.prompt_id == prompt_id)
-    content = query.all()
-    return content
+        query = query.where(models.GeneratedContent.prompt_id == prompt_id)
+    if provider:
+        query = query.where(models.GeneratedContent.provider == provider)
+    if content_type:
+        query = query.where(models.GeneratedContent.content_type == content_type)
+    return apply_date_range(db, query, models.GeneratedContent, created_after, created_before)
+
+@router.get("/content", response_model=schemas.Page[schemas.GeneratedContent])
+async def get_content(
+    prompt_id: int = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    provider: Optional[str] = None,
+    content_type: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Get generated content, newest first, optionally filtered by prompt ID."""
+    query = _filter_content(db, select(models.GeneratedContent), prompt_id, provider, content_type, created_after, created_before)
+    return await paginate(db, query, models.GeneratedContent, limit, cursor)
+
+@router.get("/content/summary", response_model=schemas.Page[schemas.GeneratedContentSummary])
+async def get_content_summaries(
+    prompt_id: int = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    provider: Optional[str] = None,
+    content_type: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Get generated content for list views, without loading the content text."""
+    query = select(models.GeneratedContent).options(load_only(
+        models.GeneratedContent.id,
+        models.GeneratedContent.prompt_id,
+        models.GeneratedContent.content_type,
+        models.GeneratedContent.content_url,
+        models.GeneratedContent.provider,
+        models.GeneratedContent.created_at
+    ))
+    query = _filter_content(db, query, prompt_id, provider, content_type, created_after, created_before)
+    return await paginate(db, query, models.GeneratedContent, limit, cursor)
 
 @router.get("/content/{content_id}", response_model=schemas.GeneratedContent)
-async def get_content_by_id(content_id: int, db: Session = Depends(get_db)):
+async def get_content_by_id(content_id: int, db: AsyncSession = Depends(get_db)):
     """Get a specific generated content."""
-    content = db.query(models.GeneratedContent).filter(models.GeneratedContent.id == content_id).first()
+    content = await db.get(models.GeneratedContent, content_id)
     if not content:
         raise HTTPException(status_code=404, detail="Content not found")
     return content
 
 @router.delete("/content/{content_id}", response_model=schemas.GeneratedContent)
-async def delete_content(content_id: int, db: Session = Depends(get_db)):
+async def delete_content(content_id: int, db: AsyncSession = Depends(get_db)):
     """Delete a specific generated content."""
-    content = db.query(models.GeneratedContent).filter(models.GeneratedContent.id == content_id).first()
+    content = await db.get(models.GeneratedContent, content_id)
     if not content:
         raise HTTPException(status_code=404, detail="Content not found")
     
-    db.delete(content)
-    db.commit()
+    await db.delete(content)
+    await db.commit()
     return content
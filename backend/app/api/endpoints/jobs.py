@@ -0,0 +1,39 @@
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_db
+from app.models import models
+from app.schemas import schemas
+
+router = APIRouter()
+
+@router.get("/{job_id}", response_model=schemas.Job)
+async def get_job(job_id: int, db: AsyncSession = Depends(get_db)):
+    """Get the status of a background job."""
+    job = await db.get(models.Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.get("/{job_id}/result", response_model=schemas.JobResult)
+async def get_job_result(job_id: int, db: AsyncSession = Depends(get_db)):
+    """Get the result of a background job; returns 202 while it is still queued or running."""
+    job = await db.get(models.Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    if job.status in ("queued", "running"):
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={"id": job.id, "status": job.status, "result": None, "error": job.error}
+        )
+    
+    return {
+        "id": job.id,
+        "status": job.status,
+        "result": json.loads(job.result) if job.result else None,
+        "error": job.error
+    }
@@ -0,0 +1,95 @@
+import json
+import logging
+import random
+import time
+
+from app.core.metrics import http_request_duration_seconds, http_requests_in_flight, http_requests_total
+from app.core.timing import RequestTimings, current_timings
+
+timing_logger = logging.getLogger("app.timing")
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request count, latency and in-flight requests.
+
+    Requests are labelled with the route template (``/api/analysis/analyses/{analysis_id}``)
+    rather than the raw path, so label cardinality stays bounded. Latency runs
+    until the last body chunk is sent, which for SSE streams is the end of the stream.
+    """
+
+    def __init__(self, app, excluded_paths=("/metrics",)):
+        self.app = app
+        self.excluded_paths = set(excluded_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.dec()
+            # Starlette sets the matched route on the scope while routing
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            http_requests_total.inc(method, route_path, str(status[0]))
+            http_request_duration_seconds.observe(method, route_path, value=time.perf_counter() - started)
+
+class ServerTimingMiddleware:
+    """
+    Pure ASGI middleware that times request stages recorded with ``app.core.timing.span``.
+
+    Adds a ``Server-Timing`` header with the stages finished before the
+    response starts, and logs a JSON line with every stage for a sampled
+    share of requests (``log_sample_rate``).
+    """
+
+    def __init__(self, app, emit_header: bool = True, log_sample_rate: float = 0.0):
+        self.app = app
+        self.emit_header = emit_header
+        self.log_sample_rate = log_sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                if self.emit_header:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", timings.server_timing().encode("latin-1")))
+                    # Let cross-origin frontends read the timings in the browser
+                    headers.append((b"timing-allow-origin", b"*"))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_timings.reset(token)
+            if self.log_sample_rate and random.random() < self.log_sample_rate:
+                route = scope.get("route")
+                timing_logger.info(json.dumps({
+                    "method": scope["method"],
+                    "route": getattr(route, "path", None) or scope["path"],
+                    "status": status[0],
+                    "total_ms": round(timings.elapsed() * 1000, 1),
+                    "stages_ms": timings.as_dict()
+                }))
@@ -0,0 +1,92 @@
+import base64
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, literal, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Encode a (created_at, id) keyset position as an opaque cursor."""
+    payload = json.dumps([created_at.isoformat(), row_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor produced by ``encode_cursor``."""
+    try:
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+def _bind_created_at(db: AsyncSession, created_at: datetime) -> Any:
+    # SQLite stores server_default timestamps as "YYYY-MM-DD HH:MM:SS" UTC text
+    # while bound datetimes render with microseconds (and any UTC offset), so
+    # they compare as strings against the wrong value; bind the timestamp in
+    # the stored format instead.
+    if db.bind.dialect.name == "sqlite":
+        if created_at.tzinfo is not None:
+            created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+        return literal(created_at.strftime("%Y-%m-%d %H:%M:%S"))
+    return created_at
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    model,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Fetch one page of a query, newest first, using keyset pagination on (created_at, id).
+
+    Args:
+        db: Database session
+        query: Select of ``model`` with any filters already applied
+        model: ORM model with ``created_at`` and ``id`` columns
+        limit: Maximum number of items to return
+        cursor: Cursor from the previous page's ``next_cursor``
+
+    Returns:
+        Dict with ``items`` and ``next_cursor`` (None on the last page)
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        created_at = _bind_created_at(db, created_at)
+        query = query.where(
+            # Redundant with the OR below, but gives the planner an index range to seek into
+            model.created_at <= created_at,
+            or_(
+                model.created_at < created_at,
+                and_(model.created_at == created_at, model.id < row_id)
+            )
+        )
+
+    query = query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+    items = (await db.scalars(query)).all()
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(items[-1].created_at, items[-1].id)
+
+    return {"items": items, "next_cursor": next_cursor}
+
+def apply_date_range(
+    db: AsyncSession,
+    query: Select,
+    model,
+    created_after: Optional[datetime],
+    created_before: Optional[datetime]
+) -> Select:
+    """Filter a query to rows created within [created_after, created_before)."""
+    if created_after:
+        query = query.where(model.created_at >= _bind_created_at(db, created_after))
+    if created_before:
+        query = query.where(model.created_at < _bind_created_at(db, created_before))
+    return query
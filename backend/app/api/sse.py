@@ -0,0 +1,26 @@
+from typing import Any, AsyncIterator, Tuple
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+
+def format_sse(event: str, data: Any) -> str:
+    """Format a single Server-Sent Event with a JSON payload."""
+    # orjson handles dicts, lists and datetimes natively; anything else goes through jsonable_encoder
+    return f"event: {event}\ndata: {orjson.dumps(data, default=jsonable_encoder).decode()}\n\n"
+
+async def _encode_events(events: AsyncIterator[Tuple[str, Any]]) -> AsyncIterator[str]:
+    async for event, data in events:
+        yield format_sse(event, data)
+
+def sse_response(events: AsyncIterator[Tuple[str, Any]]) -> StreamingResponse:
+    """
+    Build a streaming response from an iterator of ``(event, data)`` pairs.
+    
+    Proxy buffering is disabled so events reach the client as they are produced.
+    """
+    return StreamingResponse(
+        _encode_events(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -11,11 +11,17 @@ class Settings(BaseSettings):
     
     # Database settings
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./app.db")
+    # Apply Alembic migrations on startup; disable when running `alembic upgrade head` during deploys
+    RUN_MIGRATIONS_ON_STARTUP: bool = os.getenv("RUN_MIGRATIONS_ON_STARTUP", "true").lower() == "true"
     
     # Security settings
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7 days
+    # Decrypted API keys are cached in memory for this many seconds
+    API_KEY_CACHE_TTL: float = float(os.getenv("API_KEY_CACHE_TTL", "300"))
+    # How often each worker re-reads the API key version counter from the database
+    API_KEY_CACHE_VERSION_CHECK_INTERVAL: float = float(os.getenv("API_KEY_CACHE_VERSION_CHECK_INTERVAL", "5"))
     
     # LLM API settings
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
@@ -23,7 +29,108 @@ class Settings(BaseSettings):
     GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY", "")
     DEEPSEEK_API_KEY: str = os.getenv("DEEPSEEK_API_KEY", "")
     MANUS_API_KEY: str = os.getenv("MANUS_API_KEY", "")
+
+    # LLM API endpoints
+    OPENAI_BASE_URL: str = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+    ANTHROPIC_BASE_URL: str = os.getenv("ANTHROPIC_BASE_URL", "https://api.anthropic.com")
+    GEMINI_BASE_URL: str = os.getenv("GEMINI_BASE_URL", "https://generativelanguage.googleapis.com/v1beta")
+    DEEPSEEK_BASE_URL: str = os.getenv("DEEPSEEK_BASE_URL", "https://api.deepseek.com/v1")
+    MANUS_API_URL: str = os.getenv("MANUS_API_URL", "https://api.manus.ai/v1")
+
+    # Outbound HTTP connection pool settings (shared by all LLM providers)
+    HTTP2_ENABLED: bool = os.getenv("HTTP2_ENABLED", "true").lower() == "true"
+    HTTP_MAX_CONNECTIONS: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    HTTP_KEEPALIVE_EXPIRY: float = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+    HTTP_CONNECT_TIMEOUT: float = float(os.getenv("HTTP_CONNECT_TIMEOUT", "10"))
+    HTTP_TIMEOUT: float = float(os.getenv("HTTP_TIMEOUT", "60"))
+    # Per-provider overrides of the values above, e.g. {"manus": {"max_connections": 10, "timeout": 120}}
+    PROVIDER_HTTP_OVERRIDES: dict = {}
+    # Maximum number of cached LLM provider instances (one per provider and API key)
+    LLM_PROVIDER_CACHE_SIZE: int = int(os.getenv("LLM_PROVIDER_CACHE_SIZE", "16"))
+    
+    # Per-provider rate limiting, applied separately to each API key. 0 disables a budget.
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_RPM: float = float(os.getenv("RATE_LIMIT_RPM", "0"))
+    RATE_LIMIT_TPM: float = float(os.getenv("RATE_LIMIT_TPM", "0"))
+    # Concurrency adapts between these bounds: +1 per window of successes, halved on a 429
+    RATE_LIMIT_MAX_CONCURRENCY: int = int(os.getenv("RATE_LIMIT_MAX_CONCURRENCY", "16"))
+    RATE_LIMIT_MIN_CONCURRENCY: int = int(os.getenv("RATE_LIMIT_MIN_CONCURRENCY", "1"))
+    RATE_LIMIT_DECREASE_FACTOR: float = float(os.getenv("RATE_LIMIT_DECREASE_FACTOR", "0.5"))
+    # Times a rate-limited call is re-queued before the 429 is raised to the caller
+    RATE_LIMIT_MAX_RETRIES: int = int(os.getenv("RATE_LIMIT_MAX_RETRIES", "3"))
+    # Pause after a 429 that carries no Retry-After header
+    RATE_LIMIT_DEFAULT_BACKOFF: float = float(os.getenv("RATE_LIMIT_DEFAULT_BACKOFF", "1"))
+    # Per-provider overrides of the values above, e.g. {"openai": {"rpm": 500, "tpm": 90000}}
+    PROVIDER_RATE_LIMITS: dict = {}
+    
+    # Per-provider circuit breaker: open after this many consecutive outages, retry after the timeout
+    CIRCUIT_BREAKER_ENABLED: bool = os.getenv("CIRCUIT_BREAKER_ENABLED", "true").lower() == "true"
+    CIRCUIT_FAILURE_THRESHOLD: int = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+    CIRCUIT_RESET_TIMEOUT: float = float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30"))
+    
+    # provider="auto" routing: health is judged on each provider's last ROUTER_WINDOW calls
+    ROUTER_WINDOW: int = int(os.getenv("ROUTER_WINDOW", "20"))
+    ROUTER_MAX_ERROR_RATE: float = float(os.getenv("ROUTER_MAX_ERROR_RATE", "0.5"))
+    # An unhealthy provider is tried first again once this many seconds passed since its last failure
+    ROUTER_COOLDOWN: float = float(os.getenv("ROUTER_COOLDOWN", "30"))
+    # Weight of the newest sample in the moving average of latency
+    ROUTER_LATENCY_ALPHA: float = float(os.getenv("ROUTER_LATENCY_ALPHA", "0.2"))
+    
+    # Token budget for the analysis embedded in prompt-idea prompts
+    PROMPT_CONTEXT_TOKEN_BUDGET: int = int(os.getenv("PROMPT_CONTEXT_TOKEN_BUDGET", "1500"))
+    # Per-provider overrides of the budget above, e.g. {"deepseek": 1000}
+    PROVIDER_CONTEXT_TOKEN_BUDGETS: dict = {}
+    
+    # Competitor page fetching: the extracted page text is added to the analysis prompt
+    PAGE_FETCH_ENABLED: bool = os.getenv("PAGE_FETCH_ENABLED", "true").lower() == "true"
+    PAGE_FETCH_TIMEOUT: float = float(os.getenv("PAGE_FETCH_TIMEOUT", "15"))
+    # Larger bodies are cut off while streaming
+    PAGE_FETCH_MAX_BYTES: int = int(os.getenv("PAGE_FETCH_MAX_BYTES", str(2 * 1024 * 1024)))
+    PAGE_FETCH_MAX_REDIRECTS: int = int(os.getenv("PAGE_FETCH_MAX_REDIRECTS", "5"))
+    PAGE_FETCH_CONCURRENCY: int = int(os.getenv("PAGE_FETCH_CONCURRENCY", "4"))
+    PAGE_FETCH_USER_AGENT: str = os.getenv("PAGE_FETCH_USER_AGENT", "GenAI-Marketing-Webapp/1.0 (+competitor analysis)")
+    # Allow loopback and private-network addresses, e.g. a local fixture server; keep off in production
+    PAGE_FETCH_ALLOW_PRIVATE: bool = os.getenv("PAGE_FETCH_ALLOW_PRIVATE", "false").lower() == "true"
+    PAGE_CACHE_DIR: str = os.getenv("PAGE_CACHE_DIR", "./.page_cache")
+    # Cached pages younger than this are used without a request; older ones are revalidated with a conditional GET
+    PAGE_CACHE_TTL: float = float(os.getenv("PAGE_CACHE_TTL", str(60 * 60)))
+    PAGE_TEXT_MAX_CHARS: int = int(os.getenv("PAGE_TEXT_MAX_CHARS", "8000"))
     
+    # Mark static prompt prefixes for provider-side caching (Anthropic cache_control)
+    PROMPT_CACHING_ENABLED: bool = os.getenv("PROMPT_CACHING_ENABLED", "true").lower() == "true"
+    # Anthropic does not cache prompts shorter than this (1024 tokens for Sonnet/Opus, 2048 for Haiku)
+    PROMPT_CACHE_MIN_TOKENS: int = int(os.getenv("PROMPT_CACHE_MIN_TOKENS", "1024"))
+    
+    # Prometheus metrics at /metrics (HTTP, upstream LLM, cache and DB)
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    
+    # Per-request stage timings: Server-Timing header, and a JSON log line for this share of requests (0-1)
+    SERVER_TIMING_ENABLED: bool = os.getenv("SERVER_TIMING_ENABLED", "false").lower() == "true"
+    SERVER_TIMING_LOG_SAMPLE_RATE: float = float(os.getenv("SERVER_TIMING_LOG_SAMPLE_RATE", "0"))
+    
+    # LLM response cache settings
+    LLM_CACHE_ENABLED: bool = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    # Also persist cached responses in the database, so they survive restarts and are shared by workers
+    LLM_CACHE_PERSISTENT: bool = os.getenv("LLM_CACHE_PERSISTENT", "true").lower() == "true"
+    LLM_CACHE_TTL: float = float(os.getenv("LLM_CACHE_TTL", str(24 * 60 * 60)))
+    LLM_CACHE_MAX_ENTRIES: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024"))
+    # Expired database entries are deleted while storing, at most this often (seconds)
+    LLM_CACHE_PURGE_INTERVAL: float = float(os.getenv("LLM_CACHE_PURGE_INTERVAL", "600"))
+    
+    # Batch content generation settings
+    BATCH_PROVIDER_CONCURRENCY: int = int(os.getenv("BATCH_PROVIDER_CONCURRENCY", "4"))
+    BATCH_COMMIT_SIZE: int = int(os.getenv("BATCH_COMMIT_SIZE", "20"))
+    BATCH_MAX_ITEMS: int = int(os.getenv("BATCH_MAX_ITEMS", "200"))
+    
+    # Background job settings
+    JOB_WORKER_CONCURRENCY: int = int(os.getenv("JOB_WORKER_CONCURRENCY", "2"))
+    JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    # A running job that exceeds this is cancelled, and re-queued by any worker if its process died
+    JOB_TIMEOUT: float = float(os.getenv("JOB_TIMEOUT", "300"))
+    JOB_RETRY_BACKOFF: float = float(os.getenv("JOB_RETRY_BACKOFF", "5"))
+    JOB_POLL_INTERVAL: float = float(os.getenv("JOB_POLL_INTERVAL", "2"))
+
     # CORS settings
     CORS_ORIGINS: list = ["http://localhost:3000"]
     
@@ -0,0 +1,299 @@
+import abc
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+
+# Latency buckets in seconds, from fast DB queries up to slow LLM calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+LabelValues = Tuple[str, ...]
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)) + "}"
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class _Metric(abc.ABC):
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+
+    @abc.abstractmethod
+    def render(self) -> List[str]:
+        """Exposition lines for this metric, starting with its HELP and TYPE header."""
+
+class Counter(_Metric):
+    """Monotonically increasing value per label set."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def set_total(self, *labels: str, value: float):
+        """Mirror a running total kept by another component (used by collectors)."""
+        with self._lock:
+            self._values[labels] = value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}" for labels, value in values
+        ]
+
+class Gauge(_Metric):
+    """Value that can go up and down per label set."""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels: str, value: float):
+        with self._lock:
+            self._values[labels] = value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}" for labels, value in values
+        ]
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram of observations per label set."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # Per label set: [count per bucket..., sum, count]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, *labels: str, value: float):
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [0.0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = [(labels, list(series)) for labels, series in self._values.items()]
+        lines = self._header()
+        bucket_labelnames = self.labelnames + ("le",)
+        for labels, series in values:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(bucket_labelnames, labels + (_format_value(bound),))} "
+                    f"{_format_value(cumulative)}"
+                )
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {_format_value(series[-1])}")
+        return lines
+
+class MetricsRegistry:
+    """Holds metrics and renders them in the Prometheus text exposition format.
+
+    Collectors are callbacks run at scrape time, for values owned by other
+    components (cache counters, pool sizes) that are cheaper to read on demand
+    than to mirror on every change.
+    """
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], None]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], None]):
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            collector()
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+# HTTP
+http_requests_total = registry.counter(
+    "http_requests_total", "HTTP requests handled, by route and status.", ("method", "route", "status")
+)
+http_request_duration_seconds = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency, until the response body is sent.", ("method", "route")
+)
+http_requests_in_flight = registry.gauge("http_requests_in_flight", "HTTP requests currently being handled.")
+
+# Upstream LLM calls
+llm_requests_total = registry.counter(
+    "llm_requests_total", "Upstream LLM calls, by provider, operation and outcome.", ("provider", "operation", "outcome")
+)
+llm_request_duration_seconds = registry.histogram(
+    "llm_request_duration_seconds", "Upstream LLM call latency.", ("provider", "operation")
+)
+llm_errors_total = registry.counter(
+    "llm_errors_total", "Failed upstream LLM calls, by error type.", ("provider", "operation", "error")
+)
+llm_requests_in_flight = registry.gauge("llm_requests_in_flight", "Upstream LLM calls in progress.", ("provider",))
+llm_tokens_total = registry.counter(
+    "llm_tokens_total", "Tokens reported by provider APIs, by kind (prompt or completion).", ("provider", "kind")
+)
+llm_context_tokens_total = registry.counter(
+    "llm_context_tokens_total", "Analysis context tokens put in prompts, by kind (sent or saved by compaction).", ("provider", "kind")
+)
+llm_cache_lookups_total = registry.counter(
+    "llm_cache_lookups_total", "LLM response cache lookups, by result.", ("result",)
+)
+llm_cache_hit_ratio = registry.gauge("llm_cache_hit_ratio", "Share of LLM response cache lookups served from the cache.")
+
+# Competitor page fetching
+page_fetch_total = registry.counter(
+    "page_fetch_total", "Competitor page fetches, by result (cache_hits, revalidated, downloads, errors).", ("result",)
+)
+page_fetch_bytes_total = registry.counter(
+    "page_fetch_bytes_total", "Page bytes downloaded, and bytes saved by cache hits and 304 revalidations.", ("kind",)
+)
+
+# Database
+db_queries_total = registry.counter("db_queries_total", "Database statements executed, by verb.", ("operation",))
+db_query_duration_seconds = registry.histogram(
+    "db_query_duration_seconds", "Database statement latency.", ("operation",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+db_query_errors_total = registry.counter("db_query_errors_total", "Database statements that raised.", ("operation",))
+db_sessions_in_flight = registry.gauge("db_sessions_in_flight", "Request-scoped database sessions currently open.")
+db_sessions_total = registry.counter(
+    "db_sessions_total", "Request-scoped database sessions, by outcome.", ("outcome",)
+)
+
+def record_tokens(provider: str, prompt_tokens: Optional[int], completion_tokens: Optional[int]):
+    """Count token usage reported by a provider API response."""
+    if not settings.METRICS_ENABLED:
+        return
+    if prompt_tokens:
+        llm_tokens_total.inc(provider, "prompt", amount=prompt_tokens)
+    if completion_tokens:
+        llm_tokens_total.inc(provider, "completion", amount=completion_tokens)
+
+def record_context_tokens(provider: str, sent_tokens: int, saved_tokens: int):
+    """Count analysis context tokens sent to a provider and saved by compacting it."""
+    if not settings.METRICS_ENABLED:
+        return
+    llm_context_tokens_total.inc(provider, "sent", amount=sent_tokens)
+    llm_context_tokens_total.inc(provider, "saved", amount=saved_tokens)
+
+def _collect_llm_cache():
+    from app.llm.cache import llm_response_cache
+
+    stats = llm_response_cache.stats()
+    for result in ("memory_hits", "db_hits", "misses", "bypassed"):
+        llm_cache_lookups_total.set_total(result, value=stats[result])
+    llm_cache_hit_ratio.set(value=stats["hit_rate"])
+
+def _collect_page_fetcher():
+    from app.fetch.fetcher import page_fetcher
+
+    stats = page_fetcher.stats()
+    for result in ("cache_hits", "revalidated", "downloads", "errors"):
+        page_fetch_total.set_total(result, value=stats[result])
+    page_fetch_bytes_total.set_total("downloaded", value=stats["bytes_downloaded"])
+    page_fetch_bytes_total.set_total("saved", value=stats["bytes_saved"])
+
+def _statement_operation(statement: str) -> str:
+    verb = statement.lstrip().split(None, 1)[:1]
+    return verb[0].upper() if verb else "UNKNOWN"
+
+def instrument_engine(engine, *, clock: Callable[[], float] = time.perf_counter):
+    """
+    Count and time every statement executed by a (sync) SQLAlchemy engine.
+
+    Pass ``async_engine.sync_engine`` for async engines.
+    """
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_times", []).append(clock())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_start_times"].pop()
+        operation = _statement_operation(statement)
+        db_queries_total.inc(operation)
+        db_query_duration_seconds.observe(operation, value=clock() - started)
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        start_times = exception_context.connection.info.get("query_start_times") if exception_context.connection else None
+        if start_times:
+            start_times.pop()
+        db_query_errors_total.inc(_statement_operation(exception_context.statement or ""))
+
+registry.add_collector(_collect_llm_cache)
+registry.add_collector(_collect_page_fetcher)
@@ -0,0 +1,90 @@
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Dict, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+class RequestTimings:
+    """Accumulated stage durations for one request, in seconds."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, List[float]] = {}
+
+    def add(self, name: str, seconds: float):
+        stage = self.stages.get(name)
+        if stage is None:
+            self.stages[name] = [seconds, 1]
+        else:
+            stage[0] += seconds
+            stage[1] += 1
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        """Render the stages as a ``Server-Timing`` header value (milliseconds)."""
+        entries = []
+        for name, (seconds, count) in self.stages.items():
+            entry = f"{name};dur={seconds * 1000:.1f}"
+            if count > 1:
+                entry += f';desc="{count} calls"'
+            entries.append(entry)
+        entries.append(f"total;dur={self.elapsed() * 1000:.1f}")
+        return ", ".join(entries)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: round(seconds * 1000, 1) for name, (seconds, _) in self.stages.items()}
+
+# Set by ServerTimingMiddleware; None when timing is disabled or outside a request
+current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("current_timings", default=None)
+
+class _Span:
+    __slots__ = ("name", "timings", "started")
+
+    def __init__(self, name: str, timings: RequestTimings):
+        self.name = name
+        self.timings = timings
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.timings.add(self.name, time.perf_counter() - self.started)
+        return False
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NOOP_SPAN = _NoopSpan()
+
+def span(name: str):
+    """
+    Time a stage of the current request.
+
+    Usable as ``with span("upstream"):`` around sync or awaited code. Outside a
+    timed request this returns a shared no-op, so instrumented code costs one
+    context variable lookup when timing is off.
+
+    Args:
+        name: Stage name, as shown in the Server-Timing header
+
+    Returns:
+        A context manager
+    """
+    timings = current_timings.get()
+    if timings is None:
+        return _NOOP_SPAN
+    return _Span(name, timings)
+
+async def timed(name: str, awaitable: Awaitable[T]) -> T:
+    """Await ``awaitable`` inside ``span(name)``, for use in lambdas."""
+    with span(name):
+        return await awaitable
@@ -0,0 +1,25 @@
+from typing import Any, Dict, List
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+async def bulk_insert_returning(db: AsyncSession, model, rows: List[Dict[str, Any]]) -> List[Any]:
+    """
+    Insert many rows in one statement and return the created ORM objects.
+    
+    Uses INSERT ... RETURNING (SQLite 3.35+ and Postgres), so generated ids and
+    server defaults such as ``created_at`` come back without a SELECT per row.
+    The caller owns the transaction and is responsible for committing.
+    
+    Args:
+        db: Database session
+        model: ORM model class to insert into
+        rows: Column values for each row
+        
+    Returns:
+        ORM objects in the same order as ``rows``
+    """
+    if not rows:
+        return []
+    result = await db.scalars(insert(model).returning(model, sort_by_parameter_order=True), rows)
+    return list(result.all())
@@ -0,0 +1,36 @@
+import os
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+
+from app.db.session import engine
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Revision matching the schema that Base.metadata.create_all used to produce
+LEGACY_REVISION = "0001"
+
+def get_alembic_config() -> Config:
+    """Alembic config for the backend, independent of the working directory."""
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    return config
+
+def run_migrations():
+    """
+    Upgrade the database to the latest revision.
+
+    Databases created before migrations existed have the original tables but
+    no ``alembic_version`` table; they are stamped at the initial revision
+    first so only the later revisions are applied.
+    """
+    config = get_alembic_config()
+    config.attributes["configure_logger"] = False
+
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        tables = set(inspect(connection).get_table_names())
+        if "alembic_version" not in tables and "competitor_analyses" in tables:
+            command.stamp(config, LEGACY_REVISION)
+        command.upgrade(config, "head")
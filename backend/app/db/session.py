@@ -1,22 +1,47 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
+from app.core.metrics import db_sessions_in_flight, db_sessions_total, instrument_engine
 
-# Create SQLAlchemy engine
+def get_async_database_url(database_url: str) -> str:
+    """Map a sync database URL onto its async driver (aiosqlite / asyncpg)."""
+    if database_url.startswith("sqlite://"):
+        return database_url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if database_url.startswith(prefix):
+            return database_url.replace(prefix, "postgresql+asyncpg://", 1)
+    return database_url
+
+# Create SQLAlchemy engine (used for schema management and scripts)
 engine = create_engine(settings.DATABASE_URL)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Create async engine and session factory (used by the API)
+async_engine = create_async_engine(get_async_database_url(settings.DATABASE_URL))
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+if settings.METRICS_ENABLED:
+    instrument_engine(engine)
+    instrument_engine(async_engine.sync_engine)
+
 # Create Base class
 Base = declarative_base()
 
 # Dependency to get DB session
-def get_db():
-    db = SessionLocal()
+async def get_db():
+    db_sessions_in_flight.inc()
+    outcome = "ok"
     try:
-        yield db
+        async with AsyncSessionLocal() as db:
+            yield db
+    except Exception:
+        outcome = "error"
+        raise
     finally:
-        db.close()
+        db_sessions_in_flight.dec()
+        db_sessions_total.inc(outcome)
@@ -0,0 +1,162 @@
+import re
+from html.parser import HTMLParser
+from typing import List, Optional
+
+# Elements whose content is never page text
+SKIP_TAGS = {
+    "script", "style", "noscript", "template", "svg", "canvas", "iframe", "object",
+    "nav", "header", "footer", "aside", "form", "button", "select", "textarea"
+}
+# Landmark roles of site chrome rather than content
+SKIP_ROLES = {"navigation", "banner", "contentinfo", "complementary", "search", "dialog", "alert"}
+# class/id words marking menus, cookie banners, share bars and the like
+BOILERPLATE_PATTERN = re.compile(
+    r"(?:^|[\s_-])(?:nav|navbar|menu|breadcrumbs?|footer|header|sidebar|cookies?|consent|banner|"
+    r"ads?|advert|advertisement|promo|social|share|sharing|newsletter|subscribe|popup|modal|comments?|related)"
+    r"(?:$|[\s_-])",
+    re.IGNORECASE
+)
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+# Elements that start a new block of text
+BLOCK_TAGS = {
+    "p", "div", "section", "article", "main", "h1", "h2", "h3", "h4", "h5", "h6", "li", "ul", "ol",
+    "dl", "dt", "dd", "tr", "table", "blockquote", "pre", "figure", "figcaption", "br", "hr", "summary", "details"
+}
+HEADING_TAGS = {"h1": 1, "h2": 2, "h3": 3}
+# A block mostly made of link text is a menu or link list
+MAX_LINK_DENSITY = 0.5
+
+class ExtractedText:
+    """Readable text of a page, with its title and meta description."""
+
+    def __init__(self, title: str, description: str, text: str):
+        self.title = title
+        self.description = description
+        self.text = text
+
+class _TextExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = ""
+        self.description = ""
+        self.blocks: List[str] = []
+        self._in_title = False
+        # Outermost skipped element and how deeply that tag is nested inside itself
+        self._skip_tag: Optional[str] = None
+        self._skip_depth = 0
+        self._link_depth = 0
+        self._prefix = ""
+        self._parts: List[str] = []
+        self._link_chars = 0
+
+    def _is_boilerplate(self, tag: str, attrs: dict) -> bool:
+        if tag in SKIP_TAGS or "hidden" in attrs or attrs.get("aria-hidden") == "true":
+            return True
+        if (attrs.get("role") or "").lower() in SKIP_ROLES:
+            return True
+        names = " ".join(filter(None, (attrs.get("class"), attrs.get("id"))))
+        return bool(names and BOILERPLATE_PATTERN.search(names))
+
+    def _flush(self):
+        text = " ".join("".join(self._parts).split())
+        if text and self._link_chars / len(text) <= MAX_LINK_DENSITY:
+            self.blocks.append(self._prefix + text)
+        self._parts = []
+        self._link_chars = 0
+        self._prefix = ""
+
+    def handle_starttag(self, tag, attrs):
+        if self._skip_tag is not None:
+            if tag == self._skip_tag:
+                self._skip_depth += 1
+            return
+        attrs = {name: value or "" for name, value in attrs}
+        if tag == "title":
+            self._in_title = True
+        elif tag == "meta" and attrs.get("name", "").lower() == "description":
+            self.description = " ".join(attrs.get("content", "").split())
+        elif tag not in VOID_TAGS and self._is_boilerplate(tag, attrs):
+            self._skip_tag, self._skip_depth = tag, 1
+            return
+
+        if tag in BLOCK_TAGS:
+            self._flush()
+            if tag in HEADING_TAGS:
+                self._prefix = "#" * HEADING_TAGS[tag] + " "
+            elif tag == "li":
+                self._prefix = "- "
+        elif tag == "a":
+            self._link_depth += 1
+
+    def handle_endtag(self, tag):
+        if self._skip_tag is not None:
+            if tag == self._skip_tag:
+                self._skip_depth -= 1
+                if self._skip_depth == 0:
+                    self._skip_tag = None
+            return
+        if tag == "title":
+            self._in_title = False
+        elif tag in BLOCK_TAGS:
+            self._flush()
+        elif tag == "a" and self._link_depth:
+            self._link_depth -= 1
+
+    def handle_data(self, data):
+        if self._skip_tag is not None:
+            return
+        if self._in_title:
+            self.title += data
+            return
+        self._parts.append(data)
+        if self._link_depth:
+            self._link_chars += len(data.strip())
+
+    def close(self):
+        super().close()
+        self._flush()
+
+def _limit(text: str, max_chars: int) -> str:
+    """Cut text to at most max_chars, at a line break when there is one."""
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind("\n", 0, max_chars)
+    return text[:cut if cut > 0 else max_chars].rstrip()
+
+def extract_text(html: str, max_chars: int) -> ExtractedText:
+    """
+    Extract the readable text of an HTML page.
+
+    Scripts, styles, navigation, headers, footers, asides, forms, hidden
+    elements and anything whose class or id names a menu, banner, cookie
+    notice, share bar or similar are dropped, as are blocks made mostly of
+    link text and lines repeated elsewhere on the page. Headings keep a
+    markdown ``#`` prefix and list items a ``-``.
+
+    Args:
+        html: Page markup
+        max_chars: Maximum length of the returned text
+
+    Returns:
+        The page title, meta description and text
+    """
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+
+    seen = set()
+    lines = []
+    for block in parser.blocks:
+        if block not in seen:
+            seen.add(block)
+            lines.append(block)
+    return ExtractedText(
+        " ".join(parser.title.split()),
+        parser.description,
+        _limit("\n".join(lines), max_chars)
+    )
+
+def plain_text(text: str, max_chars: int) -> ExtractedText:
+    """Wrap a text/plain page, normalizing whitespace within lines."""
+    lines = [" ".join(line.split()) for line in text.splitlines()]
+    return ExtractedText("", "", _limit("\n".join(line for line in lines if line), max_chars))
@@ -0,0 +1,327 @@
+import asyncio
+import hashlib
+import ipaddress
+import json
+import logging
+import os
+import socket
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.core.config import settings
+from app.fetch.extract import ExtractedText, extract_text, plain_text
+from app.llm.singleflight import SingleFlight
+from app.llm.transport import http_transport
+
+logger = logging.getLogger(__name__)
+
+# Content types whose text is extracted; anything else is rejected
+HTML_CONTENT_TYPES = {"text/html", "application/xhtml+xml"}
+TEXT_CONTENT_TYPES = {"text/plain"}
+# Validators of our cached copy; only meaningful to the host that issued them
+CONDITIONAL_HEADERS = ("If-None-Match", "If-Modified-Since")
+
+class PageFetchError(Exception):
+    """A competitor page could not be fetched or holds no readable text."""
+
+    def __init__(self, message: str, url: str):
+        super().__init__(message)
+        self.url = url
+
+class FetchedPage:
+    """
+    Extracted text of a fetched page.
+
+    ``source`` is ``network`` for a full download, ``revalidated`` when the
+    server answered a conditional GET with 304 Not Modified, and ``cache``
+    when a fresh cached copy was used without any request.
+    """
+
+    def __init__(self, entry: Dict[str, Any], source: str, bytes_downloaded: int = 0):
+        self.url = entry["url"]
+        self.final_url = entry["final_url"]
+        self.title = entry["title"]
+        self.description = entry["description"]
+        self.text = entry["text"]
+        self.truncated = entry["truncated"]
+        self.source = source
+        self.bytes_downloaded = bytes_downloaded
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "final_url": self.final_url,
+            "title": self.title,
+            "description": self.description,
+            "text": self.text,
+            "truncated": self.truncated,
+            "source": self.source,
+            "bytes_downloaded": self.bytes_downloaded
+        }
+
+class PageCache:
+    """
+    On-disk cache of extracted pages with the validators needed to revalidate them.
+
+    One JSON file per URL, named by the URL's SHA-256. Only the extracted
+    text is stored, not the markup; ``size`` records how many bytes the page
+    was, which is what a cache hit saves.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(url.encode()).hexdigest() + ".json")
+
+    def _load(self, url: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(url), encoding="utf-8") as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get("url") == url else None
+
+    def _store(self, url: str, entry: Dict[str, Any]):
+        os.makedirs(self.directory, exist_ok=True)
+        # Write then rename, so concurrent readers never see a partial file
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump(entry, file, ensure_ascii=False)
+            os.replace(temp_path, self._path(url))
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    async def load(self, url: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._load, url)
+
+    async def store(self, url: str, entry: Dict[str, Any]):
+        await asyncio.to_thread(self._store, url, entry)
+
+async def _resolve(host: str) -> List[str]:
+    infos = await asyncio.get_running_loop().getaddrinfo(host, None, type=socket.SOCK_STREAM)
+    return [info[4][0] for info in infos]
+
+async def _check_public_host(url: str):
+    """Refuse URLs that resolve to loopback, private or otherwise non-global addresses."""
+    host = urlsplit(url).hostname
+    if not host:
+        raise PageFetchError(f"Invalid URL: {url}", url)
+    try:
+        addresses = await _resolve(host)
+    except socket.gaierror as e:
+        raise PageFetchError(f"Could not resolve {host}: {e}", url) from e
+    for address in addresses:
+        address = ipaddress.ip_address(address)
+        if not address.is_global:
+            raise PageFetchError(f"Refusing to fetch non-public address {address} for {host}", url)
+
+def _decode(body: bytes, encoding: Optional[str]) -> str:
+    try:
+        return body.decode(encoding or "utf-8", errors="replace")
+    except LookupError:
+        return body.decode("utf-8", errors="replace")
+
+class PageFetcher:
+    """
+    Fetches competitor pages and extracts their readable text.
+
+    Requests go through the shared keep-alive transport. Pages are cached on
+    disk with their ``ETag`` and ``Last-Modified`` validators: a copy younger
+    than ``PAGE_CACHE_TTL`` is used as is, an older one is revalidated with a
+    conditional GET, so an unchanged page costs a 304 instead of a download.
+    Bodies are streamed and cut off at ``PAGE_FETCH_MAX_BYTES``. Concurrent
+    fetches of the same URL share one request.
+    """
+
+    def __init__(self, cache: Optional[PageCache] = None, client: Optional[httpx.AsyncClient] = None):
+        self.cache = cache or PageCache(settings.PAGE_CACHE_DIR)
+        self._client = client
+        self._flights = SingleFlight()
+        self.counters = {
+            "requests": 0,
+            "cache_hits": 0,
+            "revalidated": 0,
+            "downloads": 0,
+            "truncated": 0,
+            "errors": 0,
+            "bytes_downloaded": 0,
+            "bytes_saved": 0
+        }
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self._client or http_transport.get_client("page_fetcher")
+
+    async def fetch(self, url: str) -> FetchedPage:
+        """
+        Fetch a page, from the cache when possible.
+
+        Args:
+            url: Absolute http(s) URL of the page
+
+        Returns:
+            The extracted page
+
+        Raises:
+            PageFetchError: The page could not be fetched or holds no text
+        """
+        self.counters["requests"] += 1
+        try:
+            return await self._flights.do(("fetch", url), lambda: self._fetch(url))
+        except PageFetchError:
+            self.counters["errors"] += 1
+            raise
+
+    async def fetch_many(self, urls: List[str], concurrency: Optional[int] = None) -> List[Union[FetchedPage, PageFetchError]]:
+        """
+        Fetch several pages with bounded concurrency.
+
+        Args:
+            urls: Page URLs
+            concurrency: Maximum simultaneous fetches, ``PAGE_FETCH_CONCURRENCY`` by default
+
+        Returns:
+            The page, or the error, for each URL in order
+        """
+        semaphore = asyncio.Semaphore(concurrency or settings.PAGE_FETCH_CONCURRENCY)
+
+        async def fetch_one(url: str) -> Union[FetchedPage, PageFetchError]:
+            async with semaphore:
+                try:
+                    return await self.fetch(url)
+                except PageFetchError as e:
+                    return e
+
+        return await asyncio.gather(*(fetch_one(url) for url in urls))
+
+    async def _fetch(self, url: str) -> FetchedPage:
+        if urlsplit(url).scheme not in ("http", "https"):
+            raise PageFetchError(f"Unsupported URL scheme: {url}", url)
+
+        entry = await self.cache.load(url)
+        if entry and time.time() - entry["stored_at"] < settings.PAGE_CACHE_TTL:
+            self.counters["cache_hits"] += 1
+            self.counters["bytes_saved"] += entry["size"]
+            return FetchedPage(entry, "cache")
+
+        headers = {
+            "User-Agent": settings.PAGE_FETCH_USER_AGENT,
+            "Accept": "text/html,application/xhtml+xml,text/plain;q=0.9,*/*;q=0.1"
+        }
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            response, body, truncated = await self._get(url, headers)
+        except httpx.HTTPError as e:
+            raise PageFetchError(f"Error fetching {url}: {e}", url) from e
+        downloaded = response.num_bytes_downloaded
+        self.counters["bytes_downloaded"] += downloaded
+
+        if response.status_code == 304 and entry:
+            self.counters["revalidated"] += 1
+            self.counters["bytes_saved"] += entry["size"]
+            entry["stored_at"] = time.time()
+            await self._store(url, entry)
+            return FetchedPage(entry, "revalidated", downloaded)
+
+        self.counters["downloads"] += 1
+        if truncated:
+            self.counters["truncated"] += 1
+        # Parsing a page of up to PAGE_FETCH_MAX_BYTES takes long enough to stall other requests
+        extracted = await asyncio.to_thread(self._extract, response, body)
+        if not extracted.text:
+            raise PageFetchError(f"No readable text found at {url}", url)
+
+        entry = {
+            "url": url,
+            "final_url": str(response.url),
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+            "title": extracted.title,
+            "description": extracted.description,
+            "text": extracted.text,
+            "truncated": truncated,
+            "size": len(body),
+            "stored_at": time.time()
+        }
+        await self._store(url, entry)
+        return FetchedPage(entry, "network", downloaded)
+
+    async def _store(self, url: str, entry: Dict[str, Any]):
+        # A cache that cannot be written (full disk, read-only directory) only costs the next fetch
+        try:
+            await self.cache.store(url, entry)
+        except OSError as e:
+            logger.warning("Could not cache page %s: %s", url, e)
+
+    async def _get(self, url: str, headers: Dict[str, str]) -> Tuple[httpx.Response, bytes, bool]:
+        """
+        Stream a GET, following redirects by hand so every hop is checked.
+
+        Returns:
+            The final response, its body (at most ``PAGE_FETCH_MAX_BYTES``) and
+            whether the body was cut off there
+        """
+        max_bytes = settings.PAGE_FETCH_MAX_BYTES
+        for _ in range(settings.PAGE_FETCH_MAX_REDIRECTS + 1):
+            if not settings.PAGE_FETCH_ALLOW_PRIVATE:
+                await _check_public_host(url)
+            async with self.client.stream("GET", url, headers=headers, timeout=settings.PAGE_FETCH_TIMEOUT) as response:
+                if response.has_redirect_location:
+                    location = str(response.url.join(response.headers["location"]))
+                    if urlsplit(location).scheme not in ("http", "https"):
+                        raise PageFetchError(f"Redirected to unsupported URL: {location}", location)
+                    if urlsplit(location).netloc != urlsplit(url).netloc:
+                        headers = {key: value for key, value in headers.items() if key not in CONDITIONAL_HEADERS}
+                    url = location
+                    continue
+                if response.status_code == 304:
+                    return response, b"", False
+                if response.status_code >= 400:
+                    raise PageFetchError(f"Fetching {url} failed with status {response.status_code}", url)
+
+                content_type = response.headers.get("content-type", "text/html").split(";")[0].strip().lower()
+                if content_type not in HTML_CONTENT_TYPES | TEXT_CONTENT_TYPES:
+                    raise PageFetchError(f"Unsupported content type {content_type} at {url}", url)
+
+                # Read at most max_bytes of the (decompressed) body, however
+                # large the page or its Content-Length claims to be
+                body = bytearray()
+                truncated = False
+                async for chunk in response.aiter_bytes():
+                    room = max_bytes - len(body)
+                    body += chunk[:room]
+                    if len(chunk) > room:
+                        truncated = True
+                        break
+                return response, bytes(body), truncated
+        raise PageFetchError(f"Too many redirects fetching {url}", url)
+
+    def _extract(self, response: httpx.Response, body: bytes) -> ExtractedText:
+        text = _decode(body, response.charset_encoding)
+        content_type = response.headers.get("content-type", "text/html").split(";")[0].strip().lower()
+        if content_type in TEXT_CONTENT_TYPES:
+            return plain_text(text, settings.PAGE_TEXT_MAX_CHARS)
+        return extract_text(text, settings.PAGE_TEXT_MAX_CHARS)
+
+    def stats(self) -> Dict[str, Any]:
+        """Fetch counters, cache hit rate and bandwidth."""
+        served = self.counters["cache_hits"] + self.counters["revalidated"] + self.counters["downloads"]
+        hits = self.counters["cache_hits"] + self.counters["revalidated"]
+        return {
+            **self.counters,
+            "hit_rate": hits / served if served else 0.0
+        }
+
+# Shared fetcher; its client belongs to the application-scoped transport
+page_fetcher = PageFetcher()
@@ -1,14 +1,29 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Dict, List, Optional, Any
 
 class LLMProvider(ABC):
-    """Abstract base class for LLM providers."""
+    """Abstract base class for LLM providers.
+    
+    Provider methods must never block the event loop: use the SDK's async client
+    or the pooled HTTP transport.
+    
+    Failures are raised as ``app.llm.errors.ProviderError`` subclasses, never
+    returned as content.
+    """
     
     @abstractmethod
     async def generate_text(self, prompt: str, options: Dict[str, Any] = None) -> str:
         """Generate text based on prompt."""
         pass
     
+    async def stream_text(self, prompt: str, options: Dict[str, Any] = None) -> AsyncIterator[str]:
+        """Stream generated text as it is produced.
+        
+        Providers with a streaming API override this; the default yields the
+        complete ``generate_text`` result as a single chunk.
+        """
+        yield await self.generate_text(prompt, options)
+    
     @abstractmethod
     async def generate_image(self, prompt: str, options: Dict[str, Any] = None) -> str:
         """Generate image based on prompt and return URL."""
@@ -28,3 +43,36 @@ class LLMProvider(ABC):
     async def generate_prompt_ideas(self, analysis_data: Dict[str, Any], options: Dict[str, Any] = None) -> List[Dict[str, Any]]:
         """Generate prompt ideas based on analysis data."""
         pass
+
+class ProviderWrapper(LLMProvider):
+    """Base class for providers that decorate another provider.
+    
+    Every call is delegated to the wrapped provider unless a subclass overrides
+    it, and unknown attributes (``api_key``, ``client``...) are looked up on the
+    wrapped provider.
+    """
+    
+    def __init__(self, provider: LLMProvider, provider_name: str):
+        self.provider = provider
+        self.provider_name = provider_name
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.provider, name)
+    
+    async def generate_text(self, prompt: str, options: Dict[str, Any] = None) -> str:
+        return await self.provider.generate_text(prompt, options)
+    
+    def stream_text(self, prompt: str, options: Dict[str, Any] = None) -> AsyncIterator[str]:
+        return self.provider.stream_text(prompt, options)
+    
+    async def generate_image(self, prompt: str, options: Dict[str, Any] = None) -> str:
+        return await self.provider.generate_image(prompt, options)
+    
+    async def search_web(self, query: str, options: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        return await self.provider.search_web(query, options)
+    
+    async def analyze_competitor(self, url: str, analysis_type: str, options: Dict[str, Any] = None) -> Dict[str, Any]:
+        return await self.provider.analyze_competitor(url, analysis_type, options)
+    
+    async def generate_prompt_ideas(self, analysis_data: Dict[str, Any], options: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        return await self.provider.generate_prompt_ideas(analysis_data, options)
@@ -0,0 +1,204 @@
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete
+
+from app.core.config import settings
+from app.llm.base import LLMProvider, ProviderWrapper
+
+logger = logging.getLogger(__name__)
+
+# Option keys that control caching and never reach the provider
+CACHE_CONTROL_OPTIONS = ("cache", "cache_ttl")
+
+def build_cache_key(provider: str, operation: str, prompt: str, options: Optional[Dict[str, Any]]) -> str:
+    """
+    Build a cache key from a normalized request.
+
+    Options are sorted and stripped of cache controls and unset values, so
+    requests that differ only in key order or explicit ``None`` share a key.
+    """
+    normalized_options = {
+        key: value for key, value in (options or {}).items()
+        if key not in CACHE_CONTROL_OPTIONS and value is not None
+    }
+    payload = json.dumps(
+        {
+            "provider": provider.lower(),
+            "operation": operation,
+            "prompt": prompt.strip(),
+            "options": normalized_options
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def is_cacheable(operation: str, options: Optional[Dict[str, Any]]) -> bool:
+    """
+    Decide whether a call may be served from or stored in the cache.
+
+    ``options["cache"]`` forces the decision either way. Otherwise only text
+    generation with ``temperature`` explicitly set to 0 is cached, since any
+    other setting (including provider defaults) is non-deterministic.
+    """
+    options = options or {}
+    if options.get("cache") is not None:
+        return bool(options["cache"])
+    if operation != "generate_text":
+        return False
+    temperature = options.get("temperature")
+    return temperature is not None and float(temperature) == 0
+
+class LLMResponseCache:
+    """Two-tier cache of LLM responses: an in-memory LRU in front of a DB table.
+
+    The cache is best effort: a failed database read counts as a miss and a
+    failed write is skipped, so a broken cache table never fails an LLM call.
+    Expired rows are deleted while storing, at most every
+    ``LLM_CACHE_PURGE_INTERVAL`` seconds.
+    """
+
+    def __init__(self):
+        self._entries: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._purged_at = 0.0
+        self.counters = {"memory_hits": 0, "db_hits": 0, "misses": 0, "bypassed": 0, "db_errors": 0, "purged": 0}
+
+    def _get_memory(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at < time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _set_memory(self, key: str, value: Any, expires_at: float):
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > settings.LLM_CACHE_MAX_ENTRIES:
+            self._entries.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Look a key up in memory, then in the database; returns None on a miss."""
+        value = self._get_memory(key)
+        if value is not None:
+            self.counters["memory_hits"] += 1
+            return value
+
+        if settings.LLM_CACHE_PERSISTENT:
+            from app.db.session import AsyncSessionLocal
+            from app.models.models import LLMCacheEntry
+
+            try:
+                async with AsyncSessionLocal() as db:
+                    entry = await db.get(LLMCacheEntry, key)
+                    if entry is not None and entry.expires_at >= time.time():
+                        value = json.loads(entry.value)
+                        self._set_memory(key, value, entry.expires_at)
+                        self.counters["db_hits"] += 1
+                        return value
+            except Exception:
+                self.counters["db_errors"] += 1
+                logger.warning("LLM cache read failed; treating it as a miss", exc_info=True)
+
+        self.counters["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: Any, provider: str, operation: str, ttl: float):
+        """Store a value in both tiers."""
+        expires_at = time.time() + ttl
+        self._set_memory(key, value, expires_at)
+
+        if settings.LLM_CACHE_PERSISTENT:
+            from app.db.session import AsyncSessionLocal
+            from app.models.models import LLMCacheEntry
+
+            try:
+                async with AsyncSessionLocal() as db:
+                    await db.merge(LLMCacheEntry(
+                        key=key,
+                        provider=provider,
+                        operation=operation,
+                        value=json.dumps(value),
+                        expires_at=expires_at
+                    ))
+                    now = time.time()
+                    purge = now - self._purged_at >= settings.LLM_CACHE_PURGE_INTERVAL
+                    if purge:
+                        self._purged_at = now
+                        result = await db.execute(delete(LLMCacheEntry).where(LLMCacheEntry.expires_at < now))
+                    await db.commit()
+                    if purge:
+                        self.counters["purged"] += result.rowcount
+            except Exception:
+                self.counters["db_errors"] += 1
+                logger.warning("LLM cache write failed; skipping it", exc_info=True)
+
+    def clear(self):
+        """Drop the in-memory tier."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and the current in-memory size."""
+        lookups = self.counters["memory_hits"] + self.counters["db_hits"] + self.counters["misses"]
+        hits = self.counters["memory_hits"] + self.counters["db_hits"]
+        return {
+            **self.counters,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "memory_entries": len(self._entries)
+        }
+
+llm_response_cache = LLMResponseCache()
+
+def _is_empty_result(value: Any) -> bool:
+    """Providers raise on failure, but empty results must not be cached either."""
+    return not value
+
+class CachedProvider(ProviderWrapper):
+    """Provider wrapper that serves ``generate_text``, ``generate_image`` and ``search_web`` from the response cache.
+
+    Pass ``cache=False`` in the options to opt out, ``cache=True`` to cache a
+    non-deterministic call anyway, and ``cache_ttl`` (seconds) to override the
+    default TTL.
+    """
+
+    def __init__(self, provider: LLMProvider, provider_name: str, cache: LLMResponseCache = None):
+        super().__init__(provider, provider_name)
+        self.cache = cache or llm_response_cache
+
+    async def _cached_call(self, operation: str, prompt: str, options: Optional[Dict[str, Any]], call) -> Any:
+        provider_options = {
+            key: value for key, value in (options or {}).items() if key not in CACHE_CONTROL_OPTIONS
+        } if options else options
+
+        if not is_cacheable(operation, options):
+            self.cache.counters["bypassed"] += 1
+            return await call(prompt, provider_options)
+
+        key = build_cache_key(self.provider_name, operation, prompt, options)
+        cached = await self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        result = await call(prompt, provider_options)
+        if not _is_empty_result(result):
+            ttl = float((options or {}).get("cache_ttl") or settings.LLM_CACHE_TTL)
+            await self.cache.set(key, result, self.provider_name, operation, ttl)
+        return result
+
+    async def generate_text(self, prompt: str, options: Dict[str, Any] = None) -> str:
+        return await self._cached_call("generate_text", prompt, options, self.provider.generate_text)
+
+    async def generate_image(self, prompt: str, options: Dict[str, Any] = None) -> str:
+        return await self._cached_call("generate_image", prompt, options, self.provider.generate_image)
+
+    async def search_web(self, query: str, options: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        return await self._cached_call("search_web", query, options, self.provider.search_web)
@@ -0,0 +1,168 @@
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List
+
+from app.core.config import settings
+from app.llm.base import LLMProvider, ProviderWrapper
+from app.llm.errors import (
+    CircuitOpenError,
+    ProviderAuthError,
+    ProviderError,
+    ProviderUnavailableError,
+    is_upstream_error,
+    to_provider_error
+)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+def is_outage(error: ProviderError) -> bool:
+    """Whether an error says the provider itself is down, as opposed to a bad request or a rate limit."""
+    return isinstance(error, (ProviderUnavailableError, ProviderAuthError)) and not isinstance(error, CircuitOpenError)
+
+class CircuitBreaker:
+    """Closed/open/half-open circuit breaker for one provider.
+
+    After ``failure_threshold`` consecutive outage errors the circuit opens
+    and calls fail fast with ``CircuitOpenError``. Once ``reset_timeout``
+    seconds have passed it lets a single trial call through (half-open): a
+    success closes the circuit, an outage opens it again. Errors that show
+    the provider answered (bad request, unusable response, rate limit) count
+    as signs of life; exceptions from local code count as neither.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def is_open(self) -> bool:
+        """Whether calls would currently be rejected."""
+        if self.state == OPEN:
+            return time.monotonic() - self.opened_at < self.reset_timeout
+        return self.state == HALF_OPEN and self._trial_in_flight
+
+    def before_call(self):
+        """Admit a call or raise ``CircuitOpenError``."""
+        if self.state == OPEN:
+            remaining = self.reset_timeout - (time.monotonic() - self.opened_at)
+            if remaining > 0:
+                raise CircuitOpenError(self.name, remaining)
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN:
+            if self._trial_in_flight:
+                raise CircuitOpenError(self.name, self.reset_timeout)
+            self._trial_in_flight = True
+
+    def record_success(self):
+        self.state = CLOSED
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self, error: ProviderError):
+        """Count an error; only outages move the circuit towards open."""
+        if not is_outage(error):
+            self.record_success()
+            return
+        self._trial_in_flight = False
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def record_cancelled(self):
+        """Release a half-open trial slot taken by a call that was cancelled."""
+        self._trial_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {"state": self.state, "consecutive_failures": self.failures}
+
+class CircuitBreakerRegistry:
+    """One ``CircuitBreaker`` per provider, configured from settings."""
+
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, provider_name: str) -> CircuitBreaker:
+        breaker = self._breakers.get(provider_name)
+        if breaker is None:
+            breaker = self._breakers[provider_name] = CircuitBreaker(
+                provider_name,
+                failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+                reset_timeout=settings.CIRCUIT_RESET_TIMEOUT
+            )
+        return breaker
+
+    def is_open(self, provider_name: str) -> bool:
+        breaker = self._breakers.get(provider_name)
+        return breaker is not None and breaker.is_open
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: breaker.stats() for name, breaker in self._breakers.items()}
+
+circuit_breakers = CircuitBreakerRegistry()
+
+class CircuitBreakerProvider(ProviderWrapper):
+    """Provider wrapper that fails fast while the provider's circuit is open.
+
+    Also the point where every provider error becomes a typed ``ProviderError``,
+    including errors raised mid-stream by ``stream_text``.
+    """
+
+    def __init__(self, provider: LLMProvider, provider_name: str, breaker: CircuitBreaker):
+        super().__init__(provider, provider_name)
+        self.breaker = breaker
+
+    async def _guarded_call(self, call: Callable[[], Awaitable[Any]]) -> Any:
+        self.breaker.before_call()
+        try:
+            result = await call()
+        except Exception as e:
+            if not is_upstream_error(e):
+                self.breaker.record_cancelled()
+                raise
+            error = to_provider_error(e, self.provider_name)
+            self.breaker.record_failure(error)
+            raise error
+        except BaseException:
+            self.breaker.record_cancelled()
+            raise
+        self.breaker.record_success()
+        return result
+
+    async def generate_text(self, prompt: str, options: Dict[str, Any] = None) -> str:
+        return await self._guarded_call(lambda: self.provider.generate_text(prompt, options))
+
+    async def stream_text(self, prompt: str, options: Dict[str, Any] = None) -> AsyncIterator[str]:
+        self.breaker.before_call()
+        try:
+            async for chunk in self.provider.stream_text(prompt, options):
+                yield chunk
+        except Exception as e:
+            if not is_upstream_error(e):
+                self.breaker.record_cancelled()
+                raise
+            error = to_provider_error(e, self.provider_name)
+            self.breaker.record_failure(error)
+            raise error
+        except BaseException:
+            self.breaker.record_cancelled()
+            raise
+        self.breaker.record_success()
+
+    async def generate_image(self, prompt: str, options: Dict[str, Any] = None) -> str:
+        return await self._guarded_call(lambda: self.provider.generate_image(prompt, options))
+
+    async def search_web(self, query: str, options: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        return await self._guarded_call(lambda: self.provider.search_web(query, options))
+
+    async def analyze_competitor(self, url: str, analysis_type: str, options: Dict[str, Any] = None) -> Dict[str, Any]:
+        return await self._guarded_call(lambda: self.provider.analyze_competitor(url, analysis_type, options))
+
+    async def generate_prompt_ideas(self, analysis_data: Dict[str, Any], options: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        return await self._guarded_call(lambda: self.provider.generate_prompt_ideas(analysis_data, options))
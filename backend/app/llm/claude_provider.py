@@ -1,19 +1,41 @@
 import anthropic
-from typing import Dict, List, Any, Optional
+import httpx
+from typing import AsyncIterator, Dict, List, Any, Optional
 import json
 
 from app.llm.base import LLMProvider
+from app.llm.context import compact_json
+from app.llm.errors import ProviderResponseError, UnsupportedOperationError, to_provider_error
+from app.llm.json_stream import parse_json_array
+from app.llm.prompts import anthropic_prompt_caching_headers, anthropic_system_blocks, page_content_block, render_prompt
+from app.llm.transport import http_transport
 from app.core.config import settings
+from app.core.metrics import record_tokens
 
 class ClaudeProvider(LLMProvider):
     """Anthropic Claude implementation of LLM provider."""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, http_client: Optional[httpx.AsyncClient] = None):
         self.api_key = api_key or settings.ANTHROPIC_API_KEY
-        self.client = anthropic.Anthropic(api_key=self.api_key)
+        self.http_client = http_client or http_transport.get_client("claude")
+        self.client = anthropic.AsyncAnthropic(
+            api_key=self.api_key,
+            base_url=settings.ANTHROPIC_BASE_URL,
+            http_client=self.http_client,
+            timeout=self.http_client.timeout
+        )
+        
+    def _system_options(self, options: Dict[str, Any]) -> Dict[str, Any]:
+        """The system prompt is the static template prefix, marked with cache_control once it is long enough to cache."""
+        if not options.get("system"):
+            return {}
+        return {
+            "system": anthropic_system_blocks(options["system"]),
+            "extra_headers": anthropic_prompt_caching_headers(options["system"])
+        }
         
     async def generate_text(self, prompt: str, options: Dict[str, Any] = None) -> str:
-        """Generate text using Claude."""
+        """Generate text using Claude; ``options["system"]`` is sent as a cached system prompt."""
         options = options or {}
         
         model = options.get("model", "claude-3-sonnet-20240229")
@@ -27,16 +49,39 @@ class ClaudeProvider(LLMProvider):
                 temperature=temperature,
                 messages=[
                     {"role": "user", "content": prompt}
-                ]
+                ],
+                **self._system_options(options)
             )
+            record_tokens("claude", response.usage.input_tokens, response.usage.output_tokens)
             return response.content[0].text
         except Exception as e:
-            print(f"Error generating text with Claude: {e}")
-            return f"Error: {str(e)}"
+            raise to_provider_error(e, "claude")
+    
+    async def stream_text(self, prompt: str, options: Dict[str, Any] = None) -> AsyncIterator[str]:
+        """Stream text using Claude; ``options["system"]`` is sent as a cached system prompt."""
+        options = options or {}
+        
+        model = options.get("model", "claude-3-sonnet-20240229")
+        temperature = options.get("temperature", 0.7)
+        max_tokens = options.get("max_tokens", 1000)
+        
+        stream = await self.client.messages.create(
+            model=model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            messages=[
+                {"role": "user", "content": prompt}
+            ],
+            stream=True,
+            **self._system_options(options)
+        )
+        async for event in stream:
+            if event.type == "content_block_delta" and event.delta.text:
+                yield event.delta.text
     
     async def generate_image(self, prompt: str, options: Dict[str, Any] = None) -> str:
-        """Claude doesn't have native image generation, so we'll return an error."""
-        return "Error: Claude does not support image generation natively."
+        """Claude doesn't have native image generation."""
+        raise UnsupportedOperationError("Claude does not support image generation natively.", provider="claude")
     
     async def search_web(self, query: str, options: Dict[str, Any] = None) -> List[Dict[str, Any]]:
         """Search web using Claude's capabilities."""
@@ -67,8 +112,7 @@ class ClaudeProvider(LLMProvider):
             else:
                 return []
         except Exception as e:
-            print(f"Error searching web with Claude: {e}")
-            return []
+            raise to_provider_error(e, "claude")
     
     async def analyze_competitor(self, url: str, analysis_type: str, options: Dict[str, Any] = None) -> Dict[str, Any]:
         """Analyze competitor content using Claude."""
@@ -76,30 +120,15 @@ class ClaudeProvider(LLMProvider):
         
         model = options.get("model", "claude-3-opus-20240229")
         
-        prompt = f"""
-        Analyze the competitor content at {url}. Focus on {analysis_type} content.
-        
-        Provide a detailed analysis including:
-        1. Main content themes
-        2. Content strategy observations
-        3. Tone and style analysis
-        4. Target audience insights
-        5. Content gaps or opportunities
-        
-        Format your response as a JSON object with the following structure:
-        {{
-            "content_themes": [list of main themes with confidence scores],
-            "content_strategy": [list of strategy observations],
-            "tone_analysis": string description,
-            "target_audience": string description,
-            "opportunities": [list of content opportunities]
-        }}
-        
-        Return only the JSON object, nothing else.
-        """
+        prompt = render_prompt(
+            "analyze_competitor",
+            url=url,
+            analysis_type=analysis_type,
+            page_content=page_content_block(options.get("page_text"))
+        )
         
         try:
-            response = await self.generate_text(prompt, {"model": model, "max_tokens": 2000})
+            response = await self.generate_text(prompt.suffix, {"model": model, "max_tokens": 2000, "system": prompt.prefix})
             # Extract JSON from response
             start_idx = response.find('{')
             end_idx = response.rfind('}') + 1
@@ -109,15 +138,8 @@ class ClaudeProvider(LLMProvider):
                 return json.loads(json_str)
             else:
                 raise json.JSONDecodeError("No JSON found", response, 0)
-        except json.JSONDecodeError:
-            # Fallback if response is not valid JSON
-            return {
-                "content_themes": ["Error parsing response"],
-                "content_strategy": ["Error parsing response"],
-                "tone_analysis": "Error parsing response",
-                "target_audience": "Error parsing response",
-                "opportunities": ["Error parsing response"]
-            }
+        except json.JSONDecodeError as e:
+            raise ProviderResponseError(f"Claude returned an analysis that is not valid JSON: {e}", provider="claude") from e
     
     async def generate_prompt_ideas(self, analysis_data: Dict[str, Any], options: Dict[str, Any] = None) -> List[Dict[str, Any]]:
         """Generate prompt ideas based on analysis data."""
@@ -126,42 +148,11 @@ class ClaudeProvider(LLMProvider):
         model = options.get("model", "claude-3-opus-20240229")
         num_ideas = options.get("num_ideas", 5)
         
-        # Convert analysis data to string for prompt
-        analysis_str = json.dumps(analysis_data, indent=2)
-        
-        prompt = f"""
-        Based on the following competitor analysis, generate {num_ideas} creative prompt ideas for marketing content:
+        prompt = render_prompt("generate_prompt_ideas", num_ideas=num_ideas, analysis=compact_json(analysis_data))
         
-        {analysis_str}
-        
-        For each prompt idea:
-        1. Create a compelling prompt that would generate excellent marketing content
-        2. Assign a confidence score (0-100) based on how well it addresses the opportunities
-        3. Add a brief explanation of why this prompt would be effective
-        
-        Format your response as a JSON array of objects with the following structure:
-        [
-            {{
-                "prompt_text": "The complete prompt text",
-                "confidence_score": numeric score between 0-100,
-                "explanation": "Brief explanation of effectiveness"
-            }}
-        ]
-        
-        Return only the JSON array, nothing else.
-        """
-        
-        try:
-            response = await self.generate_text(prompt, {"model": model, "max_tokens": 2000})
-            # Extract JSON from response
-            start_idx = response.find('[')
-            end_idx = response.rfind(']') + 1
-            
-            if start_idx >= 0 and end_idx > start_idx:
-                json_str = response[start_idx:end_idx]
-                return json.loads(json_str)
-            else:
-                raise json.JSONDecodeError("No JSON found", response, 0)
-        except json.JSONDecodeError:
-            # Fallback if response is not valid JSON
-            return [{"prompt_text": "Error generating prompt ideas", "confidence_score": 0, "explanation": "Error parsing response"}]
+        response = await self.generate_text(prompt.suffix, {"model": model, "max_tokens": 2000, "system": prompt.prefix})
+        # Keeps every complete idea even if the completion was cut off
+        prompt_ideas = [idea for idea in parse_json_array(response) if isinstance(idea, dict)]
+        if not prompt_ideas:
+            raise ProviderResponseError("Claude returned no prompt ideas in valid JSON", provider="claude")
+        return prompt_ideas
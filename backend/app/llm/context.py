@@ -0,0 +1,182 @@
+import json
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+# Keys that only ever held parse-failure details, never analysis content
+PLACEHOLDER_KEYS = {"error", "raw_response", "raw_text"}
+# Values written by the old JSON-parse fallbacks and other non-answers
+PLACEHOLDER_VALUES = {"error parsing response", "n/a", "none", "null", "unknown", "not available"}
+
+# Keys holding a list of themes, ranked by confidence when trimming
+THEME_KEYS = ("content_themes",)
+CONFIDENCE_KEYS = ("confidence", "confidence_score", "score")
+
+# Strings are never cut shorter than this many characters
+MIN_STRING_LENGTH = 80
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    """The cl100k_base encoding, or None when tiktoken is missing or cannot load it."""
+    if not TIKTOKEN_AVAILABLE:
+        return None
+    try:
+        # Downloads the BPE file on first use, which fails on offline hosts
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+def load_encoding() -> bool:
+    """
+    Load the tokenizer ahead of the first request.
+
+    On a cold tiktoken cache this downloads the BPE file, which blocks; call it
+    from a worker thread at startup so requests never wait for the download.
+
+    Returns:
+        Whether the encoding is available (otherwise tokens are estimated)
+    """
+    return _get_encoding() is not None
+
+def count_tokens(text: str) -> int:
+    """Count tokens with tiktoken's cl100k_base encoding when available, else estimate ~4 characters per token."""
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return (len(text) + 3) // 4
+
+def compact_json(data: Any) -> str:
+    """Serialize without indentation or spaces after separators."""
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=str)
+
+def _is_placeholder(value: Any) -> bool:
+    if value is None:
+        return True
+    if isinstance(value, str):
+        text = value.strip()
+        return not text or text.lower() in PLACEHOLDER_VALUES or text.lower().startswith("error:")
+    if isinstance(value, (list, dict)):
+        return not value
+    return False
+
+def _clean(value: Any) -> Any:
+    """Recursively drop empty and placeholder values, returning new containers."""
+    if isinstance(value, dict):
+        cleaned = {
+            key: _clean(item) for key, item in value.items()
+            if key not in PLACEHOLDER_KEYS
+        }
+        return {key: item for key, item in cleaned.items() if not _is_placeholder(item)}
+    if isinstance(value, list):
+        cleaned = [_clean(item) for item in value]
+        return [item for item in cleaned if not _is_placeholder(item)]
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+def _confidence(theme: Any) -> float:
+    if isinstance(theme, dict):
+        for key in CONFIDENCE_KEYS:
+            try:
+                return float(theme[key])
+            except (KeyError, TypeError, ValueError):
+                continue
+    return 0.0
+
+def get_context_budget(provider_name: Optional[str]) -> int:
+    """Token budget for the analysis context sent to a provider."""
+    return int(settings.PROVIDER_CONTEXT_TOKEN_BUDGETS.get(provider_name or "", settings.PROMPT_CONTEXT_TOKEN_BUDGET))
+
+class AnalysisContext:
+    """An analysis prepared for a prompt, with its token cost before and after compaction."""
+
+    def __init__(self, data: Dict[str, Any], text: str, tokens: int, original_tokens: int, trimmed: bool):
+        self.data = data
+        self.text = text
+        self.tokens = tokens
+        self.original_tokens = original_tokens
+        self.trimmed = trimmed
+
+    @property
+    def saved_tokens(self) -> int:
+        return max(self.original_tokens - self.tokens, 0)
+
+def _trim_step(data: Dict[str, Any]) -> bool:
+    """
+    Make the single cut that frees the most text: drop the last item of a
+    list (themes are sorted, so that is the weakest theme) or halve a long
+    string. Returns False when nothing is left to trim.
+    """
+    best_key, best_saving = None, 0
+    for key, value in data.items():
+        if isinstance(value, list) and len(value) > 1:
+            saving = len(compact_json(value[-1]))
+        elif isinstance(value, str) and len(value) > MIN_STRING_LENGTH:
+            saving = len(value) - max(len(value) // 2, MIN_STRING_LENGTH)
+        else:
+            continue
+        if saving > best_saving:
+            best_key, best_saving = key, saving
+    if best_key is None:
+        return False
+    value = data[best_key]
+    if isinstance(value, list):
+        value.pop()
+    else:
+        data[best_key] = value[:max(len(value) // 2, MIN_STRING_LENGTH)].rstrip() + "..."
+    return True
+
+def build_analysis_context(
+    analysis_data: Dict[str, Any],
+    provider_name: Optional[str] = None,
+    budget: Optional[int] = None
+) -> AnalysisContext:
+    """
+    Prepare a stored analysis for a prompt-ideas prompt.
+
+    Drops empty and placeholder fields, orders themes by confidence, serializes
+    compactly and, while over the token budget, cuts the weakest list items
+    (lowest-confidence themes first) or halves long strings.
+
+    Args:
+        analysis_data: Analysis as stored (``CompetitorAnalysis.analysis_data``)
+        provider_name: Provider the prompt is for, selecting its budget
+        budget: Token budget overriding the configured one
+
+    Returns:
+        The compacted context and its token counts
+    """
+    original_tokens = count_tokens(json.dumps(analysis_data, indent=2, default=str))
+    data = _clean(analysis_data)
+    for key in THEME_KEYS:
+        if isinstance(data.get(key), list):
+            data[key].sort(key=_confidence, reverse=True)
+
+    budget = budget if budget is not None else get_context_budget(provider_name)
+    text = compact_json(data)
+    tokens = count_tokens(text)
+    trimmed = False
+    while tokens > budget and _trim_step(data):
+        trimmed = True
+        text = compact_json(data)
+        tokens = count_tokens(text)
+
+    return AnalysisContext(data, text, tokens, original_tokens, trimmed)
+
+def build_analysis_contexts(analysis_data: Dict[str, Any]) -> Dict[int, AnalysisContext]:
+    """
+    Compact an analysis once for every configured budget, keyed by budget.
+
+    Lets callers prepare the context for any provider before routing, so a
+    failure here is never mistaken for a provider failure.
+    """
+    budgets = {int(settings.PROMPT_CONTEXT_TOKEN_BUDGET)}
+    budgets.update(int(budget) for budget in settings.PROVIDER_CONTEXT_TOKEN_BUDGETS.values())
+    return {budget: build_analysis_context(analysis_data, budget=budget) for budget in budgets}
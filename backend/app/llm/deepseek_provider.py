@@ -1,44 +1,83 @@
+import httpx
 import openai
-from typing import Dict, List, Any, Optional
+from typing import AsyncIterator, Dict, List, Any, Optional
 import json
 
 from app.llm.base import LLMProvider
+from app.llm.context import compact_json
+from app.llm.errors import ProviderResponseError, UnsupportedOperationError, to_provider_error
+from app.llm.json_stream import parse_json_array
+from app.llm.prompts import page_content_block, render_prompt
+from app.llm.transport import http_transport
 from app.core.config import settings
+from app.core.metrics import record_tokens
 
 class DeepSeekProvider(LLMProvider):
     """DeepSeek implementation of LLM provider."""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, http_client: Optional[httpx.AsyncClient] = None):
         self.api_key = api_key or settings.DEEPSEEK_API_KEY
+        self.http_client = http_client or http_transport.get_client("deepseek")
         # DeepSeek uses OpenAI-compatible API format
-        self.client = openai.OpenAI(
+        self.client = openai.AsyncOpenAI(
             api_key=self.api_key,
-            base_url="https://api.deepseek.com/v1"  # DeepSeek API endpoint
+            base_url=settings.DEEPSEEK_BASE_URL,
+            http_client=self.http_client,
+            timeout=self.http_client.timeout
         )
         
     async def generate_text(self, prompt: str, options: Dict[str, Any] = None) -> str:
-        """Generate text using DeepSeek."""
+        """Generate text using DeepSeek; ``options["system"]`` is sent as the system message."""
         options = options or {}
         
         model = options.get("model", "deepseek-chat")
         temperature = options.get("temperature", 0.7)
         max_tokens = options.get("max_tokens", 1000)
         
+        # A stable system message first lets the API reuse its cached prompt prefix
+        messages = [{"role": "user", "content": prompt}]
+        if options.get("system"):
+            messages.insert(0, {"role": "system", "content": options["system"]})
+        
         try:
             response = await self.client.chat.completions.create(
                 model=model,
-                messages=[{"role": "user", "content": prompt}],
+                messages=messages,
                 temperature=temperature,
                 max_tokens=max_tokens
             )
+            if response.usage:
+                record_tokens("deepseek", response.usage.prompt_tokens, response.usage.completion_tokens)
             return response.choices[0].message.content
         except Exception as e:
-            print(f"Error generating text with DeepSeek: {e}")
-            return f"Error: {str(e)}"
+            raise to_provider_error(e, "deepseek")
+    
+    async def stream_text(self, prompt: str, options: Dict[str, Any] = None) -> AsyncIterator[str]:
+        """Stream text using DeepSeek; ``options["system"]`` is sent as the system message."""
+        options = options or {}
+        
+        model = options.get("model", "deepseek-chat")
+        temperature = options.get("temperature", 0.7)
+        max_tokens = options.get("max_tokens", 1000)
+        
+        messages = [{"role": "user", "content": prompt}]
+        if options.get("system"):
+            messages.insert(0, {"role": "system", "content": options["system"]})
+        
+        stream = await self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
     
     async def generate_image(self, prompt: str, options: Dict[str, Any] = None) -> str:
-        """DeepSeek may not have native image generation, so we'll return an error."""
-        return "Error: DeepSeek does not support image generation through this integration."
+        """DeepSeek may not have native image generation."""
+        raise UnsupportedOperationError("DeepSeek does not support image generation through this integration.", provider="deepseek")
     
     async def search_web(self, query: str, options: Dict[str, Any] = None) -> List[Dict[str, Any]]:
         """Search web using DeepSeek's capabilities."""
@@ -68,8 +107,7 @@ class DeepSeekProvider(LLMProvider):
             else:
                 return []
         except Exception as e:
-            print(f"Error searching web with DeepSeek: {e}")
-            return []
+            raise to_provider_error(e, "deepseek")
     
     async def analyze_competitor(self, url: str, analysis_type: str, options: Dict[str, Any] = None) -> Dict[str, Any]:
         """Analyze competitor content using DeepSeek."""
@@ -77,30 +115,15 @@ class DeepSeekProvider(LLMProvider):
         
         model = options.get("model", "deepseek-chat")
         
-        prompt = f"""
-        Analyze the competitor content at {url}. Focus on {analysis_type} content.
-        
-        Provide a detailed analysis including:
-        1. Main content themes
-        2. Content strategy observations
-        3. Tone and style analysis
-        4. Target audience insights
-        5. Content gaps or opportunities
-        
-        Format your response as a JSON object with the following structure:
-        {{
-            "content_themes": [list of main themes with confidence scores],
-            "content_strategy": [list of strategy observations],
-            "tone_analysis": string description,
-            "target_audience": string description,
-            "opportunities": [list of content opportunities]
-        }}
-        
-        Return only the JSON object, nothing else.
-        """
+        prompt = render_prompt(
+            "analyze_competitor",
+            url=url,
+            analysis_type=analysis_type,
+            page_content=page_content_block(options.get("page_text"))
+        )
         
         try:
-            response = await self.generate_text(prompt, {"model": model, "max_tokens": 2000})
+            response = await self.generate_text(prompt.suffix, {"model": model, "max_tokens": 2000, "system": prompt.prefix})
             # Extract JSON from response
             start_idx = response.find('{')
             end_idx = response.rfind('}') + 1
@@ -110,15 +133,8 @@ class DeepSeekProvider(LLMProvider):
                 return json.loads(json_str)
             else:
                 raise json.JSONDecodeError("No JSON found", response, 0)
-        except json.JSONDecodeError:
-            # Fallback if response is not valid JSON
-            return {
-                "content_themes": ["Error parsing response"],
-                "content_strategy": ["Error parsing response"],
-                "tone_analysis": "Error parsing response",
-                "target_audience": "Error parsing response",
-                "opportunities": ["Error parsing response"]
-            }
+        except json.JSONDecodeError as e:
+            raise ProviderResponseError(f"DeepSeek returned an analysis that is not valid JSON: {e}", provider="deepseek") from e
     
     async def generate_prompt_ideas(self, analysis_data: Dict[str, Any], options: Dict[str, Any] = None) -> List[Dict[str, Any]]:
         """Generate prompt ideas based on analysis data."""
@@ -127,42 +143,11 @@ class DeepSeekProvider(LLMProvider):
         model = options.get("model", "deepseek-chat")
         num_ideas = options.get("num_ideas", 5)
         
-        # Convert analysis data to string for prompt
-        analysis_str = json.dumps(analysis_data, indent=2)
+        prompt = render_prompt("generate_prompt_ideas", num_ideas=num_ideas, analysis=compact_json(analysis_data))
         
-        prompt = f"""
-        Based on the following competitor analysis, generate {num_ideas} creative prompt ideas for marketing content:
-        
-        {analysis_str}
-        
-        For each prompt idea:
-        1. Create a compelling prompt that would generate excellent marketing content
-        2. Assign a confidence score (0-100) based on how well it addresses the opportunities
-        3. Add a brief explanation of why this prompt would be effective
-        
-        Format your response as a JSON array of objects with the following structure:
-        [
-            {{
-                "prompt_text": "The complete prompt text",
-                "confidence_score": numeric score between 0-100,
-                "explanation": "Brief explanation of effectiveness"
-            }}
-        ]
-        
-        Return only the JSON array, nothing else.
-        """
-        
-        try:
-            response = await self.generate_text(prompt, {"model": model, "max_tokens": 2000})
-            # Extract JSON from response
-            start_idx = response.find('[')
-            end_idx = response.rfind(']') + 1
-            
-            if start_idx >= 0 and end_idx > start_idx:
-                json_str = response[start_idx:end_idx]
-                return json.loads(json_str)
-            else:
-                raise json.JSONDecodeError("No JSON found", response, 0)
-        except json.JSONDecodeError:
-            # Fallback if response is not valid JSON
-            return [{"prompt_text": "Error generating prompt ideas", "confidence_score": 0, "explanation": "Error parsing response"}]
+        response = await self.generate_text(prompt.suffix, {"model": model, "max_tokens": 2000, "system": prompt.prefix})
+        # Keeps every complete idea even if the completion was cut off
+        prompt_ideas = [idea for idea in parse_json_array(response) if isinstance(idea, dict)]
+        if not prompt_ideas:
+            raise ProviderResponseError("DeepSeek returned no prompt ideas in valid JSON", provider="deepseek")
+        return prompt_ideas
@@ -0,0 +1,145 @@
+import asyncio
+import json
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Optional
+
+import anthropic
+import httpx
+import openai
+
+class ProviderError(Exception):
+    """Base class for errors raised by LLM providers.
+
+    ``status_code`` is the upstream HTTP status, if any; ``http_status`` is
+    the status the API answers with when the error reaches an endpoint.
+    """
+
+    http_status = 502
+
+    def __init__(self, message: str, provider: Optional[str] = None, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.provider = provider
+        self.status_code = status_code
+
+class ProviderUnavailableError(ProviderError):
+    """The provider could not be reached, timed out or failed with a 5xx."""
+
+    http_status = 503
+
+class ProviderAuthError(ProviderError):
+    """The provider rejected the API key (HTTP 401/403)."""
+
+class ProviderResponseError(ProviderError):
+    """The provider answered, but with something that could not be used."""
+
+class UnsupportedOperationError(ProviderError):
+    """The provider does not implement the requested operation."""
+
+    http_status = 400
+
+class RateLimitError(ProviderError):
+    """The provider rejected a call because a rate limit was exceeded (HTTP 429).
+
+    ``retry_after`` is the delay in seconds the provider asked for, if any.
+    """
+
+    http_status = 429
+
+    def __init__(self, message: str, provider: Optional[str] = None, retry_after: Optional[float] = None):
+        super().__init__(message, provider, status_code=429)
+        self.retry_after = retry_after
+
+class CircuitOpenError(ProviderUnavailableError):
+    """Calls are failing fast because the provider's circuit breaker is open."""
+
+    def __init__(self, provider: str, retry_after: float):
+        super().__init__(f"{provider} is unavailable; retry in {retry_after:.0f}s", provider)
+        self.retry_after = retry_after
+
+# Exceptions raised by SDK and HTTP calls; anything else is a bug on our side
+UPSTREAM_ERRORS = (ProviderError, httpx.HTTPError, openai.APIError, anthropic.APIError, asyncio.TimeoutError, ConnectionError)
+
+def is_upstream_error(error: BaseException) -> bool:
+    """Whether an exception came from calling a provider, as opposed to local code."""
+    return isinstance(error, UPSTREAM_ERRORS)
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a ``Retry-After`` header given in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+def _retry_after_from_headers(headers: Any) -> Optional[float]:
+    if headers is None:
+        return None
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return max(float(retry_after_ms) / 1000, 0.0)
+        except ValueError:
+            pass
+    return parse_retry_after(headers.get("retry-after"))
+
+def _error_for_status(message: str, provider: str, status_code: int, headers: Any = None) -> ProviderError:
+    if status_code == 429:
+        return RateLimitError(message, provider, retry_after=_retry_after_from_headers(headers))
+    if status_code in (401, 403):
+        return ProviderAuthError(message, provider, status_code)
+    if status_code >= 500:
+        return ProviderUnavailableError(message, provider, status_code)
+    return ProviderError(message, provider, status_code)
+
+def raise_for_rate_limit(response: httpx.Response, provider: str):
+    """Raise ``RateLimitError`` if an HTTP response is a 429."""
+    if response.status_code == 429:
+        raise _error_for_status(f"{provider} rate limit exceeded", provider, 429, response.headers)
+
+def raise_for_status(response: httpx.Response, provider: str):
+    """Raise the matching ``ProviderError`` if an HTTP response is not a success."""
+    if response.status_code >= 400:
+        raise _error_for_status(
+            f"{provider} API returned status code {response.status_code}",
+            provider,
+            response.status_code,
+            response.headers
+        )
+
+def to_provider_error(error: Exception, provider: str) -> ProviderError:
+    """
+    Translate an exception caught from an SDK or HTTP call into a ``ProviderError``.
+
+    HTTP status errors (httpx and the OpenAI/Anthropic SDKs) map to a type by
+    status code; connection failures and timeouts become
+    ``ProviderUnavailableError`` and undecodable responses
+    ``ProviderResponseError``. The original exception is kept as the cause.
+    """
+    if isinstance(error, ProviderError):
+        return error
+
+    message = str(error) or error.__class__.__name__
+    response = getattr(error, "response", None)
+    status_code = getattr(error, "status_code", None) or getattr(response, "status_code", None)
+    if isinstance(status_code, int):
+        converted = _error_for_status(message, provider, status_code, getattr(response, "headers", None))
+    elif isinstance(error, (
+        httpx.TransportError,
+        openai.APIConnectionError,
+        anthropic.APIConnectionError,
+        asyncio.TimeoutError,
+        ConnectionError
+    )):
+        converted = ProviderUnavailableError(message, provider)
+    elif isinstance(error, (json.JSONDecodeError, KeyError, IndexError, TypeError)):
+        converted = ProviderResponseError(message, provider)
+    else:
+        converted = ProviderError(message, provider)
+    converted.__cause__ = error
+    return converted
@@ -1,19 +1,51 @@
-from typing import Dict, List, Any, Optional
+import hashlib
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple
 from app.llm.base import LLMProvider
+from app.llm.cache import CachedProvider
+from app.llm.circuit import CircuitBreakerProvider, circuit_breakers
+from app.llm.metrics import MetricsProvider
+from app.llm.ratelimit import RateLimitedProvider, rate_limiters
+from app.llm.singleflight import CoalescingProvider, SingleFlight
 from app.llm.openai_provider import OpenAIProvider
 from app.llm.claude_provider import ClaudeProvider
 from app.llm.gemini_provider import GeminiProvider
 from app.llm.deepseek_provider import DeepSeekProvider
 from app.llm.manus_provider import ManusProvider
+from app.llm.transport import http_transport
+from app.core.config import settings
 
 class LLMFactory:
     """Factory class for creating LLM provider instances."""
     
+    provider_map = {
+        "openai": OpenAIProvider,
+        "claude": ClaudeProvider,
+        "gemini": GeminiProvider,
+        "deepseek": DeepSeekProvider,
+        "manus": ManusProvider
+    }
+    
+    # Shared by every provider instance so identical in-flight text generations coalesce
+    text_flights = SingleFlight()
+    
+    # Bounded LRU cache of provider instances keyed by (provider, key fingerprint)
+    _cache: "OrderedDict[Tuple[str, str], LLMProvider]" = OrderedDict()
+    
     @staticmethod
-    def get_provider(provider_name: str, api_key: Optional[str] = None) -> LLMProvider:
+    def _fingerprint(api_key: Optional[str]) -> str:
+        """Fingerprint an API key so raw keys are never used as cache keys."""
+        return hashlib.sha256((api_key or "").encode()).hexdigest()[:16]
+    
+    @classmethod
+    def get_provider(cls, provider_name: str, api_key: Optional[str] = None) -> LLMProvider:
         """
         Get an LLM provider instance based on the provider name.
         
+        Instances are cached per (provider, API key fingerprint) so their SDK
+        clients are reused across requests. Seeing a new key for a provider
+        evicts the instances built with its previous key.
+        
         Args:
             provider_name: Name of the LLM provider
             api_key: Optional API key (if not provided, will use from settings)
@@ -21,16 +53,48 @@ class LLMFactory:
         Returns:
             An instance of the specified LLM provider
         """
-        provider_map = {
-            "openai": OpenAIProvider,
-            "claude": ClaudeProvider,
-            "gemini": GeminiProvider,
-            "deepseek": DeepSeekProvider,
-            "manus": ManusProvider
-        }
-        
-        if provider_name.lower() not in provider_map:
+        provider_name = provider_name.lower()
+        if provider_name not in cls.provider_map:
             raise ValueError(f"Unsupported provider: {provider_name}")
         
-        provider_class = provider_map[provider_name.lower()]
-        return provider_class(api_key=api_key)
+        cache_key = (provider_name, cls._fingerprint(api_key))
+        provider = cls._cache.get(cache_key)
+        if provider is not None:
+            cls._cache.move_to_end(cache_key)
+            return provider
+        
+        # Key rotation: drop instances holding a stale key for this provider
+        cls.invalidate(provider_name)
+        
+        provider_class = cls.provider_map[provider_name]
+        provider = provider_class(api_key=api_key, http_client=http_transport.get_client(provider_name))
+        if settings.METRICS_ENABLED:
+            provider = MetricsProvider(provider, provider_name)
+        if settings.RATE_LIMIT_ENABLED:
+            # Innermost, so cache hits and coalesced calls do not use up the budget.
+            # Limiters outlive cached instances, keeping their learned concurrency.
+            provider = RateLimitedProvider(provider, provider_name, rate_limiters.get(*cache_key))
+        if settings.CIRCUIT_BREAKER_ENABLED:
+            # Outside the limiter, so calls fail fast instead of queueing for a dead provider
+            provider = CircuitBreakerProvider(provider, provider_name, circuit_breakers.get(provider_name))
+        if settings.LLM_CACHE_ENABLED:
+            provider = CachedProvider(provider, provider_name)
+        provider = CoalescingProvider(provider, provider_name, cls.text_flights)
+        cls._cache[cache_key] = provider
+        while len(cls._cache) > settings.LLM_PROVIDER_CACHE_SIZE:
+            cls._cache.popitem(last=False)
+        return provider
+    
+    @classmethod
+    def invalidate(cls, provider_name: Optional[str] = None):
+        """
+        Evict cached provider instances.
+        
+        Args:
+            provider_name: Provider to evict, or None to clear the whole cache
+        """
+        if provider_name is None:
+            cls._cache.clear()
+            return
+        for cache_key in [key for key in cls._cache if key[0] == provider_name.lower()]:
+            del cls._cache[cache_key]
@@ -1,19 +1,84 @@
-import google.generativeai as genai
-from typing import Dict, List, Any, Optional
+import httpx
+from typing import AsyncIterator, Dict, List, Any, Optional
 import json
 
 from app.llm.base import LLMProvider
+from app.llm.context import compact_json
+from app.llm.errors import ProviderResponseError, UnsupportedOperationError, raise_for_status, to_provider_error
+from app.llm.json_stream import parse_json_array
+from app.llm.prompts import page_content_block, render_prompt
+from app.llm.transport import http_transport, iter_sse_data
 from app.core.config import settings
+from app.core.metrics import record_tokens
 
 class GeminiProvider(LLMProvider):
     """Google Gemini implementation of LLM provider."""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, http_client: Optional[httpx.AsyncClient] = None):
         self.api_key = api_key or settings.GEMINI_API_KEY
-        genai.configure(api_key=self.api_key)
+        self.api_url = settings.GEMINI_BASE_URL
+        self.http_client = http_client or http_transport.get_client("gemini")
+        self.headers = {
+            "x-goog-api-key": self.api_key,
+            "Content-Type": "application/json"
+        }
+    
+    async def _generate_content(
+        self,
+        model_name: str,
+        contents: List[str],
+        generation_config: Dict[str, Any],
+        system_instruction: Optional[str] = None
+    ) -> str:
+        """Call the Gemini generateContent REST endpoint and return the response text."""
+        body = {
+            "contents": [{"role": "user", "parts": [{"text": text} for text in contents]}],
+            "generationConfig": generation_config
+        }
+        if system_instruction:
+            body["systemInstruction"] = {"parts": [{"text": system_instruction}]}
+        response = await self.http_client.post(
+            f"{self.api_url}/models/{model_name}:generateContent",
+            headers=self.headers,
+            json=body
+        )
+        raise_for_status(response, "gemini")
+        result = response.json()
+        usage = result.get("usageMetadata", {})
+        record_tokens("gemini", usage.get("promptTokenCount"), usage.get("candidatesTokenCount"))
+        parts = result["candidates"][0]["content"]["parts"]
+        return "".join(part.get("text", "") for part in parts)
+    
+    async def _stream_content(
+        self,
+        model_name: str,
+        contents: List[str],
+        generation_config: Dict[str, Any],
+        system_instruction: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """Call the Gemini streamGenerateContent REST endpoint and yield text chunks."""
+        body = {
+            "contents": [{"role": "user", "parts": [{"text": text} for text in contents]}],
+            "generationConfig": generation_config
+        }
+        if system_instruction:
+            body["systemInstruction"] = {"parts": [{"text": system_instruction}]}
+        async with self.http_client.stream(
+            "POST",
+            f"{self.api_url}/models/{model_name}:streamGenerateContent",
+            params={"alt": "sse"},
+            headers=self.headers,
+            json=body
+        ) as response:
+            raise_for_status(response, "gemini")
+            async for data in iter_sse_data(response):
+                for candidate in json.loads(data).get("candidates", [])[:1]:
+                    for part in candidate.get("content", {}).get("parts", []):
+                        if part.get("text"):
+                            yield part["text"]
         
     async def generate_text(self, prompt: str, options: Dict[str, Any] = None) -> str:
-        """Generate text using Gemini."""
+        """Generate text using Gemini; ``options["system"]`` is sent as the system instruction."""
         options = options or {}
         
         model_name = options.get("model", "gemini-1.5-pro")
@@ -21,68 +86,64 @@ class GeminiProvider(LLMProvider):
         max_tokens = options.get("max_tokens", 1000)
         
         try:
-            model = genai.GenerativeModel(model_name=model_name)
-            response = model.generate_content(
-                prompt,
-                generation_config=genai.GenerationConfig(
-                    temperature=temperature,
-                    max_output_tokens=max_tokens
-                )
+            return await self._generate_content(
+                model_name,
+                [prompt],
+                {"temperature": temperature, "maxOutputTokens": max_tokens},
+                system_instruction=options.get("system")
             )
-            return response.text
         except Exception as e:
-            print(f"Error generating text with Gemini: {e}")
-            return f"Error: {str(e)}"
+            raise to_provider_error(e, "gemini")
     
-    async def generate_image(self, prompt: str, options: Dict[str, Any] = None) -> str:
-        """Generate image using Gemini's image generation capabilities."""
+    async def stream_text(self, prompt: str, options: Dict[str, Any] = None) -> AsyncIterator[str]:
+        """Stream text using Gemini; ``options["system"]`` is sent as the system instruction."""
         options = options or {}
         
-        try:
-            # Note: This is a placeholder as Gemini's image generation API might change
-            # Adjust implementation based on the latest Gemini API documentation
-            model = genai.GenerativeModel(model_name="gemini-1.5-pro-vision")
-            response = model.generate_content(
-                [prompt, "Generate an image based on this description."],
-                generation_config=genai.GenerationConfig(
-                    temperature=0.7
-                )
-            )
-            # This is a placeholder - actual implementation would depend on how Gemini returns image URLs
-            return "Image generation with Gemini is not fully implemented yet."
-        except Exception as e:
-            print(f"Error generating image with Gemini: {e}")
-            return f"Error: {str(e)}"
+        model_name = options.get("model", "gemini-1.5-pro")
+        temperature = options.get("temperature", 0.7)
+        max_tokens = options.get("max_tokens", 1000)
+        
+        async for chunk in self._stream_content(
+            model_name,
+            [prompt],
+            {"temperature": temperature, "maxOutputTokens": max_tokens},
+            system_instruction=options.get("system")
+        ):
+            yield chunk
+    
+    async def generate_image(self, prompt: str, options: Dict[str, Any] = None) -> str:
+        """Generate image using Gemini's image generation capabilities."""
+        # Gemini image output is not wired up yet: the vision model call this used
+        # to make returned no image, so fail without spending a request
+        raise UnsupportedOperationError("Image generation with Gemini is not fully implemented yet.", provider="gemini")
     
     async def search_web(self, query: str, options: Dict[str, Any] = None) -> List[Dict[str, Any]]:
         """Search web using Gemini's web search capabilities."""
         options = options or {}
         
         try:
-            model = genai.GenerativeModel(model_name="gemini-1.5-pro")
-            response = model.generate_content(
-                f"""
-                Search the web for: {query}
-                
-                Return the search results as a JSON array of objects with the following structure:
+            content = await self._generate_content(
+                "gemini-1.5-pro",
                 [
-                    {{
-                        "title": "Result title",
-                        "url": "Result URL",
-                        "snippet": "Brief description or snippet from the result"
-                    }}
-                ]
-                
-                Return only the JSON array, nothing else.
-                """,
-                generation_config=genai.GenerationConfig(
-                    temperature=0.2,
-                    max_output_tokens=2000
-                )
+                    f"""
+                    Search the web for: {query}
+                    
+                    Return the search results as a JSON array of objects with the following structure:
+                    [
+                        {{
+                            "title": "Result title",
+                            "url": "Result URL",
+                            "snippet": "Brief description or snippet from the result"
+                        }}
+                    ]
+                    
+                    Return only the JSON array, nothing else.
+                    """
+                ],
+                {"temperature": 0.2, "maxOutputTokens": 2000}
             )
             
             # Extract JSON from response
-            content = response.text
             start_idx = content.find('[')
             end_idx = content.rfind(']') + 1
             
@@ -92,45 +153,27 @@ class GeminiProvider(LLMProvider):
             else:
                 return []
         except Exception as e:
-            print(f"Error searching web with Gemini: {e}")
-            return []
+            raise to_provider_error(e, "gemini")
     
     async def analyze_competitor(self, url: str, analysis_type: str, options: Dict[str, Any] = None) -> Dict[str, Any]:
         """Analyze competitor content using Gemini."""
         options = options or {}
         
         try:
-            model = genai.GenerativeModel(model_name="gemini-1.5-pro")
-            response = model.generate_content(
-                f"""
-                Analyze the competitor content at {url}. Focus on {analysis_type} content.
-                
-                Provide a detailed analysis including:
-                1. Main content themes
-                2. Content strategy observations
-                3. Tone and style analysis
-                4. Target audience insights
-                5. Content gaps or opportunities
-                
-                Format your response as a JSON object with the following structure:
-                {{
-                    "content_themes": [list of main themes with confidence scores],
-                    "content_strategy": [list of strategy observations],
-                    "tone_analysis": string description,
-                    "target_audience": string description,
-                    "opportunities": [list of content opportunities]
-                }}
-                
-                Return only the JSON object, nothing else.
-                """,
-                generation_config=genai.GenerationConfig(
-                    temperature=0.2,
-                    max_output_tokens=2000
-                )
+            prompt = render_prompt(
+                "analyze_competitor",
+                url=url,
+                analysis_type=analysis_type,
+                page_content=page_content_block(options.get("page_text"))
+            )
+            content = await self._generate_content(
+                "gemini-1.5-pro",
+                [prompt.suffix],
+                {"temperature": 0.2, "maxOutputTokens": 2000},
+                system_instruction=prompt.prefix
             )
             
             # Extract JSON from response
-            content = response.text
             start_idx = content.find('{')
             end_idx = content.rfind('}') + 1
             
@@ -139,15 +182,10 @@ class GeminiProvider(LLMProvider):
                 return json.loads(json_str)
             else:
                 raise json.JSONDecodeError("No JSON found", content, 0)
-        except json.JSONDecodeError:
-            # Fallback if response is not valid JSON
-            return {
-                "content_themes": ["Error parsing response"],
-                "content_strategy": ["Error parsing response"],
-                "tone_analysis": "Error parsing response",
-                "target_audience": "Error parsing response",
-                "opportunities": ["Error parsing response"]
-            }
+        except json.JSONDecodeError as e:
+            raise ProviderResponseError(f"Gemini returned an analysis that is not valid JSON: {e}", provider="gemini") from e
+        except Exception as e:
+            raise to_provider_error(e, "gemini")
     
     async def generate_prompt_ideas(self, analysis_data: Dict[str, Any], options: Dict[str, Any] = None) -> List[Dict[str, Any]]:
         """Generate prompt ideas based on analysis data."""
@@ -155,49 +193,19 @@ class GeminiProvider(LLMProvider):
         
         num_ideas = options.get("num_ideas", 5)
         
-        # Convert analysis data to string for prompt
-        analysis_str = json.dumps(analysis_data, indent=2)
+        prompt = render_prompt("generate_prompt_ideas", num_ideas=num_ideas, analysis=compact_json(analysis_data))
         
         try:
-            model = genai.GenerativeModel(model_name="gemini-1.5-pro")
-            response = model.generate_content(
-                f"""
-                Based on the following competitor analysis, generate {num_ideas} creative prompt ideas for marketing content:
-                
-                {analysis_str}
-                
-                For each prompt idea:
-                1. Create a compelling prompt that would generate excellent marketing content
-                2. Assign a confidence score (0-100) based on how well it addresses the opportunities
-                3. Add a brief explanation of why this prompt would be effective
-                
-                Format your response as a JSON array of objects with the following structure:
-                [
-                    {{
-                        "prompt_text": "The complete prompt text",
-                        "confidence_score": numeric score between 0-100,
-                        "explanation": "Brief explanation of effectiveness"
-                    }}
-                ]
-                
-                Return only the JSON array, nothing else.
-                """,
-                generation_config=genai.GenerationConfig(
-                    temperature=0.7,
-                    max_output_tokens=2000
-                )
+            content = await self._generate_content(
+                "gemini-1.5-pro",
+                [prompt.suffix],
+                {"temperature": 0.7, "maxOutputTokens": 2000},
+                system_instruction=prompt.prefix
             )
-            
-            # Extract JSON from response
-            content = response.text
-            start_idx = content.find('[')
-            end_idx = content.rfind(']') + 1
-            
-            if start_idx >= 0 and end_idx > start_idx:
-                json_str = content[start_idx:end_idx]
-                return json.loads(json_str)
-            else:
-                raise json.JSONDecodeError("No JSON found", content, 0)
-        except json.JSONDecodeError:
-            # Fallback if response is not valid JSON
-            return [{"prompt_text": "Error generating prompt ideas", "confidence_score": 0, "explanation": "Error parsing response"}]
+        except Exception as e:
+            raise to_provider_error(e, "gemini")
+        # Keeps every complete idea even if the completion was cut off
+        prompt_ideas = [idea for idea in parse_json_array(content) if isinstance(idea, dict)]
+        if not prompt_ideas:
+            raise ProviderResponseError("Gemini returned no prompt ideas in valid JSON", provider="gemini")
+        return prompt_ideas
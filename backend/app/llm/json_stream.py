@@ -0,0 +1,101 @@
+import json
+from typing import Any, List
+
+class JSONArrayStreamParser:
+    """
+    Incremental parser for a JSON array of objects arriving in chunks.
+
+    ``feed`` returns each top-level object (or nested array) as soon as its
+    closing bracket has arrived, so callers can act on it while the rest is
+    still streaming; scalar elements are skipped. Text before the opening
+    ``[`` (prose, a markdown fence) is skipped, as is anything after the
+    closing ``]``. A truncated tail never raises: the elements completed
+    before it are all that was emitted.
+    """
+
+    def __init__(self):
+        self._buffer: List[str] = []
+        self._started = False
+        self._finished = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self.errors = 0
+
+    @property
+    def finished(self) -> bool:
+        """Whether the closing ``]`` of the array has been seen."""
+        return self._finished
+
+    def _scan_string(self, char: str):
+        """Track a string literal, so brackets and quotes inside it are ignored."""
+        if not self._in_string:
+            self._in_string = True
+        elif self._escaped:
+            self._escaped = False
+        elif char == "\\":
+            self._escaped = True
+        elif char == '"':
+            self._in_string = False
+
+    def feed(self, chunk: str) -> List[Any]:
+        """
+        Consume a chunk of the completion.
+
+        Args:
+            chunk: Next piece of the streamed text
+
+        Returns:
+            Elements completed by this chunk, in order
+        """
+        elements = []
+        for char in chunk:
+            if self._finished:
+                break
+            if not self._started:
+                if char == "[":
+                    self._started = True
+                continue
+
+            if self._depth == 0:
+                # Between elements: skip separators and scalars until the next value starts
+                if self._in_string or char == '"':
+                    self._scan_string(char)
+                elif char == "]":
+                    self._finished = True
+                elif char in "{[":
+                    self._depth = 1
+                    self._buffer = [char]
+                continue
+
+            self._buffer.append(char)
+            if self._in_string or char == '"':
+                self._scan_string(char)
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    text = "".join(self._buffer)
+                    self._buffer = []
+                    try:
+                        elements.append(json.loads(text))
+                    except json.JSONDecodeError:
+                        # A malformed element is dropped; the ones around it are kept
+                        self.errors += 1
+        return elements
+
+def parse_json_array(text: str) -> List[Any]:
+    """
+    Extract the elements of the first JSON array in a completion.
+
+    Unlike ``json.loads`` this tolerates surrounding prose and a truncated
+    tail, keeping every element that was complete.
+
+    Args:
+        text: Completion text
+
+    Returns:
+        The complete elements, possibly empty
+    """
+    return JSONArrayStreamParser().feed(text)
@@ -0,0 +1,73 @@
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List
+
+from app.core.metrics import (
+    llm_errors_total,
+    llm_request_duration_seconds,
+    llm_requests_in_flight,
+    llm_requests_total
+)
+from app.llm.base import ProviderWrapper
+
+class MetricsProvider(ProviderWrapper):
+    """Provider wrapper that records latency, outcome and in-flight count of every upstream call.
+
+    Sits directly around the SDK provider, so each attempt (including rate
+    limit retries) is measured and cache hits are not.
+    """
+
+    async def _measured_call(self, operation: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        llm_requests_in_flight.inc(self.provider_name)
+        started = time.perf_counter()
+        outcome = "success"
+        try:
+            return await call()
+        except Exception as e:
+            outcome = "error"
+            llm_errors_total.inc(self.provider_name, operation, e.__class__.__name__)
+            raise
+        except BaseException:
+            outcome = "cancelled"
+            raise
+        finally:
+            llm_requests_in_flight.dec(self.provider_name)
+            llm_request_duration_seconds.observe(self.provider_name, operation, value=time.perf_counter() - started)
+            llm_requests_total.inc(self.provider_name, operation, outcome)
+
+    async def generate_text(self, prompt: str, options: Dict[str, Any] = None) -> str:
+        return await self._measured_call("generate_text", lambda: self.provider.generate_text(prompt, options))
+
+    async def stream_text(self, prompt: str, options: Dict[str, Any] = None) -> AsyncIterator[str]:
+        llm_requests_in_flight.inc(self.provider_name)
+        started = time.perf_counter()
+        outcome = "success"
+        try:
+            async for chunk in self.provider.stream_text(prompt, options):
+                yield chunk
+        except Exception as e:
+            outcome = "error"
+            llm_errors_total.inc(self.provider_name, "stream_text", e.__class__.__name__)
+            raise
+        except BaseException:
+            outcome = "cancelled"
+            raise
+        finally:
+            llm_requests_in_flight.dec(self.provider_name)
+            llm_request_duration_seconds.observe(self.provider_name, "stream_text", value=time.perf_counter() - started)
+            llm_requests_total.inc(self.provider_name, "stream_text", outcome)
+
+    async def generate_image(self, prompt: str, options: Dict[str, Any] = None) -> str:
+        return await self._measured_call("generate_image", lambda: self.provider.generate_image(prompt, options))
+
+    async def search_web(self, query: str, options: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        return await self._measured_call("search_web", lambda: self.provider.search_web(query, options))
+
+    async def analyze_competitor(self, url: str, analysis_type: str, options: Dict[str, Any] = None) -> Dict[str, Any]:
+        return await self._measured_call(
+            "analyze_competitor", lambda: self.provider.analyze_competitor(url, analysis_type, options)
+        )
+
+    async def generate_prompt_ideas(self, analysis_data: Dict[str, Any], options: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        return await self._measured_call(
+            "generate_prompt_ideas", lambda: self.provider.generate_prompt_ideas(analysis_data, options)
+        )
@@ -1,37 +1,78 @@
-import os
+import httpx
 import openai
-from typing import Dict, List, Any, Optional
+from typing import AsyncIterator, Dict, List, Any, Optional
 import json
 
 from app.llm.base import LLMProvider
+from app.llm.context import compact_json
+from app.llm.errors import ProviderResponseError, to_provider_error
+from app.llm.json_stream import parse_json_array
+from app.llm.prompts import page_content_block, render_prompt
+from app.llm.transport import http_transport
 from app.core.config import settings
+from app.core.metrics import record_tokens
 
 class OpenAIProvider(LLMProvider):
     """OpenAI implementation of LLM provider."""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, http_client: Optional[httpx.AsyncClient] = None):
         self.api_key = api_key or settings.OPENAI_API_KEY
-        openai.api_key = self.api_key
+        self.http_client = http_client or http_transport.get_client("openai")
+        self.client = openai.AsyncOpenAI(
+            api_key=self.api_key,
+            base_url=settings.OPENAI_BASE_URL,
+            http_client=self.http_client,
+            timeout=self.http_client.timeout
+        )
         
     async def generate_text(self, prompt: str, options: Dict[str, Any] = None) -> str:
-        """Generate text using OpenAI."""
+        """Generate text using OpenAI; ``options["system"]`` is sent as the system message."""
         options = options or {}
         
         model = options.get("model", "gpt-4")
         temperature = options.get("temperature", 0.7)
         max_tokens = options.get("max_tokens", 1000)
         
+        # A stable system message first lets the API reuse its cached prompt prefix
+        messages = [{"role": "user", "content": prompt}]
+        if options.get("system"):
+            messages.insert(0, {"role": "system", "content": options["system"]})
+        
         try:
-            response = await openai.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model=model,
-                messages=[{"role": "user", "content": prompt}],
+                messages=messages,
                 temperature=temperature,
                 max_tokens=max_tokens
             )
+            if response.usage:
+                record_tokens("openai", response.usage.prompt_tokens, response.usage.completion_tokens)
             return response.choices[0].message.content
         except Exception as e:
-            print(f"Error generating text with OpenAI: {e}")
-            return f"Error: {str(e)}"
+            raise to_provider_error(e, "openai")
+    
+    async def stream_text(self, prompt: str, options: Dict[str, Any] = None) -> AsyncIterator[str]:
+        """Stream text using OpenAI; ``options["system"]`` is sent as the system message."""
+        options = options or {}
+        
+        model = options.get("model", "gpt-4")
+        temperature = options.get("temperature", 0.7)
+        max_tokens = options.get("max_tokens", 1000)
+        
+        messages = [{"role": "user", "content": prompt}]
+        if options.get("system"):
+            messages.insert(0, {"role": "system", "content": options["system"]})
+        
+        stream = await self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
     
     async def generate_image(self, prompt: str, options: Dict[str, Any] = None) -> str:
         """Generate image using DALL-E and return URL."""
@@ -41,7 +82,7 @@ class OpenAIProvider(LLMProvider):
         quality = options.get("quality", "standard")
         
         try:
-            response = await openai.images.generate(
+            response = await self.client.images.generate(
                 model="dall-e-3",
                 prompt=prompt,
                 size=size,
@@ -50,8 +91,7 @@ class OpenAIProvider(LLMProvider):
             )
             return response.data[0].url
         except Exception as e:
-            print(f"Error generating image with OpenAI: {e}")
-            return f"Error: {str(e)}"
+            raise to_provider_error(e, "openai")
     
     async def search_web(self, query: str, options: Dict[str, Any] = None) -> List[Dict[str, Any]]:
         """Search web using OpenAI's web search capability."""
@@ -61,7 +101,7 @@ class OpenAIProvider(LLMProvider):
         
         try:
             # Using GPT-4 with web browsing capability
-            response = await openai.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model=model,
                 messages=[
                     {"role": "system", "content": "You are a helpful assistant with web search capabilities. Search the web for the latest information and return results in JSON format."},
@@ -73,8 +113,7 @@ class OpenAIProvider(LLMProvider):
             result = json.loads(response.choices[0].message.content)
             return result.get("results", [])
         except Exception as e:
-            print(f"Error searching web with OpenAI: {e}")
-            return []
+            raise to_provider_error(e, "openai")
     
     async def analyze_competitor(self, url: str, analysis_type: str, options: Dict[str, Any] = None) -> Dict[str, Any]:
         """Analyze competitor content using OpenAI."""
@@ -82,38 +121,18 @@ class OpenAIProvider(LLMProvider):
         
         model = options.get("model", "gpt-4")
         
-        prompt = f"""
-        Analyze the competitor content at {url}. Focus on {analysis_type} content.
-        
-        Provide a detailed analysis including:
-        1. Main content themes
-        2. Content strategy observations
-        3. Tone and style analysis
-        4. Target audience insights
-        5. Content gaps or opportunities
-        
-        Format your response as a JSON object with the following structure:
-        {{
-            "content_themes": [list of main themes with confidence scores],
-            "content_strategy": [list of strategy observations],
-            "tone_analysis": string description,
-            "target_audience": string description,
-            "opportunities": [list of content opportunities]
-        }}
-        """
+        prompt = render_prompt(
+            "analyze_competitor",
+            url=url,
+            analysis_type=analysis_type,
+            page_content=page_content_block(options.get("page_text"))
+        )
         
         try:
-            response = await self.generate_text(prompt, {"model": model, "max_tokens": 2000})
+            response = await self.generate_text(prompt.suffix, {"model": model, "max_tokens": 2000, "system": prompt.prefix})
             return json.loads(response)
-        except json.JSONDecodeError:
-            # Fallback if response is not valid JSON
-            return {
-                "content_themes": ["Error parsing response"],
-                "content_strategy": ["Error parsing response"],
-                "tone_analysis": "Error parsing response",
-                "target_audience": "Error parsing response",
-                "opportunities": ["Error parsing response"]
-            }
+        except json.JSONDecodeError as e:
+            raise ProviderResponseError(f"OpenAI returned an analysis that is not valid JSON: {e}", provider="openai") from e
     
     async def generate_prompt_ideas(self, analysis_data: Dict[str, Any], options: Dict[str, Any] = None) -> List[Dict[str, Any]]:
         """Generate prompt ideas based on analysis data."""
@@ -122,32 +141,11 @@ class OpenAIProvider(LLMProvider):
         model = options.get("model", "gpt-4")
         num_ideas = options.get("num_ideas", 5)
         
-        # Convert analysis data to string for prompt
-        analysis_str = json.dumps(analysis_data, indent=2)
-        
-        prompt = f"""
-        Based on the following competitor analysis, generate {num_ideas} creative prompt ideas for marketing content:
-        
-        {analysis_str}
-        
-        For each prompt idea:
-        1. Create a compelling prompt that would generate excellent marketing content
-        2. Assign a confidence score (0-100) based on how well it addresses the opportunities
-        3. Add a brief explanation of why this prompt would be effective
+        prompt = render_prompt("generate_prompt_ideas", num_ideas=num_ideas, analysis=compact_json(analysis_data))
         
-        Format your response as a JSON array of objects with the following structure:
-        [
-            {{
-                "prompt_text": "The complete prompt text",
-                "confidence_score": numeric score between 0-100,
-                "explanation": "Brief explanation of effectiveness"
-            }}
-        ]
-        """
-        
-        try:
-            response = await self.generate_text(prompt, {"model": model, "max_tokens": 2000})
-            return json.loads(response)
-        except json.JSONDecodeError:
-            # Fallback if response is not valid JSON
-            return [{"prompt_text": "Error generating prompt ideas", "confidence_score": 0, "explanation": "Error parsing response"}]
+        response = await self.generate_text(prompt.suffix, {"model": model, "max_tokens": 2000, "system": prompt.prefix})
+        # Keeps every complete idea even if the completion was cut off
+        prompt_ideas = [idea for idea in parse_json_array(response) if isinstance(idea, dict)]
+        if not prompt_ideas:
+            raise ProviderResponseError("OpenAI returned no prompt ideas in valid JSON", provider="openai")
+        return prompt_ideas
@@ -0,0 +1,151 @@
+import textwrap
+from string import Formatter
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.llm.context import count_tokens
+
+# Anthropic beta header enabling cache_control on prompt blocks
+ANTHROPIC_PROMPT_CACHING_BETA = "prompt-caching-2024-07-31"
+
+class RenderedPrompt:
+    """A rendered template: the static prefix and the filled-in suffix."""
+
+    def __init__(self, prefix: str, suffix: str):
+        self.prefix = prefix
+        self.suffix = suffix
+
+    @property
+    def text(self) -> str:
+        """Prefix and suffix as one prompt, for providers without a system prompt."""
+        return f"{self.prefix}\n\n{self.suffix}"
+
+class PromptTemplate:
+    """
+    A prompt split into a static prefix and a variable suffix.
+
+    The prefix (instructions and output schema) is identical on every call, so
+    providers send it as the system prompt where vendors cache repeated
+    prefixes: explicitly with Anthropic ``cache_control``, automatically for
+    OpenAI and DeepSeek. Only the suffix is formatted; its fields are parsed
+    once, when the template is registered.
+
+    Vendors only cache prefixes of at least ~1024 tokens
+    (``PROMPT_CACHE_MIN_TOKENS``). The built-in prefixes are a few hundred
+    tokens, so for them caching is inert: no ``cache_control`` is sent and
+    the full prompt is billed on every call. A template whose prefix grows
+    past the minimum is cached without further changes.
+    """
+
+    def __init__(self, name: str, prefix: str, suffix: str):
+        self.name = name
+        self.prefix = textwrap.dedent(prefix).strip()
+        self.suffix = textwrap.dedent(suffix).strip()
+        self.fields = {field for _, field, _, _ in Formatter().parse(self.suffix) if field}
+
+    def render(self, **values: Any) -> RenderedPrompt:
+        missing = self.fields - values.keys()
+        if missing:
+            raise ValueError(f"Missing values for prompt {self.name}: {', '.join(sorted(missing))}")
+        return RenderedPrompt(self.prefix, self.suffix.format(**values).strip())
+
+PROMPT_TEMPLATES: Dict[str, PromptTemplate] = {}
+
+def register_template(name: str, prefix: str, suffix: str) -> PromptTemplate:
+    template = PROMPT_TEMPLATES[name] = PromptTemplate(name, prefix, suffix)
+    return template
+
+def render_prompt(name: str, **values: Any) -> RenderedPrompt:
+    """
+    Render a registered template.
+
+    Args:
+        name: Template name, e.g. ``analyze_competitor``
+        **values: Values for the suffix fields
+
+    Returns:
+        The static prefix and the rendered suffix
+    """
+    return PROMPT_TEMPLATES[name].render(**values)
+
+def page_content_block(page_text: Optional[str]) -> str:
+    """The ``page_content`` field of ``analyze_competitor``: the fetched page text, or nothing."""
+    if not page_text:
+        return ""
+    return f"Extracted text of the page:\n<page>\n{page_text}\n</page>"
+
+def is_cacheable(system: str) -> bool:
+    """Whether a system prompt is long enough for the provider to cache it."""
+    return settings.PROMPT_CACHING_ENABLED and count_tokens(system) >= settings.PROMPT_CACHE_MIN_TOKENS
+
+def anthropic_system_blocks(system: str) -> list:
+    """System prompt blocks for the Anthropic Messages API, marking a cacheable prompt as a cache breakpoint."""
+    block = {"type": "text", "text": system}
+    if is_cacheable(system):
+        block["cache_control"] = {"type": "ephemeral"}
+    return [block]
+
+def anthropic_prompt_caching_headers(system: str) -> Dict[str, str]:
+    return {"anthropic-beta": ANTHROPIC_PROMPT_CACHING_BETA} if is_cacheable(system) else {}
+
+register_template(
+    "analyze_competitor",
+    prefix="""
+        You analyze competitor marketing content.
+
+        Provide a detailed analysis including:
+        1. Main content themes
+        2. Content strategy observations
+        3. Tone and style analysis
+        4. Target audience insights
+        5. Content gaps or opportunities
+
+        When the extracted text of the page is included, base the analysis on
+        that text rather than on what you know about the site.
+
+        Format your response as a JSON object with the following structure:
+        {
+            "content_themes": [list of main themes with confidence scores],
+            "content_strategy": [list of strategy observations],
+            "tone_analysis": string description,
+            "target_audience": string description,
+            "opportunities": [list of content opportunities]
+        }
+
+        Return only the JSON object, nothing else.
+    """,
+    suffix="""
+        Analyze the competitor content at: {url}
+        Focus on {analysis_type} content.
+
+        {page_content}
+    """
+)
+
+register_template(
+    "generate_prompt_ideas",
+    prefix="""
+        You create prompt ideas for marketing content from a competitor analysis.
+
+        For each prompt idea:
+        1. Create a compelling prompt that would generate excellent marketing content
+        2. Assign a confidence score (0-100) based on how well it addresses the opportunities
+        3. Add a brief explanation of why this prompt would be effective
+
+        Format your response as a JSON array of objects with the following structure:
+        [
+            {
+                "prompt_text": "The complete prompt text",
+                "confidence_score": numeric score between 0-100,
+                "explanation": "Brief explanation of effectiveness"
+            }
+        ]
+
+        Return only the JSON array, nothing else.
+    """,
+    suffix="""
+        Generate {num_ideas} creative prompt ideas based on the following competitor analysis:
+
+        {analysis}
+    """
+)
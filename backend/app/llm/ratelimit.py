@@ -0,0 +1,281 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.llm.base import LLMProvider, ProviderWrapper
+from app.llm.errors import RateLimitError, is_upstream_error, to_provider_error
+
+# Default completion budget assumed when a call does not set max_tokens
+DEFAULT_MAX_TOKENS = 1000
+
+def estimate_tokens(text: str, options: Optional[Dict[str, Any]] = None) -> int:
+    """Rough token cost of a call: ~4 characters per prompt token plus the completion budget."""
+    return len(text) // 4 + int((options or {}).get("max_tokens") or DEFAULT_MAX_TOKENS)
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``per_minute / 60`` tokens per second."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.tokens = per_minute
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def delay(self, amount: float) -> float:
+        """Seconds until ``amount`` tokens are available (0 if they are now)."""
+        self._refill()
+        # A single call larger than the whole budget waits for a full bucket rather than forever
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float):
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+class _Waiter:
+    def __init__(self, tokens: int):
+        self.tokens = tokens
+        self.event = asyncio.Event()
+
+class RateLimiter:
+    """Requests/min and tokens/min budgets with AIMD concurrency control and a FIFO queue.
+
+    Callers queue in arrival order and only the head of the queue is
+    admitted, once a concurrency slot is free, both token buckets can cover
+    it and no ``Retry-After`` pause is in effect. The concurrency limit grows
+    by one per window of successful calls and is multiplied by
+    ``decrease_factor`` when the provider answers 429, at most once per pause
+    so a burst of 429s counts as one congestion signal.
+    """
+
+    def __init__(
+        self,
+        rpm: float = 0,
+        tpm: float = 0,
+        max_concurrency: int = 16,
+        min_concurrency: int = 1,
+        decrease_factor: float = 0.5,
+        default_backoff: float = 1.0
+    ):
+        self.request_bucket = TokenBucket(rpm) if rpm else None
+        self.token_bucket = TokenBucket(tpm) if tpm else None
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.decrease_factor = decrease_factor
+        self.default_backoff = default_backoff
+        self.concurrency = float(max_concurrency)
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.counters = {"admitted": 0, "rate_limited": 0}
+        self._queue: Deque[_Waiter] = deque()
+
+    def _admission_delay(self, tokens: int) -> Optional[float]:
+        """Seconds the head waiter must sleep, 0 to admit now, or None to wait for a free slot."""
+        delay = max(self.blocked_until - time.monotonic(), 0.0)
+        if self.request_bucket:
+            delay = max(delay, self.request_bucket.delay(1))
+        if self.token_bucket:
+            delay = max(delay, self.token_bucket.delay(tokens))
+        if delay > 0:
+            return delay
+        if self.in_flight >= int(self.concurrency):
+            return None
+        return 0.0
+
+    def _wake_head(self):
+        if self._queue:
+            self._queue[0].event.set()
+
+    async def acquire(self, tokens: int = 0, priority: bool = False):
+        """
+        Wait for a turn to call the provider.
+
+        Args:
+            tokens: Estimated token cost of the call
+            priority: Queue at the front; used when re-queueing a rate-limited call
+        """
+        waiter = _Waiter(tokens)
+        if priority:
+            self._queue.appendleft(waiter)
+        else:
+            self._queue.append(waiter)
+
+        try:
+            while True:
+                if self._queue[0] is waiter:
+                    delay = self._admission_delay(tokens)
+                    if delay == 0:
+                        break
+                else:
+                    delay = None
+                waiter.event.clear()
+                try:
+                    await asyncio.wait_for(waiter.event.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            self._queue.remove(waiter)
+            self._wake_head()
+            raise
+
+        self._queue.popleft()
+        self.in_flight += 1
+        self.counters["admitted"] += 1
+        if self.request_bucket:
+            self.request_bucket.consume(1)
+        if self.token_bucket:
+            self.token_bucket.consume(tokens)
+        self._wake_head()
+
+    def release(self, succeeded: bool = True, rate_limited: bool = False, retry_after: Optional[float] = None):
+        """
+        Give back a slot and feed the outcome of the call into the AIMD controller.
+
+        Args:
+            succeeded: The call completed; only successes grow the concurrency limit
+            rate_limited: The provider answered 429
+            retry_after: Pause requested by the provider, in seconds
+        """
+        self.in_flight -= 1
+        now = time.monotonic()
+        if rate_limited:
+            self.counters["rate_limited"] += 1
+            if now >= self.blocked_until:
+                self.concurrency = max(self.min_concurrency, self.concurrency * self.decrease_factor)
+            pause = retry_after if retry_after is not None else self.default_backoff
+            self.blocked_until = max(self.blocked_until, now + pause)
+        elif succeeded:
+            self.concurrency = min(self.max_concurrency, self.concurrency + 1 / self.concurrency)
+        self._wake_head()
+
+    def stats(self) -> Dict[str, Any]:
+        """Current limits, queue depth and counters."""
+        return {
+            **self.counters,
+            "concurrency": round(self.concurrency, 2),
+            "in_flight": self.in_flight,
+            "queued": len(self._queue),
+            "paused_for": round(max(self.blocked_until - time.monotonic(), 0.0), 3)
+        }
+
+class RateLimiterRegistry:
+    """One ``RateLimiter`` per (provider, API key fingerprint), configured from settings."""
+
+    def __init__(self):
+        self._limiters: Dict[Tuple[str, str], RateLimiter] = {}
+
+    def get(self, provider_name: str, key_fingerprint: str) -> RateLimiter:
+        limiter = self._limiters.get((provider_name, key_fingerprint))
+        if limiter is None:
+            overrides = settings.PROVIDER_RATE_LIMITS.get(provider_name, {})
+            limiter = RateLimiter(
+                rpm=overrides.get("rpm", settings.RATE_LIMIT_RPM),
+                tpm=overrides.get("tpm", settings.RATE_LIMIT_TPM),
+                max_concurrency=overrides.get("max_concurrency", settings.RATE_LIMIT_MAX_CONCURRENCY),
+                min_concurrency=overrides.get("min_concurrency", settings.RATE_LIMIT_MIN_CONCURRENCY),
+                decrease_factor=overrides.get("decrease_factor", settings.RATE_LIMIT_DECREASE_FACTOR),
+                default_backoff=overrides.get("default_backoff", settings.RATE_LIMIT_DEFAULT_BACKOFF)
+            )
+            self._limiters[(provider_name, key_fingerprint)] = limiter
+        return limiter
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Limiter stats keyed by ``provider:fingerprint``."""
+        return {f"{provider}:{fingerprint}": limiter.stats() for (provider, fingerprint), limiter in self._limiters.items()}
+
+rate_limiters = RateLimiterRegistry()
+
+class RateLimitedProvider(ProviderWrapper):
+    """Provider wrapper that admits calls through a ``RateLimiter``.
+
+    A call rejected with 429 is re-queued at the front of the queue, after the
+    provider's ``Retry-After`` pause, up to ``RATE_LIMIT_MAX_RETRIES`` times
+    before the ``RateLimitError`` reaches the caller.
+    """
+
+    def __init__(self, provider: LLMProvider, provider_name: str, limiter: RateLimiter):
+        super().__init__(provider, provider_name)
+        self.limiter = limiter
+
+    async def _limited_call(self, tokens: int, call: Callable[[], Awaitable[Any]]) -> Any:
+        for attempt in range(settings.RATE_LIMIT_MAX_RETRIES + 1):
+            await self.limiter.acquire(tokens, priority=attempt > 0)
+            try:
+                try:
+                    result = await call()
+                except Exception as e:
+                    if not is_upstream_error(e):
+                        raise
+                    raise to_provider_error(e, self.provider_name)
+            except RateLimitError as e:
+                self.limiter.release(succeeded=False, rate_limited=True, retry_after=e.retry_after)
+                if attempt == settings.RATE_LIMIT_MAX_RETRIES:
+                    raise
+                continue
+            except BaseException:
+                self.limiter.release(succeeded=False)
+                raise
+            self.limiter.release()
+            return result
+
+    async def generate_text(self, prompt: str, options: Dict[str, Any] = None) -> str:
+        return await self._limited_call(
+            estimate_tokens(prompt, options), lambda: self.provider.generate_text(prompt, options)
+        )
+
+    async def stream_text(self, prompt: str, options: Dict[str, Any] = None) -> AsyncIterator[str]:
+        tokens = estimate_tokens(prompt, options)
+        for attempt in range(settings.RATE_LIMIT_MAX_RETRIES + 1):
+            await self.limiter.acquire(tokens, priority=attempt > 0)
+            started = False
+            try:
+                try:
+                    async for chunk in self.provider.stream_text(prompt, options):
+                        started = True
+                        yield chunk
+                except Exception as e:
+                    if not is_upstream_error(e):
+                        raise
+                    raise to_provider_error(e, self.provider_name)
+            except RateLimitError as e:
+                self.limiter.release(succeeded=False, rate_limited=True, retry_after=e.retry_after)
+                # Only a stream that produced nothing yet can be retried transparently
+                if started or attempt == settings.RATE_LIMIT_MAX_RETRIES:
+                    raise
+                continue
+            except BaseException:
+                self.limiter.release(succeeded=False)
+                raise
+            self.limiter.release()
+            return
+
+    async def generate_image(self, prompt: str, options: Dict[str, Any] = None) -> str:
+        return await self._limited_call(len(prompt) // 4, lambda: self.provider.generate_image(prompt, options))
+
+    async def search_web(self, query: str, options: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        return await self._limited_call(
+            estimate_tokens(query, options), lambda: self.provider.search_web(query, options)
+        )
+
+    async def analyze_competitor(self, url: str, analysis_type: str, options: Dict[str, Any] = None) -> Dict[str, Any]:
+        # The fetched page text is usually most of the prompt
+        page_text = (options or {}).get("page_text") or ""
+        return await self._limited_call(
+            estimate_tokens(url + page_text, {"max_tokens": 2000}),
+            lambda: self.provider.analyze_competitor(url, analysis_type, options)
+        )
+
+    async def generate_prompt_ideas(self, analysis_data: Dict[str, Any], options: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        return await self._limited_call(
+            estimate_tokens(str(analysis_data), options),
+            lambda: self.provider.generate_prompt_ideas(analysis_data, options)
+        )
@@ -0,0 +1,207 @@
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.llm.base import LLMProvider
+from app.llm.circuit import circuit_breakers
+from app.llm.errors import CircuitOpenError, ProviderError, is_upstream_error, to_provider_error
+
+if TYPE_CHECKING:
+    from app.services.config_service import ConfigurationService
+
+AUTO_PROVIDER = "auto"
+
+TEXT_OPERATIONS = {"generate_text", "stream_text", "search_web", "analyze_competitor", "generate_prompt_ideas"}
+
+# Operations each provider actually implements; the others raise UnsupportedOperationError
+PROVIDER_CAPABILITIES: Dict[str, Set[str]] = {
+    "openai": TEXT_OPERATIONS | {"generate_image"},
+    "claude": TEXT_OPERATIONS,
+    "gemini": TEXT_OPERATIONS,
+    "deepseek": TEXT_OPERATIONS,
+    "manus": TEXT_OPERATIONS | {"generate_image"}
+}
+
+class _ProviderStats:
+    def __init__(self):
+        self.latency: Optional[float] = None  # Moving average of successful calls, in seconds
+        self.outcomes: Deque[bool] = deque(maxlen=settings.ROUTER_WINDOW)
+        self.last_failure_at = 0.0
+
+    @property
+    def error_rate(self) -> float:
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+class ProviderRouter:
+    """Route calls to the fastest healthy provider and fail over within a request.
+
+    Latency and error statistics are kept per (provider, operation). A
+    provider is unhealthy while its error rate over the last
+    ``ROUTER_WINDOW`` calls is at least ``ROUTER_MAX_ERROR_RATE`` and it
+    failed within ``ROUTER_COOLDOWN`` seconds, or while its circuit breaker
+    is open; unhealthy providers are only tried after all healthy ones. Providers without latency samples yet sort
+    first so every provider gets measured.
+    """
+
+    def __init__(self):
+        self._stats: Dict[Tuple[str, str], _ProviderStats] = {}
+
+    def _get_stats(self, provider: str, operation: str) -> _ProviderStats:
+        stats = self._stats.get((provider, operation))
+        if stats is None:
+            stats = self._stats[(provider, operation)] = _ProviderStats()
+        return stats
+
+    def record(self, provider: str, operation: str, latency: float, succeeded: bool):
+        """Record the outcome of one call."""
+        stats = self._get_stats(provider, operation)
+        stats.outcomes.append(succeeded)
+        if succeeded:
+            alpha = settings.ROUTER_LATENCY_ALPHA
+            stats.latency = latency if stats.latency is None else alpha * latency + (1 - alpha) * stats.latency
+        else:
+            stats.last_failure_at = time.monotonic()
+
+    def is_healthy(self, provider: str, operation: str) -> bool:
+        if circuit_breakers.is_open(provider):
+            return False
+        stats = self._get_stats(provider, operation)
+        if len(stats.outcomes) < 3 or stats.error_rate < settings.ROUTER_MAX_ERROR_RATE:
+            return True
+        return time.monotonic() - stats.last_failure_at >= settings.ROUTER_COOLDOWN
+
+    def rank(self, operation: str, required: Set[str], available: List[str]) -> List[str]:
+        """
+        Order candidate providers for an operation, best first.
+
+        Args:
+            operation: Statistics key, e.g. ``analyze_competitor`` or a content type
+            required: Provider methods the call needs
+            available: Providers that have an active API key
+
+        Returns:
+            Capable providers, healthy ones first, then by average latency
+        """
+        candidates = [
+            provider for provider in PROVIDER_CAPABILITIES
+            if provider in available and required <= PROVIDER_CAPABILITIES[provider]
+        ]
+        return sorted(candidates, key=lambda provider: (
+            not self.is_healthy(provider, operation),
+            self._get_stats(provider, operation).latency or 0.0
+        ))
+
+    async def route(
+        self,
+        provider: str,
+        operation: str,
+        required: Set[str],
+        call: Callable[[LLMProvider], Awaitable[Any]],
+        config_service: "ConfigurationService",
+        db: AsyncSession
+    ) -> Tuple[Any, str]:
+        """
+        Run a call on the requested provider, or on the best available one for ``auto``.
+
+        With a named provider the call is made once and its outcome recorded.
+        With ``auto`` the ranked candidates are tried in turn until one
+        succeeds; the last error is raised if they all fail.
+
+        Args:
+            provider: Provider name or ``auto``
+            operation: Statistics key, e.g. ``analyze_competitor`` or a content type
+            required: Provider methods the call needs
+            call: Coroutine function invoked with the provider instance
+            config_service: Resolves API keys and provider instances
+            db: Database session
+
+        Returns:
+            Tuple of the call result and the name of the provider that produced it
+        """
+        provider = provider.lower()
+        if provider != AUTO_PROVIDER:
+            llm_provider = await config_service.get_llm_provider(provider, db)
+            return await self._timed_call(provider, operation, llm_provider, call), provider
+
+        candidates = self.rank(operation, required, await config_service.get_active_providers(db))
+        if not candidates:
+            raise ValueError(f"No provider with an active API key supports {operation}")
+
+        failures = []
+        for candidate in candidates:
+            try:
+                llm_provider = await config_service.get_llm_provider(candidate, db)
+                return await self._timed_call(candidate, operation, llm_provider, call), candidate
+            except ProviderError as e:
+                failures.append(e)
+
+        if len(failures) == 1:
+            raise failures[0]
+        error = ProviderError(f"All providers failed for {operation}: " + "; ".join(
+            f"{failure.provider}: {failure}" for failure in failures
+        ))
+        # Answer with the status of the most recent failure, e.g. 503 when every circuit is open
+        error.http_status = failures[-1].http_status
+        raise error from failures[-1]
+
+    async def select(
+        self,
+        provider: str,
+        operation: str,
+        required: Set[str],
+        config_service: "ConfigurationService",
+        db: AsyncSession
+    ) -> Tuple[LLMProvider, str]:
+        """
+        Resolve a provider instance without calling it, for streaming calls that cannot fail over.
+
+        Returns:
+            Tuple of the provider instance and its name
+        """
+        provider = provider.lower()
+        if provider != AUTO_PROVIDER:
+            return await config_service.get_llm_provider(provider, db), provider
+
+        candidates = self.rank(operation, required, await config_service.get_active_providers(db))
+        if not candidates:
+            raise ValueError(f"No provider with an active API key supports {operation}")
+        return await config_service.get_llm_provider(candidates[0], db), candidates[0]
+
+    async def _timed_call(
+        self,
+        provider: str,
+        operation: str,
+        llm_provider: LLMProvider,
+        call: Callable[[LLMProvider], Awaitable[Any]]
+    ) -> Any:
+        start = time.perf_counter()
+        try:
+            result = await call(llm_provider)
+        except CircuitOpenError:
+            # Failed fast without reaching the provider; nothing to learn from it
+            raise
+        except Exception as e:
+            if not is_upstream_error(e):
+                # A bug in our code says nothing about the provider's health
+                raise
+            self.record(provider, operation, time.perf_counter() - start, False)
+            raise to_provider_error(e, provider)
+        self.record(provider, operation, time.perf_counter() - start, True)
+        return result
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Latency, error rate and health keyed by ``provider:operation``."""
+        return {
+            f"{provider}:{operation}": {
+                "latency": round(stats.latency, 4) if stats.latency is not None else None,
+                "error_rate": round(stats.error_rate, 3),
+                "calls": len(stats.outcomes),
+                "healthy": self.is_healthy(provider, operation)
+            }
+            for (provider, operation), stats in self._stats.items()
+        }
+
+provider_router = ProviderRouter()
@@ -0,0 +1,68 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from app.llm.base import LLMProvider, ProviderWrapper
+from app.llm.cache import build_cache_key
+
+class _Call:
+    def __init__(self, task: asyncio.Future):
+        self.task = task
+        self.waiters = 0
+
+class SingleFlight:
+    """Coalesce concurrent identical calls onto one shared upstream task.
+
+    The first caller for a key starts the task; callers arriving while it is in
+    flight await the same task and receive the same result or exception. A
+    waiter being cancelled only detaches that waiter; the shared task is
+    cancelled once every waiter has gone away.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def _forget(self, key: Hashable, call: _Call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run ``func`` once for all concurrent callers using the same key.
+
+        Args:
+            key: Hashable identity of the call
+            func: Zero-argument coroutine function performing the call
+
+        Returns:
+            The shared result
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(func()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _, key=key, call=call: self._forget(key, call))
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Last waiter left: nobody needs the result any more
+                self._forget(key, call)
+                call.task.cancel()
+
+    def in_flight(self) -> int:
+        """Number of distinct calls currently in flight."""
+        return len(self._calls)
+
+class CoalescingProvider(ProviderWrapper):
+    """Provider wrapper that coalesces identical concurrent ``generate_text`` calls."""
+
+    def __init__(self, provider: LLMProvider, provider_name: str, flights: Optional[SingleFlight] = None):
+        super().__init__(provider, provider_name)
+        self.flights = flights or SingleFlight()
+
+    async def generate_text(self, prompt: str, options: Dict[str, Any] = None) -> str:
+        key = build_cache_key(self.provider_name, "generate_text", prompt, options)
+        return await self.flights.do(key, lambda: self.provider.generate_text(prompt, options))
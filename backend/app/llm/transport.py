@@ -0,0 +1,93 @@
+import httpx
+from typing import AsyncIterator, Dict, Any
+
+from app.core.config import settings
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+class HTTPTransport:
+    """Application-scoped pool of keep-alive HTTP clients shared by all LLM providers.
+
+    One ``httpx.AsyncClient`` is kept per provider so that each provider has its
+    own connection limits and timeouts, while every connection is opened and
+    closed together with the FastAPI application lifespan.
+    """
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def _client_options(self, provider: str) -> Dict[str, Any]:
+        """Resolve connection settings for a provider, applying per-provider overrides."""
+        overrides = settings.PROVIDER_HTTP_OVERRIDES.get(provider, {})
+        return {
+            "max_connections": overrides.get("max_connections", settings.HTTP_MAX_CONNECTIONS),
+            "max_keepalive_connections": overrides.get(
+                "max_keepalive_connections", settings.HTTP_MAX_KEEPALIVE_CONNECTIONS
+            ),
+            "keepalive_expiry": overrides.get("keepalive_expiry", settings.HTTP_KEEPALIVE_EXPIRY),
+            "connect_timeout": overrides.get("connect_timeout", settings.HTTP_CONNECT_TIMEOUT),
+            "timeout": overrides.get("timeout", settings.HTTP_TIMEOUT),
+            "http2": overrides.get("http2", settings.HTTP2_ENABLED) and HTTP2_AVAILABLE,
+        }
+
+    def _build_client(self, provider: str) -> httpx.AsyncClient:
+        options = self._client_options(provider)
+        return httpx.AsyncClient(
+            http2=options["http2"],
+            limits=httpx.Limits(
+                max_connections=options["max_connections"],
+                max_keepalive_connections=options["max_keepalive_connections"],
+                keepalive_expiry=options["keepalive_expiry"],
+            ),
+            timeout=httpx.Timeout(options["timeout"], connect=options["connect_timeout"]),
+        )
+
+    def get_client(self, provider: str) -> httpx.AsyncClient:
+        """
+        Get the pooled HTTP client for a provider, creating it on first use.
+
+        Args:
+            provider: Name of the LLM provider
+
+        Returns:
+            A shared ``httpx.AsyncClient`` configured for the provider
+        """
+        provider = provider.lower()
+        client = self._clients.get(provider)
+        if client is None or client.is_closed:
+            client = self._build_client(provider)
+            self._clients[provider] = client
+        return client
+
+    async def aclose(self):
+        """Close every pooled client. Called on application shutdown."""
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client in clients:
+            await client.aclose()
+
+async def iter_sse_data(response: httpx.Response) -> AsyncIterator[str]:
+    """
+    Iterate over the ``data`` payloads of a Server-Sent Events response.
+    
+    Args:
+        response: A streamed ``httpx.Response``
+        
+    Yields:
+        The data field of each event, stopping at the ``[DONE]`` sentinel
+    """
+    async for line in response.aiter_lines():
+        if not line.startswith("data:"):
+            continue
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            break
+        if data:
+            yield data
+
+# Shared transport, owned by the application lifespan in app/main.py
+http_transport = HTTPTransport()
@@ -1,17 +1,39 @@
-from fastapi import FastAPI, Depends, HTTPException
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Depends, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 from app.api import api_router
+from app.api.middleware import MetricsMiddleware, ServerTimingMiddleware
 from app.core.config import settings
-from app.db.session import engine
-from app.db.base import Base
+from app.core.metrics import registry as metrics_registry
+from app.db.migrations import run_migrations
+from app.db.session import async_engine
+from app.llm.context import load_encoding
+from app.llm.errors import ProviderError
+from app.llm.transport import http_transport
+from app.services.job_service import job_queue
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Own application-scoped resources such as the pooled LLM HTTP transport and job workers."""
+    if settings.RUN_MIGRATIONS_ON_STARTUP:
+        await asyncio.to_thread(run_migrations)
+    # Fetch the tokenizer's BPE file now rather than inside the first request
+    await asyncio.to_thread(load_encoding)
+    await job_queue.start()
+    yield
+    await job_queue.stop()
+    await http_transport.aclose()
+    await async_engine.dispose()
 
 app = FastAPI(
     title="GenAI Marketing API",
     description="API for GenAI Marketing Webapp",
     version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Set up CORS
@@ -23,6 +45,29 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+if settings.SERVER_TIMING_ENABLED or settings.SERVER_TIMING_LOG_SAMPLE_RATE > 0:
+    app.add_middleware(
+        ServerTimingMiddleware,
+        emit_header=settings.SERVER_TIMING_ENABLED,
+        log_sample_rate=settings.SERVER_TIMING_LOG_SAMPLE_RATE
+    )
+
+@app.exception_handler(ProviderError)
+async def provider_error_handler(request: Request, exc: ProviderError):
+    """Answer provider failures with their own status instead of a generic 500."""
+    headers = {}
+    retry_after = getattr(exc, "retry_after", None)
+    if retry_after is not None:
+        headers["Retry-After"] = str(max(int(retry_after), 1))
+    return ORJSONResponse(
+        status_code=exc.http_status,
+        content={"detail": str(exc), "provider": exc.provider},
+        headers=headers
+    )
+
 # Include API router
 app.include_router(api_router, prefix="/api")
 
@@ -33,3 +78,9 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus scrape endpoint."""
+        return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,9 +1,16 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Float, Index, JSON
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from app.db.session import Base
 
+# JSON on SQLite, binary JSONB on PostgreSQL
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+
+# Analysis keys stored in their own columns rather than in raw_analysis
+ANALYSIS_COLUMN_KEYS = ("content_themes", "content_strategy")
+
 class ApiKey(Base):
     __tablename__ = "api_keys"
     
@@ -28,16 +35,29 @@ class CompetitorAnalysis(Base):
     __tablename__ = "competitor_analyses"
     
     id = Column(Integer, primary_key=True, index=True)
-    competitor_url = Column(String)
+    competitor_url = Column(String, index=True)
     analysis_type = Column(String)  # blog, social, website
     provider = Column(String)  # LLM provider used
-    content_themes = Column(Text)
-    content_strategy = Column(Text)
-    raw_analysis = Column(Text)
+    content_themes = Column(JSONType)
+    content_strategy = Column(JSONType)
+    raw_analysis = Column(JSONType, nullable=True)  # Remaining analysis fields (tone, audience, ...)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
     prompt_ideas = relationship("PromptIdea", back_populates="analysis")
+    
+    __table_args__ = (
+        Index("ix_competitor_analyses_created_at_id", "created_at", "id"),
+    )
+    
+    @property
+    def analysis_data(self) -> dict:
+        """The full analysis result, reassembled from its columns."""
+        return {
+            **(self.raw_analysis or {}),
+            "content_themes": self.content_themes or [],
+            "content_strategy": self.content_strategy or []
+        }
 
 class PromptIdea(Base):
     __tablename__ = "prompt_ideas"
@@ -52,6 +72,11 @@ class PromptIdea(Base):
     # Relationships
     analysis = relationship("CompetitorAnalysis", back_populates="prompt_ideas")
     generated_contents = relationship("GeneratedContent", back_populates="prompt")
+    
+    __table_args__ = (
+        Index("ix_prompt_ideas_created_at_id", "created_at", "id"),
+        Index("ix_prompt_ideas_analysis_id_created_at", "analysis_id", "created_at"),
+    )
 
 class GeneratedContent(Base):
     __tablename__ = "generated_contents"
@@ -62,8 +87,51 @@ class GeneratedContent(Base):
     content_text = Column(Text, nullable=True)
     content_url = Column(String, nullable=True)  # For images/videos
     provider = Column(String)  # LLM provider used
-    parameters = Column(Text, nullable=True)  # JSON string of parameters used
+    parameters = Column(JSONType, nullable=True)  # Parameters used for generation
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
     prompt = relationship("PromptIdea", back_populates="generated_contents")
+    
+    __table_args__ = (
+        Index("ix_generated_contents_created_at_id", "created_at", "id"),
+        Index("ix_generated_contents_prompt_id_created_at", "prompt_id", "created_at"),
+    )
+
+class CacheVersion(Base):
+    __tablename__ = "cache_versions"
+    
+    name = Column(String, primary_key=True)  # Name of the cached data set, e.g. api_keys
+    version = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class LLMCacheEntry(Base):
+    __tablename__ = "llm_cache_entries"
+    
+    key = Column(String, primary_key=True)  # SHA-256 of the normalized request
+    provider = Column(String)
+    operation = Column(String)  # generate_text, generate_image, search_web
+    value = Column(Text)  # JSON-encoded response
+    expires_at = Column(Float, index=True)  # Unix timestamp
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class Job(Base):
+    __tablename__ = "jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String)  # analyze_competitor, generate_content
+    payload = Column(Text)  # JSON string of handler arguments
+    status = Column(String, default="queued", index=True)  # queued, running, succeeded, failed
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=3, nullable=False)
+    run_after = Column(Float, default=0)  # Unix timestamp before which the job is not picked up
+    lease_expires_at = Column(Float, nullable=True)  # Running jobs past this are considered crashed
+    result = Column(Text, nullable=True)  # JSON string of the handler result
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    
+    __table_args__ = (
+        Index("ix_jobs_status_run_after", "status", "run_after"),
+    )
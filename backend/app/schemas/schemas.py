@@ -1,7 +1,14 @@
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+from typing import Generic, List, Dict, Any, Optional, TypeVar
 from datetime import datetime
 
+T = TypeVar("T")
+
+# Pagination schemas
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
 # API Key schemas
 class ApiKeyBase(BaseModel):
     provider: str
@@ -57,7 +64,18 @@ class CompetitorAnalysisResponse(BaseModel):
         orm_mode = True
         
 class CompetitorAnalysis(CompetitorAnalysisResponse):
-    raw_analysis: str
+    raw_analysis: Optional[Dict[str, Any]] = None
+    
+    class Config:
+        orm_mode = True
+        
+class CompetitorAnalysisSummary(BaseModel):
+    """List-view projection without the analysis text columns."""
+    id: int
+    competitor_url: str
+    analysis_type: str
+    provider: str
+    created_at: datetime
     
     class Config:
         orm_mode = True
@@ -90,6 +108,9 @@ class ContentGenerationRequest(ContentGenerationBase):
     prompt_id: int
     provider: str
     
+class ContentGenerationBatchRequest(BaseModel):
+    items: List[ContentGenerationRequest] = Field(..., min_length=1)
+    
 class GeneratedContentResponse(BaseModel):
     id: int
     prompt_id: int
@@ -103,7 +124,45 @@ class GeneratedContentResponse(BaseModel):
         orm_mode = True
         
 class GeneratedContent(GeneratedContentResponse):
-    parameters: Optional[str] = None
+    parameters: Optional[Dict[str, Any]] = None
     
     class Config:
         orm_mode = True
+        
+class GeneratedContentSummary(BaseModel):
+    """List-view projection without ``content_text`` and ``parameters``."""
+    id: int
+    prompt_id: int
+    content_type: str
+    content_url: Optional[str] = None
+    provider: str
+    created_at: datetime
+    
+    class Config:
+        orm_mode = True
+
+
+# Job schemas
+class JobAccepted(BaseModel):
+    job_id: int
+    status: str
+    
+class Job(BaseModel):
+    id: int
+    kind: str
+    status: str
+    attempts: int
+    max_attempts: int
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    
+    class Config:
+        orm_mode = True
+        
+class JobResult(BaseModel):
+    id: int
+    status: str
+    result: Optional[Any] = None
+    error: Optional[str] = None
@@ -1,15 +1,33 @@
-import json
-from typing import List, Dict, Any
-from sqlalchemy.orm import Session
+import logging
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
 
-from app.llm.factory import LLMFactory
+import anyio
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import record_context_tokens
+from app.core.timing import span, timed
+from app.db.bulk import bulk_insert_returning
+from app.db.session import AsyncSessionLocal
+from app.fetch.fetcher import PageFetchError, page_fetcher
+from app.llm.base import LLMProvider
+from app.llm.context import AnalysisContext, build_analysis_context, build_analysis_contexts, get_context_budget
+from app.llm.json_stream import JSONArrayStreamParser
+from app.llm.prompts import render_prompt
+from app.llm.router import provider_router
+from app.llm.singleflight import SingleFlight
 from app.models import models
 from app.services.config_service import ConfigurationService
 
+logger = logging.getLogger(__name__)
+
+# Coalesces identical concurrent analyses and prompt-idea generations
+analysis_flights = SingleFlight()
+
 class AnalysisService:
     """Service for analyzing competitor content and generating prompt ideas."""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.config_service = ConfigurationService()
     
@@ -17,99 +35,263 @@ class AnalysisService:
         """
         Analyze competitor content using the specified LLM provider.
         
+        The page is fetched and its extracted text put in the prompt; if it
+        cannot be fetched the analysis falls back to the URL alone.
+        
         Args:
             url: URL of the competitor content
             analysis_type: Type of analysis (blog, social, website)
-            provider: LLM provider to use
+            provider: LLM provider to use, or "auto" to pick the fastest healthy one
             
         Returns:
             Analysis results
         """
-        try:
-            # Get API key
-            api_key = self.config_service.get_api_key(provider, self.db)
-            
-            # Get LLM provider
-            llm_provider = LLMFactory.get_provider(provider, api_key)
-            
-            # Analyze competitor
-            analysis_result = await llm_provider.analyze_competitor(url, analysis_type)
+        return await analysis_flights.do(
+            ("analyze_competitor", url, analysis_type, provider.lower()),
+            lambda: self._analyze_competitor(url, analysis_type, provider)
+        )
+    
+    async def _analyze_competitor(self, url: str, analysis_type: str, provider: str) -> Dict[str, Any]:
+        # Runs in a shared task that may outlive the request that started it,
+        # so it uses its own session rather than the caller's
+        page_text = await self._fetch_page_text(url)
+        options = {"page_text": page_text} if page_text else None
+        
+        async with AsyncSessionLocal() as db:
+            try:
+                # Analyze competitor; with "auto", provider becomes the one that answered
+                analysis_result, provider = await provider_router.route(
+                    provider,
+                    "analyze_competitor",
+                    {"analyze_competitor"},
+                    lambda llm_provider: timed("upstream", llm_provider.analyze_competitor(url, analysis_type, options)),
+                    self.config_service,
+                    db
+                )
             
-            # Save to database
-            db_analysis = models.CompetitorAnalysis(
-                competitor_url=url,
-                analysis_type=analysis_type,
-                provider=provider,
-                content_themes=json.dumps(analysis_result.get("content_themes", [])),
-                content_strategy=json.dumps(analysis_result.get("content_strategy", [])),
-                raw_analysis=json.dumps(analysis_result)
-            )
-            self.db.add(db_analysis)
-            self.db.commit()
-            self.db.refresh(db_analysis)
+                # Save to database
+                db_analysis = models.CompetitorAnalysis(
+                    competitor_url=url,
+                    analysis_type=analysis_type,
+                    provider=provider,
+                    content_themes=analysis_result.get("content_themes", []),
+                    content_strategy=analysis_result.get("content_strategy", []),
+                    raw_analysis={
+                        key: value for key, value in analysis_result.items()
+                        if key not in models.ANALYSIS_COLUMN_KEYS
+                    }
+                )
+                with span("db_commit"):
+                    db.add(db_analysis)
+                    await db.commit()
+                    await db.refresh(db_analysis)
             
-            # Format response
-            response = {
-                "id": db_analysis.id,
-                "competitor_url": db_analysis.competitor_url,
-                "analysis_type": db_analysis.analysis_type,
-                "provider": db_analysis.provider,
-                "content_themes": analysis_result.get("content_themes", []),
-                "content_strategy": analysis_result.get("content_strategy", []),
-                "created_at": db_analysis.created_at
-            }
+                # Format response
+                response = {
+                    "id": db_analysis.id,
+                    "competitor_url": db_analysis.competitor_url,
+                    "analysis_type": db_analysis.analysis_type,
+                    "provider": db_analysis.provider,
+                    "content_themes": analysis_result.get("content_themes", []),
+                    "content_strategy": analysis_result.get("content_strategy", []),
+                    "created_at": db_analysis.created_at
+                }
             
-            return response
-        except Exception as e:
-            self.db.rollback()
-            raise e
+                return response
+            except Exception as e:
+                await db.rollback()
+                raise e
+    
+    async def _fetch_page_text(self, url: str) -> Optional[str]:
+        """Extracted text of the competitor page, or None to analyze from the URL alone."""
+        if not settings.PAGE_FETCH_ENABLED:
+            return None
+        try:
+            with span("page_fetch"):
+                page = await page_fetcher.fetch(url)
+        except PageFetchError as e:
+            logger.warning("Analyzing %s without its page content: %s", url, e)
+            return None
+        except Exception:
+            # The page is an optional input; an unexpected fetch failure must not fail the analysis
+            logger.exception("Analyzing %s without its page content", url)
+            return None
+        return page.text
     
-    async def generate_prompt_ideas(self, analysis_id: int, provider: str, num_ideas: int = 5) -> List[Dict[str, Any]]:
+    async def generate_prompt_ideas(
+        self,
+        analysis_id: int,
+        provider: str,
+        num_ideas: int = 5
+    ) -> Tuple[List[models.PromptIdea], AnalysisContext]:
         """
         Generate prompt ideas based on analysis data.
         
+        The analysis is compacted to the provider's context token budget
+        before it is put in the prompt (see ``app.llm.context``).
+        
         Args:
             analysis_id: ID of the competitor analysis
-            provider: LLM provider to use
+            provider: LLM provider to use, or "auto" to pick the fastest healthy one
             num_ideas: Number of prompt ideas to generate
             
         Returns:
-            List of prompt ideas
+            List of prompt ideas, and the analysis context that was sent
         """
-        try:
-            # Get analysis
-            analysis = self.db.query(models.CompetitorAnalysis).filter(models.CompetitorAnalysis.id == analysis_id).first()
-            if not analysis:
-                raise ValueError(f"Analysis not found: {analysis_id}")
-            
-            # Parse analysis data
-            analysis_data = json.loads(analysis.raw_analysis)
-            
-            # Get API key
-            api_key = self.config_service.get_api_key(provider, self.db)
+        return await analysis_flights.do(
+            ("generate_prompt_ideas", analysis_id, provider.lower(), num_ideas),
+            lambda: self._generate_prompt_ideas(analysis_id, provider, num_ideas)
+        )
+    
+    async def _generate_prompt_ideas(
+        self,
+        analysis_id: int,
+        provider: str,
+        num_ideas: int
+    ) -> Tuple[List[models.PromptIdea], AnalysisContext]:
+        # Shared task: uses its own session, see _analyze_competitor
+        async with AsyncSessionLocal() as db:
+            try:
+                # Get analysis
+                with span("analysis_lookup"):
+                    analysis = await db.get(models.CompetitorAnalysis, analysis_id)
+                if not analysis:
+                    raise ValueError(f"Analysis not found: {analysis_id}")
             
-            # Get LLM provider
-            llm_provider = LLMFactory.get_provider(provider, api_key)
+                # Budgets are per provider; compact for every budget before routing so a
+                # local failure is not counted against a provider. Attempts are sequential,
+                # so the last context used is the one that succeeded
+                contexts_by_budget = build_analysis_contexts(analysis.analysis_data)
+                options = {"num_ideas": num_ideas}
+                contexts: List[AnalysisContext] = []
+                
+                def generate(llm_provider):
+                    contexts.append(contexts_by_budget[get_context_budget(llm_provider.provider_name)])
+                    return timed("upstream", llm_provider.generate_prompt_ideas(contexts[-1].data, options))
+                
+                # Generate prompt ideas; with "auto", provider becomes the one that answered
+                prompt_ideas, provider = await provider_router.route(
+                    provider,
+                    "generate_prompt_ideas",
+                    {"generate_prompt_ideas"},
+                    generate,
+                    self.config_service,
+                    db
+                )
+                context = contexts[-1]
+                record_context_tokens(provider, context.tokens, context.saved_tokens)
             
-            # Generate prompt ideas
-            options = {"num_ideas": num_ideas}
-            prompt_ideas = await llm_provider.generate_prompt_ideas(analysis_data, options)
+                # Save to database in a single transaction
+                with span("db_commit"):
+                    db_prompt_ideas = await bulk_insert_returning(db, models.PromptIdea, [
+                        {
+                            "analysis_id": analysis_id,
+                            "prompt_text": idea.get("prompt_text", ""),
+                            "provider": provider,
+                            "confidence_score": idea.get("confidence_score", 0)
+                        }
+                        for idea in prompt_ideas
+                    ])
+                    await db.commit()
             
-            # Save to database
-            db_prompt_ideas = []
-            for idea in prompt_ideas:
-                db_prompt_idea = models.PromptIdea(
-                    analysis_id=analysis_id,
-                    prompt_text=idea.get("prompt_text", ""),
-                    provider=provider,
-                    confidence_score=idea.get("confidence_score", 0)
-                )
-                self.db.add(db_prompt_idea)
-                self.db.commit()
-                self.db.refresh(db_prompt_idea)
-                db_prompt_ideas.append(db_prompt_idea)
+                return db_prompt_ideas, context
+            except Exception as e:
+                await db.rollback()
+                raise e
+    
+    async def stream_prompt_ideas(
+        self,
+        analysis_id: int,
+        provider: str,
+        num_ideas: int = 5
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Start streaming prompt-idea generation for an analysis.
+        
+        The analysis and provider are resolved before returning so lookup errors
+        surface before the response starts. The completion is parsed as it
+        streams: each idea is saved and yielded as an ``idea`` event as soon as
+        its object closes, so a truncated completion keeps every complete idea.
+        The iterator ends with ``done``, or ``error`` after any ideas already sent.
+        
+        Args:
+            analysis_id: ID of the competitor analysis
+            provider: LLM provider to use, or "auto" for the fastest healthy one (no failover mid-stream)
+            num_ideas: Number of prompt ideas to generate
             
-            return db_prompt_ideas
+        Returns:
+            Async iterator of stream events
+        """
+        with span("analysis_lookup"):
+            analysis = await self.db.get(models.CompetitorAnalysis, analysis_id)
+        if not analysis:
+            raise ValueError(f"Analysis not found: {analysis_id}")
+        
+        llm_provider, provider = await provider_router.select(
+            provider, "generate_prompt_ideas", {"stream_text"}, self.config_service, self.db
+        )
+        context = build_analysis_context(analysis.analysis_data, llm_provider.provider_name)
+        
+        return self._stream_idea_events(llm_provider, analysis_id, provider, num_ideas, context)
+    
+    async def _stream_idea_events(
+        self,
+        llm_provider: LLMProvider,
+        analysis_id: int,
+        provider: str,
+        num_ideas: int,
+        context: AnalysisContext
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        record_context_tokens(provider, context.tokens, context.saved_tokens)
+        prompt = render_prompt("generate_prompt_ideas", num_ideas=num_ideas, analysis=context.text)
+        parser = JSONArrayStreamParser()
+        count = 0
+        try:
+            async for chunk in llm_provider.stream_text(prompt.suffix, {"system": prompt.prefix, "max_tokens": 2000}):
+                for idea in parser.feed(chunk):
+                    if not isinstance(idea, dict):
+                        continue
+                    # Saved one by one, shielded so an idea the client was about
+                    # to receive is kept even if it disconnects meanwhile
+                    with anyio.CancelScope(shield=True):
+                        db_prompt_idea = await self._save_prompt_idea(analysis_id, provider, idea)
+                    count += 1
+                    yield "idea", self._format_prompt_idea(db_prompt_idea)
+                if parser.finished:
+                    break
         except Exception as e:
-            self.db.rollback()
-            raise e
+            yield "error", {"detail": f"Error generating prompt ideas: {str(e)}", "count": count}
+            return
+        yield "done", {
+            "count": count,
+            # The completion ended before the array closed; the ideas sent are all that arrived
+            "truncated": not parser.finished,
+            "context_tokens": context.tokens,
+            "context_tokens_saved": context.saved_tokens
+        }
+    
+    async def _save_prompt_idea(self, analysis_id: int, provider: str, idea: Dict[str, Any]) -> models.PromptIdea:
+        """Persist one prompt idea in its own session, for use outside the request scope."""
+        async with AsyncSessionLocal() as db:
+            db_prompt_idea = models.PromptIdea(
+                analysis_id=analysis_id,
+                prompt_text=idea.get("prompt_text", ""),
+                provider=provider,
+                confidence_score=idea.get("confidence_score", 0)
+            )
+            db.add(db_prompt_idea)
+            await db.commit()
+            await db.refresh(db_prompt_idea)
+            return db_prompt_idea
+    
+    @staticmethod
+    def _format_prompt_idea(db_prompt_idea: models.PromptIdea) -> Dict[str, Any]:
+        """Format a prompt idea row as a response."""
+        return {
+            "id": db_prompt_idea.id,
+            "analysis_id": db_prompt_idea.analysis_id,
+            "prompt_text": db_prompt_idea.prompt_text,
+            "confidence_score": db_prompt_idea.confidence_score,
+            "provider": db_prompt_idea.provider,
+            "created_at": db_prompt_idea.created_at
+        }
@@ -1,17 +1,76 @@
 from cryptography.fernet import Fernet
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import func
 from app.core.config import settings
+from app.core.timing import span
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 import base64
 import hashlib
+import time
+
+API_KEYS_CACHE_NAME = "api_keys"
+
+@lru_cache(maxsize=1)
+def _get_cipher() -> Fernet:
+    """Derive the Fernet cipher from the secret key once per process."""
+    # Generate a key from the secret key
+    key = hashlib.sha256(settings.SECRET_KEY.encode()).digest()
+    # Convert to URL-safe base64-encoded key
+    return Fernet(base64.urlsafe_b64encode(key))
+
+class ApiKeyCache:
+    """Process-wide TTL cache of decrypted API keys.
+    
+    Entries are invalidated explicitly when keys change in this process, and the
+    ``cache_versions`` row lets other workers notice changes: the stored version
+    is re-read at most once per ``API_KEY_CACHE_VERSION_CHECK_INTERVAL`` seconds.
+    """
+    
+    def __init__(self):
+        self._entries: Dict[str, Tuple[str, float]] = {}
+        self._version: Optional[int] = None
+        self._version_checked_at = 0.0
+    
+    def get(self, provider: str) -> Optional[str]:
+        entry = self._entries.get(provider)
+        if entry is None:
+            return None
+        api_key, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._entries[provider]
+            return None
+        return api_key
+    
+    def set(self, provider: str, api_key: str):
+        self._entries[provider] = (api_key, time.monotonic() + settings.API_KEY_CACHE_TTL)
+    
+    def invalidate(self, provider: Optional[str] = None):
+        if provider is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(provider, None)
+    
+    def version_check_due(self) -> bool:
+        return time.monotonic() - self._version_checked_at >= settings.API_KEY_CACHE_VERSION_CHECK_INTERVAL
+    
+    def sync_version(self, version: int):
+        """Record the version stored in the database, dropping all entries if it moved."""
+        if self._version is not None and version != self._version:
+            self._entries.clear()
+        self._version = version
+        self._version_checked_at = time.monotonic()
+
+api_key_cache = ApiKeyCache()
 
 class ConfigurationService:
     """Service for managing API keys and configurations."""
     
     def __init__(self):
-        # Generate a key from the secret key
-        key = hashlib.sha256(settings.SECRET_KEY.encode()).digest()
-        # Convert to URL-safe base64-encoded key
-        self.key = base64.urlsafe_b64encode(key)
-        self.cipher = Fernet(self.key)
+        self.cipher = _get_cipher()
     
     def encrypt_api_key(self, api_key: str) -> str:
         """Encrypt an API key."""
@@ -21,21 +80,85 @@ class ConfigurationService:
         """Decrypt an API key."""
         return self.cipher.decrypt(encrypted_key.encode()).decode()
     
-    def get_api_key(self, provider: str, db) -> str:
-        """Get API key for a provider from the database."""
+    async def _get_api_keys_version(self, db: AsyncSession) -> int:
+        """Read the API key version counter from the database."""
+        from app.models.models import CacheVersion
+        
+        version = await db.scalar(select(CacheVersion.version).where(CacheVersion.name == API_KEYS_CACHE_NAME))
+        return version or 0
+    
+    async def get_api_key(self, provider: str, db: AsyncSession) -> str:
+        """Get API key for a provider, using the decrypted key cache when possible."""
         from app.models.models import ApiKey
         
-        api_key = db.query(ApiKey).filter(ApiKey.provider == provider, ApiKey.is_active == True).first()
+        # Provider names are case-insensitive; keys saved before they were normalized may be mixed-case
+        provider = provider.lower()
+        if api_key_cache.version_check_due():
+            api_key_cache.sync_version(await self._get_api_keys_version(db))
+        
+        cached_key = api_key_cache.get(provider)
+        if cached_key is not None:
+            return cached_key
+        
+        api_key = await db.scalar(select(ApiKey).where(func.lower(ApiKey.provider) == provider, ApiKey.is_active == True))
         if not api_key:
             raise ValueError(f"No active API key found for provider: {provider}")
         
-        return self.decrypt_api_key(api_key.encrypted_key)
+        with span("key_decrypt"):
+            decrypted_key = self.decrypt_api_key(api_key.encrypted_key)
+        api_key_cache.set(provider, decrypted_key)
+        return decrypted_key
+    
+    async def get_llm_provider(self, provider: str, db: AsyncSession):
+        """Get the cached LLM provider instance for a provider's active API key."""
+        from app.llm.factory import LLMFactory
+        
+        provider = provider.lower()
+        with span("api_key"):
+            api_key = await self.get_api_key(provider, db)
+        with span("provider_init"):
+            return LLMFactory.get_provider(provider, api_key)
+    
+    async def get_active_providers(self, db: AsyncSession) -> List[str]:
+        """Get the names of providers that have an active API key."""
+        from app.models.models import ApiKey
+        
+        return list(await db.scalars(select(func.lower(ApiKey.provider)).where(ApiKey.is_active == True).distinct()))
+    
+    async def invalidate_api_key(self, provider: str, db: AsyncSession):
+        """
+        Invalidate cached state for a provider's API key after it changed.
+        
+        Bumps the version counter in the caller's transaction so other workers
+        drop their cached keys, and evicts the key and provider instances cached
+        by this process.
+        
+        Args:
+            provider: Provider whose key was created, updated or deactivated
+            db: Database session; the caller is responsible for committing
+        """
+        from app.models.models import CacheVersion
+        from app.llm.factory import LLMFactory
+        
+        # Upsert, so two first-ever invalidations cannot both try to insert the row
+        insert = sqlite_insert if db.bind.dialect.name == "sqlite" else postgresql_insert
+        await db.execute(
+            insert(CacheVersion)
+            .values(name=API_KEYS_CACHE_NAME, version=1)
+            .on_conflict_do_update(
+                index_elements=[CacheVersion.name],
+                set_={"version": CacheVersion.version + 1, "updated_at": func.now()}
+            )
+        )
+        
+        api_key_cache.invalidate(provider)
+        LLMFactory.invalidate(provider)
     
-    def get_configuration(self, key: str, db) -> str:
+    async def get_configuration(self, key: str, db: AsyncSession) -> str:
         """Get configuration value from the database."""
         from app.models.models import Configuration
         
-        config = db.query(Configuration).filter(Configuration.key == key).first()
+        config = await db.scalar(select(Configuration).where(Configuration.key == key))
         if not config:
             raise ValueError(f"Configuration not found: {key}")
         
@@ -1,15 +1,41 @@
-import json
-from typing import Dict, Any, Optional
-from sqlalchemy.orm import Session
+import asyncio
+from typing import AsyncIterator, Dict, Any, List, Optional, Set, Tuple
 
-from app.llm.factory import LLMFactory
+import anyio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.timing import span, timed
+from app.db.bulk import bulk_insert_returning
+from app.db.session import AsyncSessionLocal
+from app.llm.base import LLMProvider
+from app.llm.errors import ProviderError, UnsupportedOperationError
+from app.llm.router import provider_router
 from app.models import models
 from app.services.config_service import ConfigurationService
 
+# Provider methods needed for each content type
+CONTENT_TYPE_OPERATIONS = {
+    "text": {"generate_text"},
+    "image": {"generate_image"},
+    "text+image": {"generate_text", "generate_image"}
+}
+# Content types the API names but no provider implements yet
+UNSUPPORTED_CONTENT_TYPES = {"video"}
+
+def _required_operations(content_type: str) -> Set[str]:
+    """Provider methods a content type needs; rejects types nothing can generate."""
+    if content_type in UNSUPPORTED_CONTENT_TYPES:
+        raise UnsupportedOperationError(f"Generating {content_type} content is not supported yet")
+    if content_type not in CONTENT_TYPE_OPERATIONS:
+        raise ValueError(f"Unsupported content type: {content_type}")
+    return CONTENT_TYPE_OPERATIONS[content_type]
+
 class ContentService:
     """Service for generating content based on prompts."""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.config_service = ConfigurationService()
     
@@ -25,41 +51,33 @@ class ContentService:
         
         Args:
             prompt_id: ID of the prompt idea
-            content_type: Type of content to generate (text, image, video, text+image)
-            provider: LLM provider to use
+            content_type: Type of content to generate (text, image, text+image; video is rejected)
+            provider: LLM provider to use, or "auto" to pick the fastest healthy one
             parameters: Additional parameters for content generation
             
         Returns:
             Generated content
         """
+        required = _required_operations(content_type)
+        
         try:
             # Get prompt
-            prompt_idea = self.db.query(models.PromptIdea).filter(models.PromptIdea.id == prompt_id).first()
+            with span("prompt_lookup"):
+                prompt_idea = await self.db.get(models.PromptIdea, prompt_id)
             if not prompt_idea:
                 raise ValueError(f"Prompt idea not found: {prompt_id}")
             
-            # Get API key
-            api_key = self.config_service.get_api_key(provider, self.db)
-            
-            # Get LLM provider
-            llm_provider = LLMFactory.get_provider(provider, api_key)
-            
-            # Generate content based on content type
-            content_text = None
-            content_url = None
-            
-            if content_type == "text":
-                content_text = await llm_provider.generate_text(prompt_idea.prompt_text, parameters)
-            elif content_type == "image":
-                content_url = await llm_provider.generate_image(prompt_idea.prompt_text, parameters)
-            elif content_type == "text+image":
-                content_text = await llm_provider.generate_text(prompt_idea.prompt_text, parameters)
-                content_url = await llm_provider.generate_image(prompt_idea.prompt_text, parameters)
-            elif content_type == "video":
-                # Video generation might not be supported by all providers
-                content_url = "Video generation not fully implemented yet"
-            else:
-                raise ValueError(f"Unsupported content type: {content_type}")
+            # Generate content based on content type; with "auto", provider becomes the one that answered
+            (content_text, content_url), provider = await provider_router.route(
+                provider,
+                content_type,
+                required,
+                lambda llm_provider: timed(
+                    "upstream", self._generate(llm_provider, content_type, prompt_idea.prompt_text, parameters)
+                ),
+                self.config_service,
+                self.db
+            )
             
             # Save to database
             db_content = models.GeneratedContent(
@@ -68,24 +86,257 @@ class ContentService:
                 content_text=content_text,
                 content_url=content_url,
                 provider=provider,
-                parameters=json.dumps(parameters) if parameters else None
+                parameters=parameters or None
             )
-            self.db.add(db_content)
-            self.db.commit()
-            self.db.refresh(db_content)
+            with span("db_commit"):
+                self.db.add(db_content)
+                await self.db.commit()
+                await self.db.refresh(db_content)
+            
+            return self._format_content(db_content)
+        except Exception as e:
+            await self.db.rollback()
+            raise e
+    
+    async def _generate(
+        self,
+        llm_provider: LLMProvider,
+        content_type: str,
+        prompt_text: str,
+        parameters: Optional[Dict[str, Any]]
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """Generate content of the given type, returning (content_text, content_url)."""
+        content_text = None
+        content_url = None
+        
+        if content_type == "text":
+            content_text = await llm_provider.generate_text(prompt_text, parameters)
+        elif content_type == "image":
+            content_url = await llm_provider.generate_image(prompt_text, parameters)
+        elif content_type == "text+image":
+            content_text = await llm_provider.generate_text(prompt_text, parameters)
+            content_url = await llm_provider.generate_image(prompt_text, parameters)
+        else:
+            raise ValueError(f"Unsupported content type: {content_type}")
+        
+        return content_text, content_url
+    
+    async def generate_content_batch(self, items: List[Dict[str, Any]]) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Start generating content for many prompts concurrently.
+        
+        Prompts are loaded in one query and each (provider, content type) pair
+        is resolved once for the whole batch, with ``auto`` picking the fastest
+        healthy capable provider (no failover within the batch). Items run
+        concurrently, capped at ``BATCH_PROVIDER_CONCURRENCY`` in-flight calls
+        per resolved provider.
+        
+        The returned iterator yields ``(event, data)`` pairs: a ``result`` per
+        item as it completes (or fails), a ``saved`` event with the ids of each
+        bulk insert of ``BATCH_COMMIT_SIZE`` rows, and a final ``done`` summary.
+        
+        Args:
+            items: Dicts with prompt_id, content_type, provider and parameters
             
-            # Format response
-            response = {
-                "id": db_content.id,
-                "prompt_id": db_content.prompt_id,
-                "content_type": db_content.content_type,
-                "content_text": db_content.content_text,
-                "content_url": db_content.content_url,
-                "provider": db_content.provider,
-                "created_at": db_content.created_at
+        Returns:
+            Async iterator of stream events
+        """
+        prompt_ids = {item["prompt_id"] for item in items}
+        with span("prompt_lookup"):
+            prompts = {
+                prompt.id: prompt.prompt_text
+                for prompt in await self.db.scalars(select(models.PromptIdea).where(models.PromptIdea.id.in_(prompt_ids)))
             }
+        
+        # Resolve each provider once per content type, through the router so "auto"
+        # and capability filtering work as for single items; failures are
+        # reported on the items using it
+        providers: Dict[Tuple[str, str], Any] = {}
+        for provider, content_type in {(item["provider"].lower(), item["content_type"]) for item in items}:
+            try:
+                providers[(provider, content_type)] = await provider_router.select(
+                    provider, content_type, _required_operations(content_type), self.config_service, self.db
+                )
+            except (ValueError, ProviderError) as e:
+                providers[(provider, content_type)] = e
+        
+        return self._batch_events(items, prompts, providers)
+    
+    async def _batch_events(
+        self,
+        items: List[Dict[str, Any]],
+        prompts: Dict[int, str],
+        providers: Dict[Tuple[str, str], Any]
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        semaphores = {
+            resolved[1]: asyncio.Semaphore(settings.BATCH_PROVIDER_CONCURRENCY)
+            for resolved in providers.values() if not isinstance(resolved, Exception)
+        }
+        
+        async def run(index: int, item: Dict[str, Any]) -> Tuple[int, Optional[Dict[str, Any]], Optional[str]]:
+            resolved = providers[(item["provider"].lower(), item["content_type"])]
+            if isinstance(resolved, Exception):
+                return index, None, str(resolved)
+            llm_provider, provider = resolved
+            if item["prompt_id"] not in prompts:
+                return index, None, f"Prompt idea not found: {item['prompt_id']}"
+            try:
+                async with semaphores[provider]:
+                    content_text, content_url = await self._generate(
+                        llm_provider, item["content_type"], prompts[item["prompt_id"]], item.get("parameters")
+                    )
+            except Exception as e:
+                return index, None, str(e)
+            return index, {
+                "prompt_id": item["prompt_id"],
+                "content_type": item["content_type"],
+                "content_text": content_text,
+                "content_url": content_url,
+                "provider": provider,
+                "parameters": item.get("parameters") or None
+            }, None
+        
+        tasks = [asyncio.create_task(run(index, item)) for index, item in enumerate(items)]
+        pending_rows: List[Tuple[int, Dict[str, Any]]] = []
+        succeeded = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                index, row, error = await next_done
+                if error is not None:
+                    yield "result", {"index": index, "status": "error", "detail": error}
+                    continue
+                succeeded += 1
+                pending_rows.append((index, row))
+                yield "result", {"index": index, "status": "ok", **row}
+                if len(pending_rows) >= settings.BATCH_COMMIT_SIZE:
+                    rows, pending_rows = pending_rows, []
+                    yield "saved", {"items": await self._save_content_rows(rows)}
+            if pending_rows:
+                rows, pending_rows = pending_rows, []
+                yield "saved", {"items": await self._save_content_rows(rows)}
+            yield "done", {"total": len(items), "succeeded": succeeded, "failed": len(items) - succeeded}
+        finally:
+            for task in tasks:
+                task.cancel()
+            # Keep results that completed before the client disconnected
+            if pending_rows:
+                with anyio.CancelScope(shield=True):
+                    await self._save_content_rows(pending_rows)
+    
+    async def _save_content_rows(self, rows: List[Tuple[int, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Persist indexed content rows in a single transaction, returning index/id pairs."""
+        async with AsyncSessionLocal() as db:
+            db_contents = await bulk_insert_returning(db, models.GeneratedContent, [row for _, row in rows])
+            await db.commit()
+            return [
+                {"index": index, "id": db_content.id, "created_at": db_content.created_at}
+                for (index, _), db_content in zip(rows, db_contents)
+            ]
+    
+    async def stream_content(
+        self,
+        prompt_id: int,
+        content_type: str,
+        provider: str,
+        parameters: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Start streaming content generation for a prompt.
+        
+        The prompt, API key and provider are resolved before returning so lookup
+        errors surface before the response starts. The returned iterator yields
+        ``(event, data)`` pairs: ``token`` chunks, an ``image`` for text+image,
+        then ``done`` with the saved content, or ``error`` on failure.
+        
+        Args:
+            prompt_id: ID of the prompt idea
+            content_type: Type of content to generate (text, text+image)
+            provider: LLM provider to use, or "auto" for the fastest healthy one (no failover mid-stream)
+            parameters: Additional parameters for content generation
             
-            return response
+        Returns:
+            Async iterator of stream events
+        """
+        if content_type not in ("text", "text+image"):
+            raise ValueError(f"Streaming is not supported for content type: {content_type}")
+        
+        with span("prompt_lookup"):
+            prompt_idea = await self.db.get(models.PromptIdea, prompt_id)
+        if not prompt_idea:
+            raise ValueError(f"Prompt idea not found: {prompt_id}")
+        
+        required = {"stream_text", "generate_image"} if content_type == "text+image" else {"stream_text"}
+        llm_provider, provider = await provider_router.select(provider, content_type, required, self.config_service, self.db)
+        
+        return self._stream_events(llm_provider, prompt_idea.prompt_text, prompt_id, content_type, provider, parameters)
+    
+    async def _stream_events(
+        self,
+        llm_provider: LLMProvider,
+        prompt_text: str,
+        prompt_id: int,
+        content_type: str,
+        provider: str,
+        parameters: Optional[Dict[str, Any]]
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        chunks: List[str] = []
+        content_url = None
+        failed = False
+        response = None
+        try:
+            async for chunk in llm_provider.stream_text(prompt_text, parameters):
+                chunks.append(chunk)
+                yield "token", {"text": chunk}
+            if content_type == "text+image":
+                content_url = await llm_provider.generate_image(prompt_text, parameters)
+                yield "image", {"content_url": content_url}
         except Exception as e:
-            self.db.rollback()
-            raise e
+            failed = True
+            yield "error", {"detail": f"Error generating content: {str(e)}"}
+        finally:
+            # Persist on completion and on client disconnect, even while the
+            # surrounding request is being cancelled
+            if not failed and (chunks or content_url):
+                with anyio.CancelScope(shield=True):
+                    response = await self._save_content(
+                        prompt_id, content_type, "".join(chunks), content_url, provider, parameters
+                    )
+        if response is not None:
+            yield "done", response
+    
+    async def _save_content(
+        self,
+        prompt_id: int,
+        content_type: str,
+        content_text: Optional[str],
+        content_url: Optional[str],
+        provider: str,
+        parameters: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Persist generated content in its own session, for use outside the request scope."""
+        async with AsyncSessionLocal() as db:
+            db_content = models.GeneratedContent(
+                prompt_id=prompt_id,
+                content_type=content_type,
+                content_text=content_text,
+                content_url=content_url,
+                provider=provider,
+                parameters=parameters or None
+            )
+            db.add(db_content)
+            await db.commit()
+            await db.refresh(db_content)
+            return self._format_content(db_content)
+    
+    @staticmethod
+    def _format_content(db_content: models.GeneratedContent) -> Dict[str, Any]:
+        """Format a generated content row as a response."""
+        return {
+            "id": db_content.id,
+            "prompt_id": db_content.prompt_id,
+            "content_type": db_content.content_type,
+            "content_text": db_content.content_text,
+            "content_url": db_content.content_url,
+            "provider": db_content.provider,
+            "created_at": db_content.created_at
+        }
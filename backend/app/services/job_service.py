@@ -0,0 +1,221 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import func
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.llm.errors import ProviderUnavailableError, RateLimitError
+from app.models import models
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[AsyncSession, Dict[str, Any]], Awaitable[Any]]
+
+# Failures worth another attempt: throttling, outages and timeouts. Anything
+# else (bad input, auth, unusable responses, bugs) would fail the same way again
+RETRYABLE_ERRORS = (RateLimitError, ProviderUnavailableError, asyncio.TimeoutError)
+
+async def _analyze_competitor(db: AsyncSession, payload: Dict[str, Any]) -> Any:
+    from app.services.analysis_service import AnalysisService
+
+    return await AnalysisService(db).analyze_competitor(
+        url=payload["competitor_url"],
+        analysis_type=payload["analysis_type"],
+        provider=payload["provider"]
+    )
+
+async def _generate_content(db: AsyncSession, payload: Dict[str, Any]) -> Any:
+    from app.services.content_service import ContentService
+
+    return await ContentService(db).generate_content(
+        prompt_id=payload["prompt_id"],
+        content_type=payload["content_type"],
+        provider=payload["provider"],
+        parameters=payload.get("parameters")
+    )
+
+class JobQueue:
+    """DB-backed job queue with an in-process asyncio worker pool.
+
+    Jobs are claimed with a conditional UPDATE, so several workers or processes
+    can share the table without a broker. A claimed job holds a lease of
+    ``JOB_TIMEOUT`` seconds; jobs whose lease expired (their worker crashed)
+    are re-queued by the next worker that polls, or marked failed once they
+    have used up their attempts. Transient failures (rate limits, provider
+    outages, timeouts) are retried with exponential backoff up to the job's
+    ``max_attempts``; any other error fails the job at once.
+    """
+
+    handlers: Dict[str, JobHandler] = {
+        "analyze_competitor": _analyze_competitor,
+        "generate_content": _generate_content
+    }
+
+    def __init__(self):
+        self._workers: List[asyncio.Task] = []
+        self._running: Set[int] = set()
+        self._wakeup = asyncio.Event()
+
+    async def enqueue(self, db: AsyncSession, kind: str, payload: Dict[str, Any], max_attempts: Optional[int] = None) -> models.Job:
+        """
+        Add a job to the queue.
+
+        Args:
+            db: Database session; the job is committed immediately
+            kind: Registered handler name
+            payload: JSON-serializable handler arguments
+            max_attempts: Attempts before the job is marked failed
+
+        Returns:
+            The queued job
+        """
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        job = models.Job(
+            kind=kind,
+            payload=json.dumps(jsonable_encoder(payload)),
+            status="queued",
+            max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+            run_after=time.time()
+        )
+        db.add(job)
+        await db.commit()
+        await db.refresh(job)
+        self._wakeup.set()
+        return job
+
+    async def start(self):
+        """Start the worker pool. Called on application startup."""
+        self._wakeup = asyncio.Event()
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"job-worker-{index}")
+            for index in range(settings.JOB_WORKER_CONCURRENCY)
+        ]
+
+    async def stop(self):
+        """Stop the workers and hand jobs that were interrupted back to the queue."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        interrupted = list(self._running)
+        self._running.clear()
+        if interrupted:
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    update(models.Job)
+                    .where(models.Job.id.in_(interrupted), models.Job.status == "running")
+                    .values(status="queued", attempts=models.Job.attempts - 1, lease_expires_at=None, run_after=time.time())
+                )
+                await db.commit()
+
+    async def _worker(self):
+        while True:
+            try:
+                job = await self._claim()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Error claiming job")
+                job = None
+
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=settings.JOB_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self._running.add(job.id)
+            try:
+                await self._run(job)
+            finally:
+                self._running.discard(job.id)
+
+    async def _claim(self) -> Optional[models.Job]:
+        """Recover expired leases, then atomically claim the oldest runnable job."""
+        now = time.time()
+        async with AsyncSessionLocal() as db:
+            # Crash recovery: running jobs whose lease expired lost their worker.
+            # A job that keeps crashing its worker must not be re-queued forever
+            expired = (models.Job.status == "running", models.Job.lease_expires_at < now)
+            await db.execute(
+                update(models.Job)
+                .where(*expired, models.Job.attempts >= models.Job.max_attempts)
+                .values(status="failed", error="Job lease expired", lease_expires_at=None, finished_at=func.now())
+            )
+            await db.execute(
+                update(models.Job)
+                .where(*expired, models.Job.attempts < models.Job.max_attempts)
+                .values(status="queued", lease_expires_at=None, run_after=now)
+            )
+            await db.commit()
+
+            candidates = (await db.scalars(
+                select(models.Job.id)
+                .where(models.Job.status == "queued", models.Job.run_after <= now)
+                .order_by(models.Job.run_after, models.Job.id)
+                .limit(settings.JOB_WORKER_CONCURRENCY)
+            )).all()
+            for job_id in candidates:
+                result = await db.execute(
+                    update(models.Job)
+                    .where(models.Job.id == job_id, models.Job.status == "queued")
+                    .values(
+                        status="running",
+                        attempts=models.Job.attempts + 1,
+                        lease_expires_at=now + settings.JOB_TIMEOUT,
+                        started_at=func.now()
+                    )
+                )
+                await db.commit()
+                if result.rowcount:
+                    return await db.get(models.Job, job_id, populate_existing=True)
+        return None
+
+    async def _run(self, job: models.Job):
+        values: Dict[str, Any]
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await asyncio.wait_for(
+                    self.handlers[job.kind](db, json.loads(job.payload)),
+                    timeout=settings.JOB_TIMEOUT
+                )
+            values = {
+                "status": "succeeded",
+                "result": json.dumps(jsonable_encoder(result)),
+                "error": None,
+                "finished_at": func.now()
+            }
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error = str(e) or e.__class__.__name__
+            if isinstance(e, RETRYABLE_ERRORS) and job.attempts < job.max_attempts:
+                backoff = settings.JOB_RETRY_BACKOFF * 2 ** (job.attempts - 1)
+                # Never come back sooner than the provider asked us to
+                backoff = max(backoff, getattr(e, "retry_after", None) or 0)
+                values = {"status": "queued", "error": error, "run_after": time.time() + backoff}
+            else:
+                logger.warning("Job %s (%s) failed after %s attempt(s): %s", job.id, job.kind, job.attempts, error)
+                values = {"status": "failed", "error": error, "finished_at": func.now()}
+
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(models.Job)
+                .where(models.Job.id == job.id, models.Job.status == "running")
+                .values(lease_expires_at=None, **values)
+            )
+            await db.commit()
+
+job_queue = JobQueue()
@@ -0,0 +1,386 @@
+"""
+Load driver: throughput, latency percentiles and event-loop lag of the API
+under a set of concurrency levels, against the mock LLM server.
+
+By default everything runs locally and offline: the mock server
+(benchmarks.mock_llm) is started as a subprocess, and the backend is served
+by uvicorn in a background thread of this process, on a fresh SQLite
+database, with its provider base URLs pointed at the mock. Its event loop is
+sampled for lag while the load runs. With ``--base-url`` an already running
+backend is driven instead (event-loop lag is then not measured).
+
+Scenarios:
+    analyze           POST /api/analysis/analyze (unique URLs, so nothing coalesces); the
+                      pages are fetched from the mock's /site fixtures when it is known
+    generate-prompts  POST /api/analysis/generate-prompts
+    content           POST /api/content/generate (text)
+    slow-upstream     content, with the mock answering after --slow-latency seconds; a
+                      backend that does not block should reach concurrency / latency req/s
+    list-analyses, list-analysis-summaries, list-prompt-ideas, list-content, list-content-summaries
+                      GET list endpoints, first page
+    mixed             one request of each kind in turn
+
+Run from the backend directory:
+    python -m benchmarks.load [--scenario content --scenario list-analyses]
+        [--concurrency 1,8,32] [--duration 10] [--mock-latency 0.2] [--json results.json]
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+MOCK_PORT = 8900
+BACKEND_PORT = 8901
+
+LIST_ENDPOINTS = {
+    "list-analyses": "/api/analysis/analyses",
+    "list-analysis-summaries": "/api/analysis/analyses/summary",
+    "list-prompt-ideas": "/api/analysis/prompt-ideas",
+    "list-content": "/api/content/content",
+    "list-content-summaries": "/api/content/content/summary"
+}
+MIXED_SCENARIOS = ["analyze", "generate-prompts", "content", *LIST_ENDPOINTS]
+SCENARIOS = ["analyze", "generate-prompts", "content", "slow-upstream", *LIST_ENDPOINTS, "mixed"]
+# Scenarios that make exactly one upstream call per request
+UPSTREAM_SCENARIOS = {"analyze", "generate-prompts", "content", "slow-upstream"}
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of unsorted values (0 for no values)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(int(round(pct / 100 * len(ordered))) - 1, 0)
+    return ordered[min(index, len(ordered) - 1)]
+
+class LoopLagMonitor:
+    """Samples how late an event loop wakes up from a short sleep."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: List[float] = []
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(loop.time() - started - self.interval, 0.0))
+
+    def drain(self) -> List[float]:
+        samples, self.samples = self.samples, []
+        return samples
+
+class BackendThread(threading.Thread):
+    """Serves the backend app with uvicorn in its own event loop, watched by a ``LoopLagMonitor``."""
+
+    def __init__(self, port: int):
+        super().__init__(daemon=True)
+        self.port = port
+        self.monitor = LoopLagMonitor()
+        self.server = None
+        self.error: Optional[BaseException] = None
+
+    def run(self):
+        try:
+            asyncio.run(self._serve())
+        except BaseException as e:
+            self.error = e
+
+    async def _serve(self):
+        import uvicorn
+        from app.main import app
+
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning"))
+        monitor_task = asyncio.create_task(self.monitor.run())
+        try:
+            await self.server.serve()
+        finally:
+            monitor_task.cancel()
+
+    def wait_started(self, timeout: float = 30.0):
+        deadline = time.monotonic() + timeout
+        while not (self.server and self.server.started):
+            if self.error or not self.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError(f"Backend did not start: {self.error!r}")
+            time.sleep(0.05)
+
+    def stop(self):
+        if self.server:
+            self.server.should_exit = True
+        self.join(timeout=10)
+
+def start_mock(port: int, args: argparse.Namespace) -> subprocess.Popen:
+    process = subprocess.Popen([
+        sys.executable, "-m", "benchmarks.mock_llm",
+        "--port", str(port),
+        "--latency", str(args.mock_latency),
+        "--jitter", str(args.mock_jitter),
+        "--token-rate", str(args.mock_token_rate),
+        "--error-rate", str(args.mock_error_rate),
+        "--rate-limit-rate", str(args.mock_rate_limit_rate)
+    ])
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/__stats", timeout=1).raise_for_status()
+            return process
+        except httpx.HTTPError:
+            if process.poll() is not None:
+                break
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("Mock LLM server did not start")
+
+def configure_local_backend(mock_url: str, workdir: str, cache: bool):
+    """Point the backend settings at the mock server and a scratch database; must run before importing app."""
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'benchmark.db')}",
+        "OPENAI_BASE_URL": f"{mock_url}/v1",
+        "DEEPSEEK_BASE_URL": f"{mock_url}/v1",
+        "ANTHROPIC_BASE_URL": mock_url,
+        "MANUS_API_URL": f"{mock_url}/manus",
+        "RUN_MIGRATIONS_ON_STARTUP": "true",
+        "LLM_CACHE_ENABLED": "true" if cache else "false",
+        "LLM_CACHE_PERSISTENT": "false",
+        # The competitor pages are the mock's fixtures on 127.0.0.1
+        "PAGE_FETCH_ALLOW_PRIVATE": "true",
+        "PAGE_CACHE_DIR": os.path.join(workdir, "page_cache")
+    })
+
+@dataclass
+class LevelResult:
+    scenario: str
+    concurrency: int
+    requests: int
+    errors: int
+    duration: float
+    throughput: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+    loop_lag_p50_ms: Optional[float] = None
+    loop_lag_p99_ms: Optional[float] = None
+    loop_lag_max_ms: Optional[float] = None
+    ideal_throughput: Optional[float] = None
+    status_codes: Dict[str, int] = field(default_factory=dict)
+
+class LoadDriver:
+    def __init__(self, client: httpx.AsyncClient, provider: str, site_url: Optional[str] = None):
+        self.client = client
+        self.provider = provider
+        # Base of the competitor URLs; unresolvable ones are analyzed from the URL alone
+        self.site_url = site_url or "https://competitor.example"
+        self.run_id = uuid.uuid4().hex[:8]
+        self.counter = itertools.count()
+        self.analysis_id: Optional[int] = None
+        self.prompt_ids: List[int] = []
+
+    async def setup(self, api_key: str):
+        """Register the provider key and seed an analysis with prompt ideas for the dependent scenarios."""
+        response = await self.client.post("/api/config/api-keys", json={"provider": self.provider, "api_key": api_key})
+        if response.status_code not in (200, 400):
+            response.raise_for_status()
+        response = await self.client.post("/api/analysis/analyze", json={
+            "competitor_url": f"{self.site_url}/{self.run_id}/seed",
+            "analysis_type": "blog",
+            "provider": self.provider
+        })
+        response.raise_for_status()
+        self.analysis_id = response.json()["id"]
+        response = await self.client.post("/api/analysis/generate-prompts", json={
+            "analysis_id": self.analysis_id,
+            "provider": self.provider,
+            "num_ideas": 10
+        })
+        response.raise_for_status()
+        self.prompt_ids = [idea["id"] for idea in response.json()]
+
+    def request_for(self, scenario: str) -> Callable[[], Awaitable[httpx.Response]]:
+        number = next(self.counter)
+        if scenario == "mixed":
+            return self.request_for(MIXED_SCENARIOS[number % len(MIXED_SCENARIOS)])
+        if scenario == "analyze":
+            return lambda: self.client.post("/api/analysis/analyze", json={
+                "competitor_url": f"{self.site_url}/{self.run_id}/{number}",
+                "analysis_type": "blog",
+                "provider": self.provider
+            })
+        if scenario == "generate-prompts":
+            return lambda: self.client.post("/api/analysis/generate-prompts", json={
+                "analysis_id": self.analysis_id,
+                "provider": self.provider,
+                # Vary the request so concurrent calls are not coalesced
+                "num_ideas": 3 + number % 5
+            })
+        if scenario in ("content", "slow-upstream"):
+            return lambda: self.client.post("/api/content/generate", json={
+                "prompt_id": self.prompt_ids[number % len(self.prompt_ids)],
+                "content_type": "text",
+                "provider": self.provider,
+                "parameters": {"temperature": 0.7, "seed": number}
+            })
+        return lambda: self.client.get(LIST_ENDPOINTS[scenario], params={"limit": 20})
+
+    async def run_level(self, scenario: str, concurrency: int, duration: float, max_requests: Optional[int]) -> Dict[str, Any]:
+        latencies: List[float] = []
+        status_codes: Dict[str, int] = {}
+        errors = 0
+        issued = 0
+        deadline = time.perf_counter() + duration
+
+        async def worker():
+            nonlocal errors, issued
+            while time.perf_counter() < deadline and (max_requests is None or issued < max_requests):
+                issued += 1
+                request = self.request_for(scenario)
+                started = time.perf_counter()
+                try:
+                    response = await request()
+                    status = str(response.status_code)
+                    failed = response.status_code >= 400
+                except httpx.HTTPError as e:
+                    status = e.__class__.__name__
+                    failed = True
+                latencies.append(time.perf_counter() - started)
+                status_codes[status] = status_codes.get(status, 0) + 1
+                errors += failed
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        return {"latencies": latencies, "status_codes": status_codes, "errors": errors, "elapsed": elapsed}
+
+def summarize(
+    scenario: str,
+    concurrency: int,
+    raw: Dict[str, Any],
+    lag_samples: Optional[List[float]],
+    upstream_latency: Optional[float]
+) -> LevelResult:
+    latencies = raw["latencies"]
+    result = LevelResult(
+        scenario=scenario,
+        concurrency=concurrency,
+        requests=len(latencies),
+        errors=raw["errors"],
+        duration=round(raw["elapsed"], 3),
+        throughput=round(len(latencies) / raw["elapsed"], 2) if raw["elapsed"] else 0.0,
+        p50_ms=round(percentile(latencies, 50) * 1000, 1),
+        p95_ms=round(percentile(latencies, 95) * 1000, 1),
+        p99_ms=round(percentile(latencies, 99) * 1000, 1),
+        max_ms=round(max(latencies, default=0.0) * 1000, 1),
+        status_codes=raw["status_codes"]
+    )
+    if lag_samples is not None:
+        result.loop_lag_p50_ms = round(percentile(lag_samples, 50) * 1000, 2)
+        result.loop_lag_p99_ms = round(percentile(lag_samples, 99) * 1000, 2)
+        result.loop_lag_max_ms = round(max(lag_samples, default=0.0) * 1000, 2)
+    if upstream_latency and scenario in UPSTREAM_SCENARIOS:
+        result.ideal_throughput = round(concurrency / upstream_latency, 2)
+    return result
+
+def print_report(results: List[LevelResult]):
+    columns = [
+        ("scenario", "scenario", "<24"), ("conc", "concurrency", ">5"), ("reqs", "requests", ">6"),
+        ("errs", "errors", ">5"), ("req/s", "throughput", ">8"), ("ideal", "ideal_throughput", ">8"),
+        ("p50 ms", "p50_ms", ">8"), ("p95 ms", "p95_ms", ">8"), ("p99 ms", "p99_ms", ">8"),
+        ("lag p50", "loop_lag_p50_ms", ">8"), ("lag p99", "loop_lag_p99_ms", ">8"), ("lag max", "loop_lag_max_ms", ">8")
+    ]
+    print("  ".join(f"{title:{spec}}" for title, _, spec in columns))
+    for result in results:
+        values = asdict(result)
+        print("  ".join(
+            f"{'-' if values[key] is None else values[key]:{spec}}" for _, key, spec in columns
+        ))
+
+async def drive(args: argparse.Namespace, base_url: str, backend: Optional[BackendThread], mock_url: Optional[str]) -> List[LevelResult]:
+    limits = httpx.Limits(max_connections=max(args.concurrency) + 10, max_keepalive_connections=max(args.concurrency) + 10)
+    results = []
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        driver = LoadDriver(client, args.provider, f"{mock_url}/site" if mock_url else None)
+        await driver.setup(args.api_key)
+        for scenario in args.scenario:
+            upstream_latency = args.mock_latency + args.mock_jitter / 2 if mock_url else None
+            if mock_url:
+                latency = args.slow_latency if scenario == "slow-upstream" else args.mock_latency
+                jitter = 0.0 if scenario == "slow-upstream" else args.mock_jitter
+                await client.post(f"{mock_url}/__config", json={"latency": latency, "jitter": jitter})
+                upstream_latency = latency + jitter / 2
+            for concurrency in args.concurrency:
+                if backend:
+                    backend.monitor.drain()
+                raw = await driver.run_level(scenario, concurrency, args.duration, args.requests)
+                lag_samples = backend.monitor.drain() if backend else None
+                result = summarize(scenario, concurrency, raw, lag_samples, upstream_latency)
+                results.append(result)
+                print(
+                    f"{scenario} x{concurrency}: {result.throughput} req/s, p50 {result.p50_ms} ms, "
+                    f"p99 {result.p99_ms} ms, {result.errors} errors", file=sys.stderr
+                )
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS, help="Repeatable; default: all but mixed")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per concurrency level")
+    parser.add_argument("--requests", type=int, help="Stop a level after this many requests")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--provider", default="openai", choices=["openai", "claude", "deepseek", "manus"])
+    parser.add_argument("--api-key", default="benchmark-key")
+    parser.add_argument("--base-url", help="Drive a running backend instead of starting one")
+    parser.add_argument("--mock-url", help="Mock server already started for --base-url, to switch its latency per scenario")
+    parser.add_argument("--mock-latency", type=float, default=0.2)
+    parser.add_argument("--mock-jitter", type=float, default=0.05)
+    parser.add_argument("--mock-token-rate", type=float, default=0.0)
+    parser.add_argument("--mock-error-rate", type=float, default=0.0)
+    parser.add_argument("--mock-rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--slow-latency", type=float, default=2.0, help="Mock latency for the slow-upstream scenario")
+    parser.add_argument("--cache", action="store_true", help="Keep the LLM response cache on in the local backend")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+    args.concurrency = [int(level) for level in args.concurrency.split(",")]
+    args.scenario = args.scenario or [scenario for scenario in SCENARIOS if scenario != "mixed"]
+
+    mock_process = None
+    backend = None
+    mock_url = args.mock_url
+    try:
+        if args.base_url:
+            base_url = args.base_url
+        else:
+            mock_process = start_mock(MOCK_PORT, args)
+            mock_url = f"http://127.0.0.1:{MOCK_PORT}"
+            workdir = tempfile.mkdtemp(prefix="benchmark-")
+            configure_local_backend(mock_url, workdir, args.cache)
+            backend = BackendThread(BACKEND_PORT)
+            backend.start()
+            backend.wait_started()
+            base_url = f"http://127.0.0.1:{BACKEND_PORT}"
+        results = asyncio.run(drive(args, base_url, backend, mock_url))
+    finally:
+        if backend:
+            backend.stop()
+        if mock_process:
+            mock_process.terminate()
+            mock_process.wait(timeout=10)
+
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as output:
+            json.dump([asdict(result) for result in results], output, indent=2)
+
+if __name__ == "__main__":
+    main()
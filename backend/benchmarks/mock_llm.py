@@ -0,0 +1,446 @@
+"""
+Local mock LLM server speaking the OpenAI (and DeepSeek), Anthropic and Manus
+wire formats, so the backend can be load-tested without calling any vendor.
+
+Every call waits ``latency`` seconds (plus up to ``jitter``), then produces
+its output at ``token_rate`` tokens per second: streamed responses emit one
+chunk per token, non-streamed ones wait for the whole output. A share of calls
+can fail with a 500 (``error_rate``) or a 429 with ``Retry-After``
+(``rate_limit_rate``). Settings can be changed while running with
+``POST /__config`` and counters read with ``GET /__stats``.
+
+Anthropic calls whose system blocks carry ``cache_control`` (sent with the
+prompt-caching beta header) are counted in ``cache_control_requests`` and
+answered with cache creation/read usage, like the real API; a repeated prefix
+counts as a ``prompt_cache_hits``.
+
+It also serves competitor page fixtures for the page fetcher: HTML with
+navigation, cookie banner, scripts and footer around the article text, an
+``ETag`` and ``Last-Modified`` that are stable per path (conditional GETs get
+a 304, counted in ``site_not_modified``), optional ``?kb=N`` padding to
+exercise the size limit, and a redirecting variant. Pages answer at once,
+without the configured latency.
+
+Routes:
+    OpenAI/DeepSeek: POST /v1/chat/completions, POST /v1/images/generations
+    Anthropic:       POST /v1/messages
+    Manus:           POST /manus/{completions,analyze,generate_prompts,search,images/generate}
+    Page fixtures:   GET /site/{path}[?kb=N], GET /site-redirect/{path} (302 to /site/{path})
+
+Point the backend at it with:
+    OPENAI_BASE_URL=http://127.0.0.1:8900/v1
+    DEEPSEEK_BASE_URL=http://127.0.0.1:8900/v1
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8900
+    MANUS_API_URL=http://127.0.0.1:8900/manus
+
+Run from the backend directory:
+    python -m benchmarks.mock_llm [--port 8900] [--latency 0.5] [--token-rate 50] [--error-rate 0.01]
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+import uuid
+from dataclasses import asdict, dataclass, fields
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, Response, StreamingResponse
+
+# Fixture pages never change, so every path keeps the same validators
+SITE_LAST_MODIFIED = "Mon, 01 Jan 2024 00:00:00 GMT"
+
+@dataclass
+class MockConfig:
+    latency: float = 0.5
+    jitter: float = 0.1
+    # Output tokens per second; 0 returns the whole output after the latency
+    token_rate: float = 0.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after: float = 1.0
+    text_tokens: int = 200
+
+    def update(self, values: Dict[str, Any]):
+        for field in fields(self):
+            if field.name in values:
+                setattr(self, field.name, field.type(values[field.name]))
+
+def _words(count: int) -> List[str]:
+    vocabulary = "marketing content audience brand growth strategy story campaign launch insight".split()
+    return [vocabulary[index % len(vocabulary)] for index in range(count)]
+
+def _analysis(prompt: str) -> Dict[str, Any]:
+    url = re.search(r"content at:? (\S+?)\.?(?:\s|$)", prompt)
+    return {
+        "content_themes": [
+            {"theme": f"Theme {index} of {url.group(1) if url else 'competitor'}", "confidence": round(0.9 - index * 0.1, 2)}
+            for index in range(6)
+        ],
+        "content_strategy": [f"Strategy observation {index}: " + " ".join(_words(12)) for index in range(4)],
+        "tone_analysis": " ".join(_words(30)),
+        "target_audience": " ".join(_words(20)),
+        "opportunities": [f"Opportunity {index}: " + " ".join(_words(8)) for index in range(5)]
+    }
+
+def _prompt_ideas(prompt: str) -> List[Dict[str, Any]]:
+    count = re.search(r"[Gg]enerate (\d+) creative prompt ideas", prompt)
+    return [
+        {
+            "prompt_text": f"Prompt idea {index}: write about " + " ".join(_words(15)),
+            "confidence_score": 90 - index * 5,
+            "explanation": " ".join(_words(12))
+        }
+        for index in range(int(count.group(1)) if count else 5)
+    ]
+
+def _search_results(prompt: str) -> List[Dict[str, Any]]:
+    return [
+        {"title": f"Result {index}", "url": f"https://example.com/{index}", "snippet": " ".join(_words(15))}
+        for index in range(5)
+    ]
+
+def site_page(path: str, kb: int = 0) -> str:
+    """A competitor page fixture: article text wrapped in the usual site chrome."""
+    paragraphs = "".join(
+        f"<p>{path} paragraph {index}: " + " ".join(_words(40)) + "</p>"
+        for index in range(6)
+    )
+    padding = "".join(f"<p>Archive entry {index}: " + " ".join(_words(120)) + "</p>" for index in range(kb))
+    return f"""<!DOCTYPE html>
+<html><head><title>Competitor | {path}</title>
+<meta name="description" content="Fixture page for {path}">
+<script>window.analytics = {{track: function() {{}}}};</script><style>body {{font-family: sans-serif;}}</style></head>
+<body>
+<header class="site-header"><nav><a href="/">Home</a> <a href="/blog">Blog</a> <a href="/pricing">Pricing</a></nav></header>
+<div id="cookie-banner">We use cookies to improve your experience. <button>Accept</button></div>
+<main><article>
+<h1>{path}: growing your brand with content</h1>
+{paragraphs}
+<h2>Key takeaways</h2>
+<ul><li>Publish consistently</li><li>Know your audience</li><li>Measure what works</li></ul>
+{padding}
+</article>
+<aside class="sidebar"><h3>Related posts</h3><a href="/a">Post A</a> <a href="/b">Post B</a></aside></main>
+<div class="share-bar"><a href="#">Share on X</a> <a href="#">Share on LinkedIn</a></div>
+<footer>(c) Competitor Inc. <a href="/privacy">Privacy</a></footer>
+</body></html>"""
+
+def completion_text(prompt: str, config: MockConfig, json_object: bool = False) -> str:
+    """Answer in the shape the backend's prompt asks for: analysis, prompt ideas, search results or prose."""
+    if "Search the web for" in prompt:
+        results = _search_results(prompt)
+        return json.dumps({"results": results} if json_object else results)
+    if "generate" in prompt.lower() and "prompt ideas" in prompt:
+        return json.dumps(_prompt_ideas(prompt))
+    if "Analyze the competitor content" in prompt:
+        return json.dumps(_analysis(prompt))
+    return " ".join(_words(config.text_tokens))
+
+def tokenize(text: str) -> List[str]:
+    """Split text into word-sized chunks that join back into the original text."""
+    return re.findall(r"\S+\s*|\s+", text)
+
+def count_tokens(text: str) -> int:
+    return max(len(text) // 4, 1)
+
+class MockLLM:
+    def __init__(self, config: MockConfig):
+        self.config = config
+        self.stats = {
+            "requests": 0, "in_flight": 0, "max_in_flight": 0, "errors": 0, "rate_limited": 0,
+            "cache_control_requests": 0, "prompt_cache_hits": 0,
+            "site_requests": 0, "site_not_modified": 0, "site_bytes": 0
+        }
+        # Anthropic prompt prefixes marked with cache_control, as the API would cache them
+        self.cached_prefixes = set()
+
+    def anthropic_cache_usage(self, request: Request, body: Dict[str, Any]) -> Dict[str, int]:
+        """Usage fields for blocks marked with cache_control: created on first sight, read afterwards."""
+        system = body.get("system")
+        blocks = [block for block in system if block.get("cache_control")] if isinstance(system, list) else []
+        if not blocks or "prompt-caching" not in request.headers.get("anthropic-beta", ""):
+            return {}
+        self.stats["cache_control_requests"] += 1
+        prefix = "".join(block.get("text", "") for block in blocks)
+        if prefix in self.cached_prefixes:
+            self.stats["prompt_cache_hits"] += 1
+            return {"cache_creation_input_tokens": 0, "cache_read_input_tokens": count_tokens(prefix)}
+        self.cached_prefixes.add(prefix)
+        return {"cache_creation_input_tokens": count_tokens(prefix), "cache_read_input_tokens": 0}
+
+    async def wait_latency(self):
+        await asyncio.sleep(self.config.latency + random.uniform(0, self.config.jitter))
+
+    async def wait_tokens(self, count: int):
+        if self.config.token_rate > 0:
+            await asyncio.sleep(count / self.config.token_rate)
+
+    def injected_error(self, error_body: Dict[str, Any]) -> Optional[JSONResponse]:
+        """A 429 or 500 response when error injection fires, else None."""
+        roll = random.random()
+        if roll < self.config.rate_limit_rate:
+            self.stats["rate_limited"] += 1
+            return JSONResponse(error_body, status_code=429, headers={"retry-after": str(self.config.retry_after)})
+        if roll < self.config.rate_limit_rate + self.config.error_rate:
+            self.stats["errors"] += 1
+            return JSONResponse(error_body, status_code=500)
+        return None
+
+    async def paced(self, tokens: List[str]) -> AsyncIterator[str]:
+        interval = 1 / self.config.token_rate if self.config.token_rate > 0 else 0
+        for token in tokens:
+            if interval:
+                await asyncio.sleep(interval)
+            yield token
+
+def _sse(data: Any, event: Optional[str] = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {data if isinstance(data, str) else json.dumps(data)}\n\n"
+
+def create_app(config: Optional[MockConfig] = None) -> FastAPI:
+    mock = MockLLM(config or MockConfig())
+    app = FastAPI(title="Mock LLM")
+
+    @app.middleware("http")
+    async def track_in_flight(request: Request, call_next):
+        if request.url.path.startswith(("/__", "/site")):
+            return await call_next(request)
+        mock.stats["requests"] += 1
+        mock.stats["in_flight"] += 1
+        mock.stats["max_in_flight"] = max(mock.stats["max_in_flight"], mock.stats["in_flight"])
+        try:
+            return await call_next(request)
+        finally:
+            mock.stats["in_flight"] -= 1
+
+    @app.get("/__stats")
+    async def get_stats():
+        return {**mock.stats, "config": asdict(mock.config)}
+
+    @app.post("/__config")
+    async def set_config(request: Request):
+        mock.config.update(await request.json())
+        for key in mock.stats:
+            if key != "in_flight":
+                mock.stats[key] = 0
+        return asdict(mock.config)
+
+    # OpenAI / DeepSeek
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        error = mock.injected_error({"error": {"message": "Injected failure", "type": "server_error"}})
+        await mock.wait_latency()
+        if error is not None:
+            return error
+        prompt = "\n".join(str(message.get("content", "")) for message in body.get("messages", []))
+        json_object = (body.get("response_format") or {}).get("type") == "json_object"
+        text = completion_text(prompt, mock.config, json_object)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        model = body.get("model", "gpt-4")
+        usage = {"prompt_tokens": count_tokens(prompt), "completion_tokens": count_tokens(text)}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+
+        if not body.get("stream"):
+            await mock.wait_tokens(usage["completion_tokens"])
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": usage
+            }
+
+        async def events():
+            chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()), "model": model}
+            async for token in mock.paced(tokenize(text)):
+                yield _sse({**chunk, "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]})
+            yield _sse({**chunk, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+            yield _sse("[DONE]")
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.post("/v1/images/generations")
+    async def image_generations(request: Request):
+        error = mock.injected_error({"error": {"message": "Injected failure", "type": "server_error"}})
+        await mock.wait_latency()
+        if error is not None:
+            return error
+        return {"created": int(time.time()), "data": [{"url": f"https://images.example.com/{uuid.uuid4().hex}.png"}]}
+
+    # Anthropic
+
+    @app.post("/v1/messages")
+    async def messages(request: Request):
+        body = await request.json()
+        error = mock.injected_error({"type": "error", "error": {"type": "api_error", "message": "Injected failure"}})
+        await mock.wait_latency()
+        if error is not None:
+            return error
+        def block_text(content: Any) -> str:
+            if isinstance(content, str):
+                return content
+            return " ".join(block.get("text", "") for block in content or [])
+
+        prompt = "\n".join(
+            [block_text(body.get("system"))] + [block_text(message.get("content")) for message in body.get("messages", [])]
+        )
+        text = completion_text(prompt, mock.config)
+        message_id = f"msg_{uuid.uuid4().hex[:12]}"
+        model = body.get("model", "claude-3-sonnet-20240229")
+        usage = {"input_tokens": count_tokens(prompt), "output_tokens": count_tokens(text), **mock.anthropic_cache_usage(request, body)}
+
+        if not body.get("stream"):
+            await mock.wait_tokens(usage["output_tokens"])
+            return {
+                "id": message_id,
+                "type": "message",
+                "role": "assistant",
+                "model": model,
+                "content": [{"type": "text", "text": text}],
+                "stop_reason": "end_turn",
+                "stop_sequence": None,
+                "usage": usage
+            }
+
+        async def events():
+            yield _sse({
+                "type": "message_start",
+                "message": {
+                    "id": message_id, "type": "message", "role": "assistant", "model": model, "content": [],
+                    "stop_reason": None, "stop_sequence": None,
+                    "usage": {"input_tokens": usage["input_tokens"], "output_tokens": 1}
+                }
+            }, "message_start")
+            yield _sse({"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}}, "content_block_start")
+            async for token in mock.paced(tokenize(text)):
+                yield _sse({"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": token}}, "content_block_delta")
+            yield _sse({"type": "content_block_stop", "index": 0}, "content_block_stop")
+            yield _sse({
+                "type": "message_delta",
+                "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                "usage": {"output_tokens": usage["output_tokens"]}
+            }, "message_delta")
+            yield _sse({"type": "message_stop"}, "message_stop")
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    # Manus
+
+    manus_error = {"error": "Injected failure"}
+
+    @app.post("/manus/completions")
+    async def manus_completions(request: Request):
+        body = await request.json()
+        error = mock.injected_error(manus_error)
+        await mock.wait_latency()
+        if error is not None:
+            return error
+        text = completion_text(body.get("prompt", ""), mock.config)
+        if not body.get("stream"):
+            await mock.wait_tokens(count_tokens(text))
+            return {"text": text}
+
+        async def events():
+            async for token in mock.paced(tokenize(text)):
+                yield _sse({"text": token})
+            yield _sse("[DONE]")
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.post("/manus/analyze")
+    async def manus_analyze(request: Request):
+        body = await request.json()
+        error = mock.injected_error(manus_error)
+        await mock.wait_latency()
+        if error is not None:
+            return error
+        result = _analysis(body.get("prompt") or f"content at {body.get('url')}.")
+        await mock.wait_tokens(count_tokens(json.dumps(result)))
+        return result
+
+    @app.post("/manus/generate_prompts")
+    async def manus_generate_prompts(request: Request):
+        body = await request.json()
+        error = mock.injected_error(manus_error)
+        await mock.wait_latency()
+        if error is not None:
+            return error
+        ideas = _prompt_ideas(f"generate {body.get('num_ideas', 5)} creative prompt ideas")
+        await mock.wait_tokens(count_tokens(json.dumps(ideas)))
+        return {"prompt_ideas": ideas}
+
+    @app.post("/manus/search")
+    async def manus_search(request: Request):
+        body = await request.json()
+        error = mock.injected_error(manus_error)
+        await mock.wait_latency()
+        if error is not None:
+            return error
+        return {"results": _search_results(body.get("query", ""))}
+
+    @app.post("/manus/images/generate")
+    async def manus_images(request: Request):
+        error = mock.injected_error(manus_error)
+        await mock.wait_latency()
+        if error is not None:
+            return error
+        return {"image_url": f"https://images.example.com/{uuid.uuid4().hex}.png"}
+
+    # Competitor page fixtures
+
+    @app.get("/site/{path:path}")
+    async def site(path: str, request: Request, kb: int = 0):
+        mock.stats["site_requests"] += 1
+        html = site_page(path, kb)
+        etag = f'"{hashlib.sha256(html.encode()).hexdigest()[:16]}"'
+        headers = {"etag": etag, "last-modified": SITE_LAST_MODIFIED, "cache-control": "no-cache"}
+        if request.headers.get("if-none-match") == etag or (
+            "if-none-match" not in request.headers and request.headers.get("if-modified-since") == SITE_LAST_MODIFIED
+        ):
+            mock.stats["site_not_modified"] += 1
+            return Response(status_code=304, headers=headers)
+        mock.stats["site_bytes"] += len(html.encode())
+        return HTMLResponse(html, headers=headers)
+
+    @app.get("/site-redirect/{path:path}")
+    async def site_redirect(path: str):
+        return RedirectResponse(f"/site/{path}", status_code=302)
+
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    defaults = MockConfig()
+    parser.add_argument("--latency", type=float, default=defaults.latency, help="Seconds before the first token")
+    parser.add_argument("--jitter", type=float, default=defaults.jitter, help="Extra random latency, up to this many seconds")
+    parser.add_argument("--token-rate", type=float, default=defaults.token_rate, help="Output tokens per second (0: no pacing)")
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate, help="Share of calls answered with a 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=defaults.rate_limit_rate, help="Share of calls answered with a 429")
+    parser.add_argument("--retry-after", type=float, default=defaults.retry_after, help="Retry-After sent with 429s")
+    parser.add_argument("--text-tokens", type=int, default=defaults.text_tokens, help="Length of plain text completions")
+    args = parser.parse_args()
+
+    import uvicorn
+
+    config = MockConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        token_rate=args.token_rate,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        text_tokens=args.text_tokens
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Microbenchmark: cost of serializing a page of analyses, before and after
+native JSON columns and ORJSONResponse.
+
+Before: the text columns are decoded with json.loads per row, and the page
+is rendered by JSONResponse after jsonable_encoder. After: the columns are
+already decoded by the JSON column type, and the page is rendered by
+ORJSONResponse.
+
+Run from the backend directory:
+    python -m benchmarks.serialization [--rows 50] [--themes 20] [--repeat 200]
+"""
+import argparse
+import json
+import statistics
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+def build_analysis(row_id: int, num_themes: int) -> Dict[str, Any]:
+    """A realistic analysis result as returned by the providers."""
+    return {
+        "content_themes": [
+            {"theme": f"Theme {index} for competitor {row_id}", "confidence": round(0.5 + index / (2 * num_themes), 3)}
+            for index in range(num_themes)
+        ],
+        "content_strategy": [f"Strategy observation {index} " + "lorem ipsum " * 8 for index in range(num_themes // 2)],
+        "tone_analysis": "Conversational and data-driven. " * 10,
+        "target_audience": "Marketing leads at mid-sized B2B companies. " * 5,
+        "opportunities": [f"Opportunity {index}" for index in range(10)]
+    }
+
+def build_rows(num_rows: int, num_themes: int) -> List[Dict[str, Any]]:
+    """Rows in both storage layouts: text columns (before) and JSON columns (after)."""
+    rows = []
+    for row_id in range(num_rows):
+        analysis = build_analysis(row_id, num_themes)
+        common = {
+            "id": row_id,
+            "competitor_url": f"https://example.com/blog/{row_id}",
+            "analysis_type": "blog",
+            "provider": "openai",
+            "created_at": datetime.now(timezone.utc)
+        }
+        rows.append({
+            "before": {
+                **common,
+                "content_themes": json.dumps(analysis["content_themes"]),
+                "content_strategy": json.dumps(analysis["content_strategy"]),
+                "raw_analysis": json.dumps(analysis)
+            },
+            "after": {
+                **common,
+                "content_themes": analysis["content_themes"],
+                "content_strategy": analysis["content_strategy"],
+                "raw_analysis": {key: value for key, value in analysis.items() if key not in ("content_themes", "content_strategy")}
+            }
+        })
+    return rows
+
+def serialize_before(rows: List[Dict[str, Any]]) -> bytes:
+    items = [
+        {
+            **row["before"],
+            "content_themes": json.loads(row["before"]["content_themes"]),
+            "content_strategy": json.loads(row["before"]["content_strategy"]),
+            "raw_analysis": json.loads(row["before"]["raw_analysis"])
+        }
+        for row in rows
+    ]
+    return JSONResponse(jsonable_encoder({"items": items, "next_cursor": None})).body
+
+def serialize_after(rows: List[Dict[str, Any]]) -> bytes:
+    items = [row["after"] for row in rows]
+    return ORJSONResponse({"items": items, "next_cursor": None}).body
+
+def measure(func: Callable[[], bytes], repeat: int) -> Dict[str, float]:
+    func()  # warm up
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        "mean_ms": statistics.mean(timings),
+        "p50_ms": statistics.median(timings),
+        "min_ms": min(timings),
+        "bytes": len(body)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50, help="Analyses per page")
+    parser.add_argument("--themes", type=int, default=20, help="Themes per analysis")
+    parser.add_argument("--repeat", type=int, default=200, help="Timed iterations per variant")
+    args = parser.parse_args()
+
+    rows = build_rows(args.rows, args.themes)
+    before = measure(lambda: serialize_before(rows), args.repeat)
+    after = measure(lambda: serialize_after(rows), args.repeat)
+
+    print(f"{args.rows} rows x {args.themes} themes, {args.repeat} iterations")
+    for name, result in (("before (text + json)", before), ("after (JSON + orjson)", after)):
+        print(f"  {name:<22} mean {result['mean_ms']:7.3f} ms  p50 {result['p50_ms']:7.3f} ms  "
+              f"min {result['min_ms']:7.3f} ms  {result['bytes']} bytes")
+    print(f"  speedup (mean): {before['mean_ms'] / after['mean_ms']:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import os
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Tuple
+
+import pytest
+
+# Settings are read when app modules are imported, so point them at scratch
+# locations before any test imports the app
+TEST_DIR = tempfile.mkdtemp(prefix="backend-tests-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(TEST_DIR, 'test.db')}",
+    "RUN_MIGRATIONS_ON_STARTUP": "false",
+    "LLM_CACHE_PERSISTENT": "false",
+    "PAGE_CACHE_DIR": os.path.join(TEST_DIR, "page_cache")
+})
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+class StubRequest:
+    def __init__(self, method: str, path: str, headers: Dict[str, str], body: bytes):
+        self.method = method
+        self.path = path
+        self.headers = headers
+        self.body = body
+
+# A handler returns (status, headers, body) for a request
+StubHandler = Callable[[StubRequest], Tuple[int, Dict[str, str], bytes]]
+
+class StubServer:
+    """Local threaded HTTP server answering every request with a handler function."""
+
+    def __init__(self, handle: StubHandler):
+        self.requests: List[StubRequest] = []
+        server = self
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            def _respond(self):
+                length = int(self.headers.get("content-length") or 0)
+                request = StubRequest(
+                    self.command, self.path, {key.lower(): value for key, value in self.headers.items()},
+                    self.rfile.read(length) if length else b""
+                )
+                server.requests.append(request)
+                status, headers, body = handle(request)
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("content-length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = _respond
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), RequestHandler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+@pytest.fixture
+def stub_server():
+    """Start local HTTP stub servers: ``stub_server(handle)`` returns a running StubServer."""
+    servers = []
+
+    def start(handle: StubHandler) -> StubServer:
+        server = StubServer(handle)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.close()
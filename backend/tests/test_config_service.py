@@ -0,0 +1,58 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, select
+
+from app.db.migrations import run_migrations
+from app.db.session import AsyncSessionLocal, async_engine
+from app.main import app
+from app.models.models import CacheVersion
+from app.services.config_service import API_KEYS_CACHE_NAME, ConfigurationService
+
+def test_invalidate_api_key_creates_then_bumps_the_version():
+    run_migrations()
+
+    async def run():
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(delete(CacheVersion))
+                await db.commit()
+
+            versions = []
+            for _ in range(2):
+                # Separate sessions, as two requests changing keys would use
+                async with AsyncSessionLocal() as db:
+                    await ConfigurationService().invalidate_api_key("openai", db)
+                    await db.commit()
+                    versions.append(await db.scalar(
+                        select(CacheVersion.version).where(CacheVersion.name == API_KEYS_CACHE_NAME)
+                    ))
+            return versions
+        finally:
+            await async_engine.dispose()
+
+    assert asyncio.run(run()) == [1, 2]
+
+def test_mixed_case_api_key_is_found_and_deleted_by_lowercase_name():
+    run_migrations()
+    client = TestClient(app)
+
+    created = client.post("/api/config/api-keys", json={"provider": "DeepSeek", "api_key": "sk-test"})
+    assert created.status_code == 200
+    assert created.json()["provider"] == "deepseek"
+
+    async def lookup():
+        try:
+            async with AsyncSessionLocal() as db:
+                service = ConfigurationService()
+                return await service.get_api_key("DEEPSEEK", db), await service.get_active_providers(db)
+        finally:
+            await async_engine.dispose()
+
+    key, active = asyncio.run(lookup())
+    assert key == "sk-test"
+    assert "deepseek" in active
+
+    deleted = client.delete("/api/config/api-keys/DeepSeek")
+    assert deleted.status_code == 200
+    assert deleted.json()["is_active"] is False
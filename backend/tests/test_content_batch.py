@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from app.db.migrations import run_migrations
+from app.db.session import AsyncSessionLocal, async_engine
+from app.main import app
+from app.models import models
+from app.services.content_service import ContentService
+
+class EchoProvider:
+    def __init__(self, name):
+        self.name = name
+
+    async def generate_text(self, prompt, options=None):
+        return f"{self.name}: {prompt}"
+
+class FakeConfigService:
+    """Only claude has an active key."""
+
+    async def get_active_providers(self, db):
+        return ["claude"]
+
+    async def get_llm_provider(self, provider, db):
+        if provider != "claude":
+            raise ValueError(f"No active API key found for provider: {provider}")
+        return EchoProvider(provider)
+
+@pytest.fixture
+def prompt_id():
+    run_migrations()
+
+    async def seed():
+        async with AsyncSessionLocal() as db:
+            prompt = models.PromptIdea(prompt_text="Write a tagline", provider="openai")
+            db.add(prompt)
+            await db.commit()
+            return prompt.id
+
+    return asyncio.run(seed())
+
+def run_batch(items):
+    async def run():
+        try:
+            async with AsyncSessionLocal() as db:
+                service = ContentService(db)
+                service.config_service = FakeConfigService()
+                return [event async for event in await service.generate_content_batch(items)]
+        finally:
+            await async_engine.dispose()
+
+    return asyncio.run(run())
+
+def test_batch_resolves_providers_through_the_router(prompt_id):
+    events = run_batch([
+        {"prompt_id": prompt_id, "content_type": "text", "provider": "auto"},
+        {"prompt_id": prompt_id, "content_type": "text", "provider": "Claude"},
+        {"prompt_id": prompt_id, "content_type": "text", "provider": "openai"},
+        {"prompt_id": prompt_id, "content_type": "image", "provider": "auto"}
+    ])
+    results = {data["index"]: data for event, data in events if event == "result"}
+
+    assert results[0]["status"] == "ok"
+    assert (results[0]["provider"], results[0]["content_text"]) == ("claude", "claude: Write a tagline")
+    assert (results[1]["status"], results[1]["provider"]) == ("ok", "claude")
+    assert results[2]["detail"] == "No active API key found for provider: openai"
+    # No active provider can generate images
+    assert results[3]["status"] == "error"
+    assert events[-1] == ("done", {"total": 4, "succeeded": 2, "failed": 2})
+
+def count_generated_content():
+    async def run():
+        try:
+            async with AsyncSessionLocal() as db:
+                return await db.scalar(select(func.count()).select_from(models.GeneratedContent))
+        finally:
+            await async_engine.dispose()
+
+    return asyncio.run(run())
+
+def test_video_is_rejected_before_routing(prompt_id):
+    before = count_generated_content()
+
+    response = TestClient(app).post(
+        "/api/content/generate", json={"prompt_id": prompt_id, "content_type": "video", "provider": "auto"}
+    )
+    events = run_batch([{"prompt_id": prompt_id, "content_type": "video", "provider": "auto"}])
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Generating video content is not supported yet"
+    assert events[0] == ("result", {"index": 0, "status": "error", "detail": "Generating video content is not supported yet"})
+    assert count_generated_content() == before
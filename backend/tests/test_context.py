@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.llm import context
+from app.main import app
+
+@pytest.fixture
+def offline_tiktoken(monkeypatch):
+    """tiktoken installed, but its encoding file cannot be downloaded."""
+    def get_encoding(name):
+        raise ConnectionError("no network")
+
+    monkeypatch.setattr(context, "TIKTOKEN_AVAILABLE", True)
+    monkeypatch.setattr(context, "tiktoken", SimpleNamespace(get_encoding=get_encoding), raising=False)
+    context._get_encoding.cache_clear()
+    yield
+    context._get_encoding.cache_clear()
+
+def test_count_tokens_falls_back_when_encoding_cannot_load(offline_tiktoken):
+    assert context.count_tokens("x" * 40) == 10
+
+def test_build_analysis_contexts_covers_every_budget(offline_tiktoken, monkeypatch):
+    monkeypatch.setattr(context.settings, "PROMPT_CONTEXT_TOKEN_BUDGET", 1500)
+    monkeypatch.setattr(context.settings, "PROVIDER_CONTEXT_TOKEN_BUDGETS", {"deepseek": 20})
+    analysis = {
+        "content_themes": [{"theme": f"Theme {index}", "confidence": index / 10} for index in range(8)],
+        "tone_analysis": "error parsing response"
+    }
+
+    contexts = context.build_analysis_contexts(analysis)
+
+    assert set(contexts) == {1500, 20}
+    assert contexts[context.get_context_budget("deepseek")].tokens <= 20
+    assert contexts[context.get_context_budget("openai")].data["content_themes"][0]["theme"] == "Theme 7"
+    assert "tone_analysis" not in contexts[1500].data
+
+def test_encoding_is_loaded_at_startup(monkeypatch):
+    loads = []
+    encoding = SimpleNamespace(encode=lambda text: text.split())
+
+    def get_encoding(name):
+        loads.append(name)
+        return encoding
+
+    monkeypatch.setattr(context, "TIKTOKEN_AVAILABLE", True)
+    monkeypatch.setattr(context, "tiktoken", SimpleNamespace(get_encoding=get_encoding), raising=False)
+    context._get_encoding.cache_clear()
+    try:
+        with TestClient(app):
+            assert loads == ["cl100k_base"]
+            assert context.count_tokens("three short words") == 3
+        assert loads == ["cl100k_base"]
+    finally:
+        context._get_encoding.cache_clear()
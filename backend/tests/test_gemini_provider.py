@@ -0,0 +1,47 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.llm.errors import ProviderResponseError, ProviderUnavailableError, RateLimitError
+from app.llm.gemini_provider import GeminiProvider
+
+def call_gemini(stub_server, monkeypatch, status, body, call):
+    server = stub_server(lambda request: (status, {"content-type": "application/json", "retry-after": "7"}, body))
+    monkeypatch.setattr("app.llm.gemini_provider.settings.GEMINI_BASE_URL", server.url)
+
+    async def run():
+        async with httpx.AsyncClient(timeout=10) as client:
+            return await call(GeminiProvider(api_key="test-key", http_client=client))
+
+    return asyncio.run(run())
+
+async def stream(provider):
+    return [chunk async for chunk in provider.stream_text("Write a tagline")]
+
+OPERATIONS = {
+    "analyze_competitor": lambda provider: provider.analyze_competitor("https://competitor.example/", "blog"),
+    "generate_prompt_ideas": lambda provider: provider.generate_prompt_ideas({"content_themes": ["pricing"]}),
+    "stream_text": stream
+}
+
+@pytest.mark.parametrize("operation", OPERATIONS)
+def test_429_becomes_rate_limit_error(stub_server, monkeypatch, operation):
+    with pytest.raises(RateLimitError) as error:
+        call_gemini(stub_server, monkeypatch, 429, b"{}", OPERATIONS[operation])
+
+    assert error.value.provider == "gemini"
+    assert error.value.retry_after == 7
+
+@pytest.mark.parametrize("operation", OPERATIONS)
+def test_5xx_becomes_unavailable_error(stub_server, monkeypatch, operation):
+    with pytest.raises(ProviderUnavailableError) as error:
+        call_gemini(stub_server, monkeypatch, 503, b"{}", OPERATIONS[operation])
+
+    assert error.value.status_code == 503
+
+@pytest.mark.parametrize("operation", ["analyze_competitor", "generate_prompt_ideas"])
+def test_malformed_response_becomes_response_error(stub_server, monkeypatch, operation):
+    with pytest.raises(ProviderResponseError):
+        call_gemini(stub_server, monkeypatch, 200, json.dumps({"candidates": []}).encode(), OPERATIONS[operation])
@@ -0,0 +1,93 @@
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import delete
+
+from app.db.migrations import run_migrations
+from app.db.session import AsyncSessionLocal, async_engine
+from app.llm.errors import ProviderResponseError, RateLimitError
+from app.models import models
+from app.services.job_service import JobQueue
+
+@pytest.fixture
+def queue():
+    run_migrations()
+
+    async def clear():
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(models.Job))
+            await db.commit()
+        await async_engine.dispose()
+
+    asyncio.run(clear())
+    return JobQueue()
+
+def run(coro_fn):
+    async def wrapped():
+        try:
+            return await coro_fn()
+        finally:
+            await async_engine.dispose()
+
+    return asyncio.run(wrapped())
+
+async def add_job(**values) -> int:
+    async with AsyncSessionLocal() as db:
+        job = models.Job(**{"kind": "flaky", "payload": "{}", "status": "queued", "run_after": 0, **values})
+        db.add(job)
+        await db.commit()
+        return job.id
+
+async def get_job(job_id: int) -> models.Job:
+    async with AsyncSessionLocal() as db:
+        return await db.get(models.Job, job_id)
+
+def run_once(queue: JobQueue, error: Exception) -> models.Job:
+    """Claim the queued job and run it with a handler raising ``error``."""
+    async def handler(db, payload):
+        raise error
+
+    queue.handlers = {"flaky": handler}
+
+    async def go():
+        job_id = await add_job(max_attempts=3)
+        await queue._run(await queue._claim())
+        return await get_job(job_id)
+
+    return run(go)
+
+def test_transient_error_is_retried_after_retry_after(queue):
+    job = run_once(queue, RateLimitError("slow down", "openai", retry_after=60))
+
+    assert job.status == "queued"
+    assert job.attempts == 1
+    assert job.run_after >= time.time() + 55
+
+def test_permanent_error_fails_without_retry(queue):
+    job = run_once(queue, ProviderResponseError("not JSON", "openai"))
+
+    assert job.status == "failed"
+    assert job.attempts == 1
+    assert job.error == "not JSON"
+
+def test_local_error_fails_without_retry(queue):
+    job = run_once(queue, ValueError("bad payload"))
+
+    assert (job.status, job.attempts) == ("failed", 1)
+
+def test_expired_lease_requeues_until_attempts_run_out(queue):
+    async def go():
+        expired = time.time() - 1
+        retried = await add_job(status="running", attempts=1, max_attempts=3, lease_expires_at=expired)
+        exhausted = await add_job(status="running", attempts=3, max_attempts=3, lease_expires_at=expired)
+        claimed = await queue._claim()
+        return claimed, await get_job(retried), await get_job(exhausted)
+
+    claimed, retried, exhausted = run(go)
+
+    assert claimed.id == retried.id
+    assert (retried.status, retried.attempts) == ("running", 2)
+    assert exhausted.status == "failed"
+    assert exhausted.error == "Job lease expired"
+    assert exhausted.lease_expires_at is None
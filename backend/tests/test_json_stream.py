@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+from app.llm.json_stream import JSONArrayStreamParser, parse_json_array
+
+IDEAS = [
+    {"prompt_text": 'Say "hello" to C:\\Users', "confidence_score": 90, "explanation": "Quotes and backslashes"},
+    {"prompt_text": "Caf\u00e9 [draft] {v2}", "confidence_score": 75, "explanation": "Brackets ] in [ strings }"},
+    {"prompt_text": "Plain", "confidence_score": 60, "explanation": "Last one"}
+]
+COMPLETION = json.dumps(IDEAS, indent=2, ensure_ascii=True)
+
+def feed_in_chunks(text, size):
+    parser = JSONArrayStreamParser()
+    elements = []
+    for start in range(0, len(text), size):
+        elements.extend(parser.feed(text[start:start + size]))
+    return parser, elements
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 7, 64])
+def test_chunk_boundaries_inside_strings_and_escapes(size):
+    # ensure_ascii writes \u00e9, so small chunks split \", \\ and \u escapes
+    assert "\\u00e9" in COMPLETION and '\\"' in COMPLETION and "\\\\" in COMPLETION
+
+    parser, elements = feed_in_chunks(COMPLETION, size)
+
+    assert elements == IDEAS
+    assert parser.finished
+    assert parser.errors == 0
+
+def test_every_split_point_yields_the_same_elements():
+    for split in range(len(COMPLETION) + 1):
+        parser = JSONArrayStreamParser()
+        elements = parser.feed(COMPLETION[:split]) + parser.feed(COMPLETION[split:])
+        assert elements == IDEAS, split
+
+def test_elements_are_emitted_as_soon_as_they_close():
+    parser = JSONArrayStreamParser()
+
+    assert parser.feed('[{"a": 1}, {"b"') == [{"a": 1}]
+    assert parser.feed(': 2}') == [{"b": 2}]
+    assert not parser.finished
+    assert parser.feed("]") == []
+    assert parser.finished
+
+def test_prose_and_markdown_fence_before_the_array_are_skipped():
+    text = "Here are your ideas:\n\n```json\n" + COMPLETION + "\n```\nLet me know if you need more."
+
+    assert parse_json_array(text) == IDEAS
+
+def test_malformed_element_is_dropped_and_later_ones_kept():
+    parser = JSONArrayStreamParser()
+
+    elements = parser.feed('[{"prompt_text": "ok"}, {"prompt_text": oops}, {"prompt_text": "also ok"}]')
+
+    assert elements == [{"prompt_text": "ok"}, {"prompt_text": "also ok"}]
+    assert parser.errors == 1
+    assert parser.finished
+
+def test_scalar_strings_with_brackets_are_skipped():
+    assert parse_json_array('["not {an object", {"a": 1}, "x ] y", {"b": 2}]') == [{"a": 1}, {"b": 2}]
+
+def test_truncated_tail_keeps_complete_elements():
+    cut = COMPLETION.index('"Plain"')
+    parser, elements = feed_in_chunks(COMPLETION[:cut], 4)
+
+    assert elements == IDEAS[:2]
+    assert not parser.finished
+    assert parser.errors == 0
+
+def test_no_array_yields_nothing():
+    parser = JSONArrayStreamParser()
+
+    assert parser.feed("I cannot help with that.") == []
+    assert not parser.finished
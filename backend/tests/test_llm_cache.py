@@ -0,0 +1,61 @@
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import delete, select
+from sqlalchemy.exc import OperationalError
+
+from app.db import session
+from app.db.migrations import run_migrations
+from app.db.session import AsyncSessionLocal, async_engine
+from app.llm.cache import LLMResponseCache, settings
+from app.models.models import LLMCacheEntry
+
+@pytest.fixture
+def persistent_cache(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CACHE_PERSISTENT", True)
+    return LLMResponseCache()
+
+def run(coro_fn):
+    async def wrapped():
+        try:
+            return await coro_fn()
+        finally:
+            await async_engine.dispose()
+
+    return asyncio.run(wrapped())
+
+def test_database_errors_degrade_to_a_miss_and_a_skipped_write(persistent_cache, monkeypatch):
+    def broken_session():
+        raise OperationalError("SELECT", {}, Exception("no such table: llm_cache_entries"))
+
+    monkeypatch.setattr(session, "AsyncSessionLocal", broken_session)
+
+    async def scenario():
+        missed = await persistent_cache.get("key")
+        await persistent_cache.set("key", "cached text", "openai", "generate_text", 60)
+        return missed, await persistent_cache.get("key")
+
+    missed, hit = run(scenario)
+
+    assert missed is None
+    # The in-memory tier still works
+    assert hit == "cached text"
+    assert persistent_cache.counters["db_errors"] == 2
+
+def test_set_purges_expired_rows(persistent_cache):
+    run_migrations()
+
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(LLMCacheEntry))
+            db.add(LLMCacheEntry(key="stale", provider="openai", operation="generate_text", value='"old"', expires_at=time.time() - 1))
+            await db.commit()
+
+        await persistent_cache.set("fresh", "new", "openai", "generate_text", 60)
+
+        async with AsyncSessionLocal() as db:
+            return set(await db.scalars(select(LLMCacheEntry.key)))
+
+    assert run(scenario) == {"fresh"}
+    assert persistent_cache.counters["purged"] == 1
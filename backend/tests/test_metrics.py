@@ -0,0 +1,16 @@
+import pytest
+
+from app.core.metrics import Counter, _Metric
+
+def test_metric_without_render_fails_at_instantiation():
+    class Incomplete(_Metric):
+        type_name = "gauge"
+
+    with pytest.raises(TypeError):
+        Incomplete("incomplete", "Forgot to implement render.")
+
+def test_counter_renders_header_and_values():
+    counter = Counter("jobs_total", "Jobs run.", ["status"])
+    counter.inc("ok", amount=2)
+
+    assert counter.render() == ["# HELP jobs_total Jobs run.", "# TYPE jobs_total counter", 'jobs_total{status="ok"} 2']
@@ -0,0 +1,189 @@
+import asyncio
+import hashlib
+import time
+
+import httpx
+import pytest
+
+from app.fetch import fetcher as fetcher_module
+from app.fetch.fetcher import PageCache, PageFetcher, PageFetchError
+from app.services.analysis_service import AnalysisService
+
+LAST_MODIFIED = "Mon, 01 Jan 2024 00:00:00 GMT"
+ARTICLE = (
+    "<html><head><title>Fixture</title></head><body>"
+    "<nav><a href='/'>Home</a></nav>"
+    "<article><h1>Launch notes</h1><p>Our spring campaign doubles down on customer stories.</p></article>"
+    "<footer>(c) Fixture</footer></body></html>"
+).encode()
+LARGE_PAGE = b"<html><body>" + b"".join(b"<p>Paragraph %d of filler text.</p>" % index for index in range(5000)) + b"</body></html>"
+ETAG = f'"{hashlib.sha256(ARTICLE).hexdigest()[:16]}"'
+
+def fixture_site(request):
+    """Serves /page with validators (and 304s), /large, and /moved redirecting to /page."""
+    if request.path == "/page":
+        headers = {"content-type": "text/html; charset=utf-8", "etag": ETAG, "last-modified": LAST_MODIFIED}
+        if request.headers.get("if-none-match") == ETAG:
+            return 304, headers, b""
+        return 200, headers, ARTICLE
+    if request.path == "/large":
+        return 200, {"content-type": "text/html"}, LARGE_PAGE
+    return 404, {"content-type": "text/plain"}, b"not found"
+
+@pytest.fixture
+def fetch_settings(monkeypatch):
+    settings = fetcher_module.settings
+    monkeypatch.setattr(settings, "PAGE_FETCH_ALLOW_PRIVATE", True)
+    monkeypatch.setattr(settings, "PAGE_CACHE_TTL", 3600.0)
+    monkeypatch.setattr(settings, "PAGE_FETCH_MAX_BYTES", 2 * 1024 * 1024)
+    return settings
+
+def run_fetches(cache_dir, urls, transport=None):
+    """Fetch URLs in order with a fresh fetcher; returns the pages (or errors) and the fetcher."""
+    async def run():
+        async with httpx.AsyncClient(timeout=5, transport=transport) as client:
+            fetcher = PageFetcher(PageCache(str(cache_dir)), client)
+            results = []
+            for url in urls:
+                try:
+                    results.append(await fetcher.fetch(url))
+                except PageFetchError as e:
+                    results.append(e)
+            return results, fetcher
+
+    return asyncio.run(run())
+
+def test_download_then_conditional_revalidation(stub_server, fetch_settings, monkeypatch, tmp_path):
+    server = stub_server(fixture_site)
+    # Every cached copy is stale, so the second fetch revalidates
+    monkeypatch.setattr(fetch_settings, "PAGE_CACHE_TTL", 0.0)
+
+    (first, second), fetcher = run_fetches(tmp_path, [f"{server.url}/page"] * 2)
+
+    assert first.source == "network"
+    assert first.title == "Fixture"
+    assert "spring campaign" in first.text
+    assert "Home" not in first.text and "(c) Fixture" not in first.text
+    assert second.source == "revalidated"
+    assert second.text == first.text
+    revalidation = server.requests[1]
+    assert revalidation.headers["if-none-match"] == ETAG
+    assert revalidation.headers["if-modified-since"] == LAST_MODIFIED
+
+def test_fresh_cache_hit_makes_no_request(stub_server, fetch_settings, tmp_path):
+    server = stub_server(fixture_site)
+
+    (first, second), _ = run_fetches(tmp_path, [f"{server.url}/page"] * 2)
+
+    assert (first.source, second.source) == ("network", "cache")
+    assert len(server.requests) == 1
+
+def test_body_is_cut_off_at_max_bytes(stub_server, fetch_settings, monkeypatch, tmp_path):
+    server = stub_server(fixture_site)
+    monkeypatch.setattr(fetch_settings, "PAGE_FETCH_MAX_BYTES", 4096)
+
+    [page], fetcher = run_fetches(tmp_path, [f"{server.url}/large"])
+
+    assert page.truncated
+    assert "Paragraph 0 " in page.text
+    assert "Paragraph 4999" not in page.text
+    assert fetcher.counters["truncated"] == 1
+
+def test_redirect_to_private_address_is_refused(stub_server, fetch_settings, monkeypatch, tmp_path):
+    server = stub_server(fixture_site)
+    monkeypatch.setattr(fetch_settings, "PAGE_FETCH_ALLOW_PRIVATE", False)
+
+    async def resolve(host):
+        return ["93.184.216.34"] if host == "public.example" else ["127.0.0.1"]
+
+    monkeypatch.setattr(fetcher_module, "_resolve", resolve)
+    # public.example is served in-process and redirects to the fixture server on loopback
+    public_site = httpx.MockTransport(
+        lambda request: httpx.Response(302, headers={"location": f"{server.url}/page"})
+    )
+
+    [error], fetcher = run_fetches(tmp_path, ["http://public.example/page"], transport=public_site)
+
+    assert isinstance(error, PageFetchError)
+    assert "non-public address 127.0.0.1" in str(error)
+    assert server.requests == []
+    assert fetcher.counters["errors"] == 1
+
+def test_cross_host_redirect_drops_validators(stub_server, fetch_settings, monkeypatch, tmp_path):
+    target = stub_server(fixture_site)
+    origin = stub_server(lambda request: (302, {"location": f"{target.url}/page"}, b""))
+    monkeypatch.setattr(fetch_settings, "PAGE_CACHE_TTL", 0.0)
+
+    (first, second), _ = run_fetches(tmp_path, [f"{origin.url}/moved"] * 2)
+
+    assert first.final_url == f"{target.url}/page"
+    # Our validators go to the host we cached the page under, never to the redirect target
+    assert origin.requests[1].headers["if-none-match"] == ETAG
+    assert "if-none-match" not in target.requests[1].headers
+    assert "if-modified-since" not in target.requests[1].headers
+    assert second.source == "network"
+
+def test_unwritable_cache_still_returns_the_page(stub_server, fetch_settings, tmp_path):
+    server = stub_server(fixture_site)
+    # A file where the cache directory should be makes every store fail
+    blocked = tmp_path / "cache"
+    blocked.write_text("")
+
+    [page], _ = run_fetches(blocked, [f"{server.url}/page"])
+
+    assert page.source == "network"
+    assert "spring campaign" in page.text
+
+def test_stats_count_hits_and_bandwidth(stub_server, fetch_settings, monkeypatch, tmp_path):
+    server = stub_server(fixture_site)
+    url = f"{server.url}/page"
+
+    _, fetcher = run_fetches(tmp_path, [url, url, f"{server.url}/missing"])
+    stats = fetcher.stats()
+
+    assert stats["requests"] == 3
+    assert stats["downloads"] == 1
+    assert stats["cache_hits"] == 1
+    assert stats["revalidated"] == 0
+    assert stats["errors"] == 1
+    assert stats["bytes_downloaded"] >= len(ARTICLE)
+    assert stats["bytes_saved"] == len(ARTICLE)
+    assert stats["hit_rate"] == 0.5
+
+def test_analysis_falls_back_to_url_when_fetch_fails_unexpectedly(monkeypatch):
+    async def broken_fetch(url):
+        raise OSError("read-only file system")
+
+    monkeypatch.setattr("app.services.analysis_service.page_fetcher.fetch", broken_fetch)
+
+    assert asyncio.run(AnalysisService(db=None)._fetch_page_text("https://competitor.example/")) is None
+
+def test_extraction_does_not_block_the_event_loop(stub_server, fetch_settings, monkeypatch, tmp_path):
+    server = stub_server(fixture_site)
+    extract = PageFetcher._extract
+
+    def slow_extract(self, response, body):
+        time.sleep(0.3)
+        return extract(self, response, body)
+
+    monkeypatch.setattr(PageFetcher, "_extract", slow_extract)
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.02)
+                ticks += 1
+
+        ticking = asyncio.create_task(ticker())
+        async with httpx.AsyncClient(timeout=5) as client:
+            page = await PageFetcher(PageCache(str(tmp_path)), client).fetch(f"{server.url}/page")
+        ticking.cancel()
+        return page, ticks
+
+    page, ticks = asyncio.run(run())
+
+    assert "spring campaign" in page.text
+    assert ticks >= 5
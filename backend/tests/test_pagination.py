@@ -0,0 +1,58 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import delete, select, text
+
+from app.api.pagination import apply_date_range, paginate
+from app.db.migrations import run_migrations
+from app.db.session import AsyncSessionLocal, async_engine
+from app.models import models
+
+# Rows as SQLite's CURRENT_TIMESTAMP default stores them: UTC, whole seconds
+CREATED_AT = ["2026-01-01 11:59:59", "2026-01-01 12:00:00", "2026-01-01 12:30:00", "2026-01-01 13:00:00"]
+
+@pytest.fixture(scope="module")
+def analyses():
+    run_migrations()
+
+    async def seed():
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(models.CompetitorAnalysis))
+            # Raw SQL, because the ORM would write the timestamps with microseconds
+            await db.execute(
+                text(
+                    "INSERT INTO competitor_analyses (competitor_url, analysis_type, provider, created_at) "
+                    "VALUES (:url, 'blog', 'openai', :created_at)"
+                ),
+                [{"url": f"https://competitor.example/{index}", "created_at": created_at} for index, created_at in enumerate(CREATED_AT)]
+            )
+            await db.commit()
+        await async_engine.dispose()
+
+    asyncio.run(seed())
+
+def created_within(created_after, created_before):
+    async def run():
+        try:
+            async with AsyncSessionLocal() as db:
+                query = apply_date_range(db, select(models.CompetitorAnalysis), models.CompetitorAnalysis, created_after, created_before)
+                page = await paginate(db, query, models.CompetitorAnalysis)
+                return sorted(item.created_at.strftime("%Y-%m-%d %H:%M:%S") for item in page["items"])
+        finally:
+            await async_engine.dispose()
+
+    return asyncio.run(run())
+
+def test_range_includes_a_row_created_exactly_at_created_after(analyses):
+    assert created_within(datetime(2026, 1, 1, 12, 0, 0), datetime(2026, 1, 1, 13, 0, 0)) == [
+        "2026-01-01 12:00:00", "2026-01-01 12:30:00"
+    ]
+
+def test_aware_bounds_are_compared_in_utc(analyses):
+    plus_two = timezone(timedelta(hours=2))
+
+    assert created_within(datetime(2026, 1, 1, 14, 0, 0, tzinfo=plus_two), None) == [
+        "2026-01-01 12:00:00", "2026-01-01 12:30:00", "2026-01-01 13:00:00"
+    ]
+    assert created_within(None, datetime(2026, 1, 1, 14, 0, 0, tzinfo=plus_two)) == ["2026-01-01 11:59:59"]
@@ -0,0 +1,73 @@
+import asyncio
+import json
+
+import httpx
+
+from app.llm.claude_provider import ClaudeProvider
+from app.llm.context import count_tokens
+from app.llm.prompts import ANTHROPIC_PROMPT_CACHING_BETA, PROMPT_TEMPLATES, settings
+
+ANALYSIS = {"content_themes": ["pricing"], "content_strategy": [], "tone_analysis": "", "target_audience": "", "opportunities": []}
+
+def messages_api(request):
+    body = {
+        "id": "msg_stub",
+        "type": "message",
+        "role": "assistant",
+        "model": "claude-3-opus-20240229",
+        "content": [{"type": "text", "text": json.dumps(ANALYSIS)}],
+        "stop_reason": "end_turn",
+        "stop_sequence": None,
+        "usage": {"input_tokens": 10, "output_tokens": 5}
+    }
+    return 200, {"content-type": "application/json"}, json.dumps(body).encode()
+
+def call_claude(stub_server, monkeypatch, call):
+    server = stub_server(messages_api)
+    monkeypatch.setattr("app.llm.claude_provider.settings.ANTHROPIC_BASE_URL", server.url)
+
+    async def run():
+        async with httpx.AsyncClient(timeout=10) as client:
+            return await call(ClaudeProvider(api_key="test-key", http_client=client))
+
+    result = asyncio.run(run())
+    [request] = server.requests
+    return result, request, json.loads(request.body)
+
+def test_long_system_prompt_is_sent_as_a_cache_breakpoint(stub_server, monkeypatch):
+    system = "Follow the house style guide. " * 400
+    assert count_tokens(system) >= settings.PROMPT_CACHE_MIN_TOKENS
+
+    result, request, body = call_claude(
+        stub_server, monkeypatch, lambda provider: provider.generate_text("Write a tagline", {"system": system})
+    )
+
+    assert request.path == "/v1/messages"
+    assert ANTHROPIC_PROMPT_CACHING_BETA in request.headers["anthropic-beta"]
+    assert body["system"] == [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}]
+    assert body["messages"] == [{"role": "user", "content": "Write a tagline"}]
+    assert result == json.dumps(ANALYSIS)
+
+def test_builtin_prefixes_are_below_the_cacheable_minimum(stub_server, monkeypatch):
+    # Caching is inert for the shipped templates, so no cache marker or beta header is sent
+    for template in PROMPT_TEMPLATES.values():
+        assert count_tokens(template.prefix) < settings.PROMPT_CACHE_MIN_TOKENS
+
+    result, request, body = call_claude(
+        stub_server, monkeypatch, lambda provider: provider.analyze_competitor("https://competitor.example/", "blog")
+    )
+
+    assert result == ANALYSIS
+    assert "anthropic-beta" not in request.headers
+    assert body["system"] == [{"type": "text", "text": PROMPT_TEMPLATES["analyze_competitor"].prefix}]
+
+def test_caching_can_be_disabled(stub_server, monkeypatch):
+    monkeypatch.setattr(settings, "PROMPT_CACHING_ENABLED", False)
+    system = "Follow the house style guide. " * 400
+
+    _, request, body = call_claude(
+        stub_server, monkeypatch, lambda provider: provider.generate_text("Write a tagline", {"system": system})
+    )
+
+    assert "anthropic-beta" not in request.headers
+    assert "cache_control" not in body["system"][0]
@@ -0,0 +1,53 @@
+import asyncio
+import json
+import time
+
+import httpx
+
+from app.llm.openai_provider import OpenAIProvider
+
+UPSTREAM_LATENCY = 0.5
+CONCURRENCY = 10
+
+def slow_completion(request):
+    time.sleep(UPSTREAM_LATENCY)
+    body = {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "gpt-4",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": "stub text"}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 5, "completion_tokens": 2, "total_tokens": 7}
+    }
+    return 200, {"content-type": "application/json"}, json.dumps(body).encode()
+
+def test_concurrent_generations_overlap(stub_server, monkeypatch):
+    server = stub_server(slow_completion)
+    monkeypatch.setattr("app.llm.openai_provider.settings.OPENAI_BASE_URL", f"{server.url}/v1")
+
+    async def run():
+        async with httpx.AsyncClient(timeout=10) as client:
+            provider = OpenAIProvider(api_key="test-key", http_client=client)
+            # Ticks keep running only if no provider call blocks the event loop
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.05)
+                    ticks += 1
+
+            ticking = asyncio.create_task(ticker())
+            start = time.perf_counter()
+            results = await asyncio.gather(*(provider.generate_text(f"prompt {index}") for index in range(CONCURRENCY)))
+            elapsed = time.perf_counter() - start
+            ticking.cancel()
+            return results, elapsed, ticks
+
+    results, elapsed, ticks = asyncio.run(run())
+
+    assert results == ["stub text"] * CONCURRENCY
+    assert len(server.requests) == CONCURRENCY
+    # Sequential calls would take CONCURRENCY * UPSTREAM_LATENCY
+    assert elapsed < UPSTREAM_LATENCY * 3
+    assert ticks >= int(UPSTREAM_LATENCY / 0.05) // 2
@@ -0,0 +1,73 @@
+import asyncio
+from datetime import datetime
+from typing import Any, List, Tuple
+
+import pytest
+from sqlalchemy import event, select
+
+from app.api.pagination import encode_cursor, paginate
+from app.db.migrations import run_migrations
+from app.db.session import AsyncSessionLocal, async_engine, engine
+from app.models import models
+
+CURSOR = encode_cursor(datetime(2026, 1, 1, 12, 0, 0), 5)
+
+# (model, list query as the endpoints build it, index it must use, filtered by a foreign key)
+LIST_QUERIES = [
+    (models.CompetitorAnalysis, select(models.CompetitorAnalysis), "ix_competitor_analyses_created_at_id", False),
+    (models.PromptIdea, select(models.PromptIdea), "ix_prompt_ideas_created_at_id", False),
+    (models.GeneratedContent, select(models.GeneratedContent), "ix_generated_contents_created_at_id", False),
+    (
+        models.PromptIdea,
+        select(models.PromptIdea).where(models.PromptIdea.analysis_id == 1),
+        "ix_prompt_ideas_analysis_id_created_at",
+        True
+    ),
+    (
+        models.GeneratedContent,
+        select(models.GeneratedContent).where(models.GeneratedContent.prompt_id == 1),
+        "ix_generated_contents_prompt_id_created_at",
+        True
+    ),
+]
+
+@pytest.fixture(scope="module")
+def migrated_db():
+    run_migrations()
+
+def executed_statements(query, model, cursor) -> List[Tuple[str, Any]]:
+    """Run a page of a list query through ``paginate`` and return the SQL it executed."""
+    statements = []
+
+    def capture(conn, cursor_, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    async def run():
+        event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+        try:
+            async with AsyncSessionLocal() as db:
+                await paginate(db, query, model, 20, cursor)
+        finally:
+            event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
+            await async_engine.dispose()
+
+    asyncio.run(run())
+    return [(statement, parameters) for statement, parameters in statements if statement.lstrip().upper().startswith("SELECT")]
+
+def query_plan(statement: str, parameters: Any) -> List[str]:
+    with engine.connect() as conn:
+        return [row[3] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+
+@pytest.mark.parametrize("model, query, index, by_foreign_key", LIST_QUERIES, ids=[entry[2] for entry in LIST_QUERIES])
+@pytest.mark.parametrize("cursor", [None, CURSOR], ids=["first-page", "next-page"])
+def test_list_query_uses_index(migrated_db, model, query, index, by_foreign_key, cursor):
+    [(statement, parameters)] = executed_statements(query, model, cursor)
+    plan = query_plan(statement, parameters)
+
+    assert any(index in step for step in plan), plan
+    # Rows come off the index in order: no sort, and no table scan
+    assert not any("TEMP B-TREE" in step for step in plan), plan
+    assert not any(step.startswith("SCAN") and "INDEX" not in step for step in plan), plan
+    # Child listings and every page after the first seek into the index
+    if cursor or by_foreign_key:
+        assert all(step.startswith("SEARCH") for step in plan), plan
@@ -0,0 +1,101 @@
+import asyncio
+import json
+import threading
+import time
+
+import httpx
+import pytest
+
+from app.llm.errors import RateLimitError
+from app.llm.manus_provider import ManusProvider
+from app.llm.ratelimit import RateLimitedProvider, RateLimiter
+
+RETRY_AFTER = 1.0
+CALLS = 4
+
+class ThrottlingUpstream:
+    """Answers the first CALLS requests with 429 + Retry-After, then succeeds slowly."""
+
+    def __init__(self, limiter: RateLimiter):
+        self.limiter = limiter
+        self.lock = threading.Lock()
+        self.throttled_at = []
+        self.served_at = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        # AIMD limit seen by the first retry, before any success could raise it
+        self.concurrency_on_retry = None
+
+    def __call__(self, request):
+        with self.lock:
+            if len(self.throttled_at) < CALLS:
+                self.throttled_at.append(time.monotonic())
+                return 429, {"content-type": "application/json", "retry-after": str(int(RETRY_AFTER))}, b"{}"
+            if self.concurrency_on_retry is None:
+                self.concurrency_on_retry = self.limiter.concurrency
+            self.served_at.append(time.monotonic())
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.2)
+        with self.lock:
+            self.in_flight -= 1
+        body = json.loads(request.body)
+        return 200, {"content-type": "application/json"}, json.dumps({"text": body["prompt"]}).encode()
+
+def run_limited(server_url, limiter, monkeypatch, call):
+    monkeypatch.setattr("app.llm.manus_provider.settings.MANUS_API_URL", server_url)
+
+    async def run():
+        async with httpx.AsyncClient(timeout=10) as client:
+            provider = RateLimitedProvider(ManusProvider(api_key="test-key", http_client=client), "manus", limiter)
+            return await call(provider)
+
+    return asyncio.run(run())
+
+def test_429_burst_halves_concurrency_once_and_waits_for_retry_after(stub_server, monkeypatch):
+    limiter = RateLimiter(max_concurrency=CALLS, default_backoff=0)
+    upstream = ThrottlingUpstream(limiter)
+    server = stub_server(upstream)
+
+    async def call(provider):
+        return await asyncio.gather(*(provider.generate_text(f"prompt {index}") for index in range(CALLS)))
+
+    results = run_limited(server.url, limiter, monkeypatch, call)
+
+    assert results == [f"prompt {index}" for index in range(CALLS)]
+    assert limiter.counters["rate_limited"] == CALLS
+    # The burst of 429s is one congestion signal: 4 -> 2, not 4 -> 1
+    assert upstream.concurrency_on_retry == CALLS / 2
+    assert upstream.max_in_flight <= CALLS // 2
+    # No retry went out before the pause the provider asked for
+    assert min(upstream.served_at) - min(upstream.throttled_at) >= RETRY_AFTER - 0.05
+    # Successes grow the limit again, additively
+    assert CALLS / 2 < limiter.concurrency < CALLS
+
+def test_analysis_token_estimate_includes_page_text(stub_server, monkeypatch):
+    page_text = "Competitor copy. " * 2000
+    limiter = RateLimiter(tpm=1_000_000)
+    server = stub_server(lambda request: (200, {"content-type": "application/json"}, json.dumps({"text": "{}"}).encode()))
+
+    async def call(provider):
+        before = limiter.token_bucket.tokens
+        await provider.analyze_competitor("https://competitor.example/", "general", {"page_text": page_text})
+        return before - limiter.token_bucket.tokens
+
+    consumed = run_limited(server.url, limiter, monkeypatch, call)
+
+    assert consumed >= len(page_text) // 4 + 2000 - 1
+
+def test_manus_stream_errors_are_typed(stub_server, monkeypatch):
+    server = stub_server(lambda request: (429, {"content-type": "application/json", "retry-after": "3"}, b'{"error": "slow down"}'))
+    monkeypatch.setattr("app.llm.manus_provider.settings.MANUS_API_URL", server.url)
+
+    async def run():
+        async with httpx.AsyncClient(timeout=10) as client:
+            return [chunk async for chunk in ManusProvider(api_key="test-key", http_client=client).stream_text("hi")]
+
+    with pytest.raises(RateLimitError) as error:
+        asyncio.run(run())
+
+    assert error.value.provider == "manus"
+    assert error.value.retry_after == 3
@@ -0,0 +1,90 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.llm.circuit import CLOSED, CircuitBreaker, CircuitBreakerProvider
+from app.llm.errors import ProviderUnavailableError
+from app.llm.router import ProviderRouter
+
+class FakeConfigService:
+    """Hands out a placeholder instance per provider name, like ConfigurationService."""
+
+    def __init__(self, active):
+        self.active = active
+        self.requested = []
+
+    async def get_active_providers(self, db):
+        return self.active
+
+    async def get_llm_provider(self, provider, db):
+        self.requested.append(provider)
+        return provider
+
+def route(router, provider, call, active=("openai", "claude")):
+    config_service = FakeConfigService(list(active))
+    result = asyncio.run(router.route(provider, "generate_text", {"generate_text"}, call, config_service, None))
+    return result, config_service
+
+@pytest.mark.parametrize("provider", ["Auto", "AUTO", "auto"])
+def test_auto_is_matched_case_insensitively(provider):
+    async def call(llm_provider):
+        return f"from {llm_provider}"
+
+    (result, name), config_service = route(ProviderRouter(), provider, call)
+
+    assert (result, name) == ("from openai", "openai")
+    assert config_service.requested == ["openai"]
+
+def test_named_provider_is_normalized():
+    async def call(llm_provider):
+        return llm_provider
+
+    (_, name), config_service = route(ProviderRouter(), "Claude", call)
+
+    assert name == "claude"
+    assert config_service.requested == ["claude"]
+
+def test_upstream_error_is_recorded_and_fails_over():
+    router = ProviderRouter()
+
+    async def call(llm_provider):
+        if llm_provider == "openai":
+            raise httpx.ConnectError("connection refused")
+        return "ok"
+
+    (result, name), _ = route(router, "auto", call)
+
+    assert (result, name) == ("ok", "claude")
+    assert router.stats()["openai:generate_text"]["error_rate"] == 1.0
+
+def test_local_bug_propagates_without_failover_or_stats():
+    router = ProviderRouter()
+
+    async def call(llm_provider):
+        return {}["missing"]
+
+    config_service = FakeConfigService(["openai", "claude"])
+    with pytest.raises(KeyError):
+        asyncio.run(router.route("auto", "generate_text", {"generate_text"}, call, config_service, None))
+
+    assert config_service.requested == ["openai"]
+    assert router.stats()["openai:generate_text"]["calls"] == 0
+
+class BrokenProvider:
+    def __init__(self, error):
+        self.error = error
+
+    async def generate_text(self, prompt, options=None):
+        raise self.error
+
+def test_breaker_ignores_local_bugs_and_counts_outages():
+    breaker = CircuitBreaker("openai", failure_threshold=1)
+
+    with pytest.raises(TypeError):
+        asyncio.run(CircuitBreakerProvider(BrokenProvider(TypeError("bad argument")), "openai", breaker).generate_text("hi"))
+    assert (breaker.state, breaker.failures) == (CLOSED, 0)
+
+    with pytest.raises(ProviderUnavailableError):
+        asyncio.run(CircuitBreakerProvider(BrokenProvider(httpx.ReadTimeout("timed out")), "openai", breaker).generate_text("hi"))
+    assert breaker.failures == 1
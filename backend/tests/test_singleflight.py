@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+
+from app.llm.singleflight import SingleFlight
+
+class Upstream:
+    """Counts executions; each one waits until released."""
+
+    def __init__(self):
+        self.calls = 0
+        self.cancelled = 0
+        self.release = None
+
+    async def __call__(self):
+        self.calls += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return {"call": self.calls}
+
+def run(scenario):
+    async def wrapped():
+        upstream = Upstream()
+        upstream.release = asyncio.Event()
+        return await scenario(SingleFlight(), upstream)
+
+    return asyncio.run(wrapped())
+
+def test_concurrent_callers_share_one_execution_and_result():
+    async def scenario(flights, upstream):
+        waiters = [asyncio.create_task(flights.do("key", upstream)) for _ in range(5)]
+        await asyncio.sleep(0)
+        in_flight = flights.in_flight()
+        upstream.release.set()
+        results = await asyncio.gather(*waiters)
+        return upstream, in_flight, results, flights.in_flight()
+
+    upstream, in_flight, results, in_flight_after = run(scenario)
+
+    assert upstream.calls == 1
+    assert in_flight == 1
+    assert all(result is results[0] for result in results)
+    assert in_flight_after == 0
+
+def test_concurrent_callers_share_one_exception():
+    error = RuntimeError("upstream failed")
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise error
+
+    async def scenario(flights, upstream):
+        return await asyncio.gather(*(flights.do("key", failing) for _ in range(3)), return_exceptions=True)
+
+    assert run(scenario) == [error] * 3
+
+def test_completed_calls_are_not_reused():
+    async def scenario(flights, upstream):
+        upstream.release.set()
+        first = await flights.do("key", upstream)
+        second = await flights.do("key", upstream)
+        return first, second
+
+    assert run(scenario) == ({"call": 1}, {"call": 2})
+
+def test_shared_task_survives_while_any_waiter_remains():
+    async def scenario(flights, upstream):
+        leaving = asyncio.create_task(flights.do("key", upstream))
+        staying = asyncio.create_task(flights.do("key", upstream))
+        await asyncio.sleep(0)
+        leaving.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leaving
+        upstream.release.set()
+        return upstream, await staying
+
+    upstream, result = run(scenario)
+
+    assert result == {"call": 1}
+    assert (upstream.calls, upstream.cancelled) == (1, 0)
+
+def test_shared_task_is_cancelled_when_the_last_waiter_leaves():
+    async def scenario(flights, upstream):
+        waiters = [asyncio.create_task(flights.do("key", upstream)) for _ in range(2)]
+        await asyncio.sleep(0)
+        waiters[0].cancel()
+        await asyncio.sleep(0)
+        cancelled_early = upstream.cancelled
+        waiters[1].cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        # Let the cancellation reach the shared task
+        await asyncio.sleep(0)
+        return upstream, cancelled_early, flights.in_flight()
+
+    upstream, cancelled_early, in_flight = run(scenario)
+
+    assert cancelled_early == 0
+    assert upstream.cancelled == 1
+    assert in_flight == 0
+
+def test_new_caller_after_abandonment_starts_a_fresh_call():
+    async def scenario(flights, upstream):
+        abandoned = asyncio.create_task(flights.do("key", upstream))
+        await asyncio.sleep(0)
+        abandoned.cancel()
+        await asyncio.gather(abandoned, return_exceptions=True)
+        upstream.release.set()
+        return upstream, await flights.do("key", upstream)
+
+    upstream, result = run(scenario)
+
+    assert result == {"call": 2}
+    assert upstream.calls == 2
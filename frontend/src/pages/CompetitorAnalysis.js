@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { useAppContext } from '../utils/AppContext';
-import { analyzeCompetitor, getAnalyses } from '../services/api';
+import { analyzeCompetitor, getAnalysis, getAnalysisSummaries } from '../services/api';
 
 const CompetitorAnalysis = () => {
   const { setLoading, handleError, showNotification, setSelectedAnalysis } = useAppContext();
@@ -9,17 +9,19 @@ const CompetitorAnalysis = () => {
   const [analysisType, setAnalysisType] = useState('blog');
   const [provider, setProvider] = useState('openai');
   const [analyses, setAnalyses] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [analysisResult, setAnalysisResult] = useState(null);
   
   useEffect(() => {
     fetchAnalyses();
   }, []);
   
-  const fetchAnalyses = async () => {
+  const fetchAnalyses = async (cursor = null) => {
     try {
       setLoading(true);
-      const data = await getAnalyses();
-      setAnalyses(data);
+      const data = await getAnalysisSummaries(cursor ? { cursor } : {});
+      setAnalyses(cursor ? [...analyses, ...data.items] : data.items);
+      setNextCursor(data.next_cursor);
     } catch (error) {
       handleError(error);
     } finally {
@@ -48,9 +50,17 @@ const CompetitorAnalysis = () => {
     }
   };
   
-  const handleSelectAnalysis = (analysis) => {
-    setAnalysisResult(analysis);
-    setSelectedAnalysis(analysis);
+  const handleSelectAnalysis = async (analysis) => {
+    try {
+      setLoading(true);
+      const data = await getAnalysis(analysis.id);
+      setAnalysisResult(data);
+      setSelectedAnalysis(data);
+    } catch (error) {
+      handleError(error);
+    } finally {
+      setLoading(false);
+    }
   };
   
   return (
@@ -119,6 +129,7 @@ const CompetitorAnalysis = () => {
                 value={provider}
                 onChange={(e) => setProvider(e.target.value)}
               >
+                <option value="auto">Auto (fastest available)</option>
                 <option value="openai">OpenAI</option>
                 <option value="claude">Claude</option>
                 <option value="gemini">Gemini</option>
@@ -157,6 +168,15 @@ const CompetitorAnalysis = () => {
               ))}
             </ul>
           )}
+          
+          {nextCursor && (
+            <button 
+              className="btn btn-outline w-full mt-2"
+              onClick={() => fetchAnalyses(nextCursor)}
+            >
+              Load More
+            </button>
+          )}
         </div>
       </div>
       
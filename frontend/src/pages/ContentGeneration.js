@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { useAppContext } from '../utils/AppContext';
-import { generateContent, getContent } from '../services/api';
+import { generateContent, generateContentStream, getContentById, getContentSummaries } from '../services/api';
 
 const ContentGeneration = () => {
   const { 
@@ -16,16 +16,29 @@ const ContentGeneration = () => {
   const [tone, setTone] = useState('professional');
   const [generatedContent, setGeneratedContent] = useState(null);
   const [contentHistory, setContentHistory] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   
   useEffect(() => {
     fetchContentHistory();
   }, []);
   
-  const fetchContentHistory = async () => {
+  const fetchContentHistory = async (cursor = null) => {
     try {
       setLoading(true);
-      const data = await getContent();
-      setContentHistory(data);
+      const data = await getContentSummaries(null, cursor ? { cursor } : {});
+      setContentHistory(cursor ? [...contentHistory, ...data.items] : data.items);
+      setNextCursor(data.next_cursor);
+    } catch (error) {
+      handleError(error);
+    } finally {
+      setLoading(false);
+    }
+  };
+  
+  const handleSelectContent = async (content) => {
+    try {
+      setLoading(true);
+      setGeneratedContent(await getContentById(content.id));
     } catch (error) {
       handleError(error);
     } finally {
@@ -47,7 +60,22 @@ const ContentGeneration = () => {
     
     try {
       setLoading(true);
-      const result = await generateContent(selectedPrompt.id, contentType, provider, parameters);
+      let result;
+      if (contentType === 'text' || contentType === 'text+image') {
+        // Stream text so it renders as soon as the first tokens arrive
+        let contentText = '';
+        result = await generateContentStream(selectedPrompt.id, contentType, provider, parameters, (event, data) => {
+          if (event === 'token') {
+            contentText += data.text;
+            setLoading(false);
+            setGeneratedContent({ content_text: contentText });
+          } else if (event === 'image') {
+            setGeneratedContent({ content_text: contentText, content_url: data.content_url });
+          }
+        });
+      } else {
+        result = await generateContent(selectedPrompt.id, contentType, provider, parameters);
+      }
       setGeneratedContent(result);
       showNotification('Content generated successfully', 'success');
       fetchContentHistory(); // Refresh the list
@@ -145,6 +173,7 @@ const ContentGeneration = () => {
                 value={provider}
                 onChange={(e) => setProvider(e.target.value)}
               >
+                <option value="auto">Auto (fastest available)</option>
                 <option value="openai">OpenAI</option>
                 <option value="claude">Claude</option>
                 <option value="gemini">Gemini</option>
@@ -204,7 +233,7 @@ const ContentGeneration = () => {
                 <li 
                   key={content.id}
                   className="p-2 hover:bg-gray-100 rounded cursor-pointer"
-                  onClick={() => setGeneratedContent(content)}
+                  onClick={() => handleSelectContent(content)}
                 >
                   <div className="flex justify-between">
                     <span className="font-medium">{content.content_type}</span>
@@ -217,6 +246,15 @@ const ContentGeneration = () => {
               ))}
             </ul>
           )}
+          
+          {nextCursor && (
+            <button 
+              className="btn btn-outline w-full mt-2"
+              onClick={() => fetchContentHistory(nextCursor)}
+            >
+              Load More
+            </button>
+          )}
         </div>
       </div>
       
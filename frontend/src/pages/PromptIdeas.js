@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { useAppContext } from '../utils/AppContext';
-import { getPromptIdeas, generatePromptIdeas } from '../services/api';
+import { getPromptIdeas, generatePromptIdeasStream } from '../services/api';
 
 const PromptIdeas = () => {
   const { 
@@ -13,6 +13,7 @@ const PromptIdeas = () => {
   
   const [provider, setProvider] = useState('openai');
   const [promptIdeas, setPromptIdeas] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [numIdeas, setNumIdeas] = useState(5);
   
   useEffect(() => {
@@ -21,11 +22,12 @@ const PromptIdeas = () => {
     }
   }, [selectedAnalysis]);
   
-  const fetchPromptIdeas = async (analysisId) => {
+  const fetchPromptIdeas = async (analysisId, cursor = null) => {
     try {
       setLoading(true);
-      const data = await getPromptIdeas(analysisId);
-      setPromptIdeas(data);
+      const data = await getPromptIdeas(analysisId, cursor ? { cursor } : {});
+      setPromptIdeas(cursor ? [...promptIdeas, ...data.items] : data.items);
+      setNextCursor(data.next_cursor);
     } catch (error) {
       handleError(error);
     } finally {
@@ -41,9 +43,20 @@ const PromptIdeas = () => {
     
     try {
       setLoading(true);
-      const result = await generatePromptIdeas(selectedAnalysis.id, provider, numIdeas);
-      setPromptIdeas(result);
-      showNotification('Prompt ideas generated successfully', 'success');
+      // Each idea is shown as soon as the server has saved it
+      const ideas = [];
+      const result = await generatePromptIdeasStream(selectedAnalysis.id, provider, numIdeas, (event, data) => {
+        if (event === 'idea') {
+          ideas.push(data);
+          setLoading(false);
+          setPromptIdeas([...ideas]);
+        }
+      });
+      if (result && result.truncated) {
+        showNotification(`Generation was cut off; kept ${result.count} prompt ideas`, 'warning');
+      } else {
+        showNotification('Prompt ideas generated successfully', 'success');
+      }
     } catch (error) {
       handleError(error);
     } finally {
@@ -87,6 +100,7 @@ const PromptIdeas = () => {
               value={provider}
               onChange={(e) => setProvider(e.target.value)}
             >
+              <option value="auto">Auto (fastest available)</option>
               <option value="openai">OpenAI</option>
               <option value="claude">Claude</option>
               <option value="gemini">Gemini</option>
@@ -142,6 +156,17 @@ const PromptIdeas = () => {
         </div>
       )}
       
+      {nextCursor && (
+        <div className="mt-6 text-center">
+          <button 
+            className="btn btn-outline"
+            onClick={() => fetchPromptIdeas(selectedAnalysis.id, nextCursor)}
+          >
+            Load More
+          </button>
+        </div>
+      )}
+      
       {promptIdeas.length > 0 && (
         <div className="mt-6 text-center">
           <button 
@@ -2,6 +2,43 @@ import axios from 'axios';
 
 const API_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000/api';
 
+// POSTs a request answered with Server-Sent Events, calling onEvent(event, data)
+// for each event; resolves with the done event's data and rejects on an error event.
+const postEventStream = async (path, body, onEvent) => {
+  const response = await fetch(`${API_URL}${path}`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(body)
+  });
+  if (!response.ok) {
+    const error = await response.json().catch(() => ({}));
+    throw new Error(error.detail || `Request failed with status ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  let result = null;
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    const messages = buffer.split('\n\n');
+    buffer = messages.pop();
+    for (const message of messages) {
+      const eventLine = message.split('\n').find((line) => line.startsWith('event: '));
+      const dataLine = message.split('\n').find((line) => line.startsWith('data: '));
+      if (!eventLine || !dataLine) continue;
+      const event = eventLine.slice('event: '.length);
+      const data = JSON.parse(dataLine.slice('data: '.length));
+      if (event === 'error') throw new Error(data.detail);
+      if (event === 'done') result = data;
+      onEvent(event, data);
+    }
+  }
+  return result;
+};
+
 // Configuration API
 export const getApiKeys = async () => {
   const response = await axios.get(`${API_URL}/config/api-keys`);
@@ -45,8 +82,15 @@ export const analyzeCompetitor = async (competitorUrl, analysisType, provider) =
   return response.data;
 };
 
-export const getAnalyses = async () => {
-  const response = await axios.get(`${API_URL}/analysis/analyses`);
+// List endpoints are paginated: they resolve with { items, next_cursor }.
+// Pass next_cursor back as params.cursor to fetch the following page.
+export const getAnalyses = async (params = {}) => {
+  const response = await axios.get(`${API_URL}/analysis/analyses`, { params });
+  return response.data;
+};
+
+export const getAnalysisSummaries = async (params = {}) => {
+  const response = await axios.get(`${API_URL}/analysis/analyses/summary`, { params });
   return response.data;
 };
 
@@ -64,11 +108,20 @@ export const generatePromptIdeas = async (analysisId, provider, numIdeas = 5) =>
   return response.data;
 };
 
-export const getPromptIdeas = async (analysisId = null) => {
-  const url = analysisId 
-    ? `${API_URL}/analysis/prompt-ideas?analysis_id=${analysisId}` 
-    : `${API_URL}/analysis/prompt-ideas`;
-  const response = await axios.get(url);
+// Streams prompt ideas as Server-Sent Events, calling onEvent('idea', idea) as each
+// one is saved and resolving with the done event's summary ({ count, truncated }).
+export const generatePromptIdeasStream = async (analysisId, provider, numIdeas = 5, onEvent = () => {}) => {
+  return postEventStream('/analysis/generate-prompts/stream', {
+    analysis_id: analysisId,
+    provider,
+    num_ideas: numIdeas
+  }, onEvent);
+};
+
+export const getPromptIdeas = async (analysisId = null, params = {}) => {
+  const response = await axios.get(`${API_URL}/analysis/prompt-ideas`, {
+    params: analysisId ? { ...params, analysis_id: analysisId } : params
+  });
   return response.data;
 };
 
@@ -88,11 +141,28 @@ export const generateContent = async (promptId, contentType, provider, parameter
   return response.data;
 };
 
-export const getContent = async (promptId = null) => {
-  const url = promptId 
-    ? `${API_URL}/content/content?prompt_id=${promptId}` 
-    : `${API_URL}/content/content`;
-  const response = await axios.get(url);
+// Streams content as Server-Sent Events, calling onEvent(event, data) for each
+// token/image event and resolving with the saved content from the done event.
+export const generateContentStream = async (promptId, contentType, provider, parameters = {}, onEvent = () => {}) => {
+  return postEventStream('/content/generate/stream', {
+    prompt_id: promptId,
+    content_type: contentType,
+    provider,
+    parameters
+  }, onEvent);
+};
+
+export const getContent = async (promptId = null, params = {}) => {
+  const response = await axios.get(`${API_URL}/content/content`, {
+    params: promptId ? { ...params, prompt_id: promptId } : params
+  });
+  return response.data;
+};
+
+export const getContentSummaries = async (promptId = null, params = {}) => {
+  const response = await axios.get(`${API_URL}/content/content/summary`, {
+    params: promptId ? { ...params, prompt_id: promptId } : params
+  });
   return response.data;
 };
 